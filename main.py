@@ -1,12 +1,16 @@
 # ABOUTME: Main entry point for Claude-RPI Telegram bridge bot
-# ABOUTME: Initializes aiogram bot, registers handlers, starts scheduler, begins polling
+# ABOUTME: Initializes aiogram bot, registers handlers, starts scheduler, runs polling or webhook
 
 import asyncio
 import logging
-from aiogram import Bot, Dispatcher
-from aiogram.filters import Command
-from aiogram import F
+import signal
+
+from src.startup import StartupTimer
 
+# Created before the heavy imports so the start-up breakdown covers them
+startup = StartupTimer()
+
+# Config first: a missing or invalid setting fails before paying for the aiogram import
 from src.config import (
     TELEGRAM_BOT_TOKEN,
     ALLOWED_USER_ID,
@@ -17,26 +21,126 @@ from src.config import (
     BLOG_SCHEDULE_DAY,
     BLOG_SCHEDULE_HOUR,
     BLOG_SCHEDULE_MINUTE,
+    CLAUDE_MAX_CONCURRENCY,
+    TELEGRAM_SEND_RATE,
+    TELEGRAM_SEND_BURST,
+    METRICS_HOST,
+    METRICS_PORT,
+    TELEGRAM_MODE,
+    WEBHOOK_BASE_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    SESSION_BACKEND,
+    SESSION_DB_PATH,
+    SESSION_MAX_TURNS,
+    SESSION_MAX_TOKENS,
+    SESSION_IDLE_HOURS,
+    USAGE_DB_PATH,
+    BUDGET_DAILY_USD,
+    BUDGET_WEEKLY_USD,
+    BUDGET_DOWNSCALE_AT,
+    BUDGET_DEFER_AT,
+    BUDGET_DEFER_HOURS,
+    BUDGET_DOWNSCALE_LIMIT,
+    JOB_JOURNAL_PATH,
+    SHUTDOWN_DRAIN_SECONDS,
 )
-from src.bot import handle_message, handle_new_command
+
+startup.mark("config")
+
+from aiogram import Bot, Dispatcher
+from aiogram.filters import Command
+from aiogram import F
+
+startup.mark("aiogram")
+
+# Core chat path only, digest subsystems (IMAP, html2text, blog runners) load on first use
+from src.bot import (
+    handle_message,
+    handle_new_command,
+    handle_usage_command,
+    handle_cancel_command,
+    report_interrupted_turns,
+)
+from src.delivery import delivery_queue
+from src.metrics import start_metrics_server
+from src.shutdown import shutdown_coordinator
+from src.session import SessionPolicy, SqliteBackend, configure_backend, configure_policy, close_backend
+from src.usage import BudgetPolicy, usage_ledger
+from src.worker_pool import claude_pool
+
+startup.mark("core")
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def main():
-    """Initialize and start the bot."""
-    bot = Bot(token=TELEGRAM_BOT_TOKEN)
+def build_dispatcher() -> Dispatcher:
+    """Create dispatcher with all bot handlers registered."""
     dp = Dispatcher()
 
     # Register command handlers
     dp.message.register(handle_new_command, Command("new"))
+    dp.message.register(handle_usage_command, Command("usage"))
+    dp.message.register(handle_cancel_command, Command("cancel"))
 
     # Register message handler for all text messages
     dp.message.register(handle_message, F.text)
 
+    return dp
+
+
+async def _on_ready():
+    """Dispatcher startup hook: updates are about to flow, report start-up timing."""
+    startup.mark("connect")
+    startup.log()
+
+
+async def main():
+    """Initialize and start the bot."""
+    bot = Bot(token=TELEGRAM_BOT_TOKEN)
+    dp = build_dispatcher()
+    dp.startup.register(_on_ready)
+
     logger.info("Starting Claude-RPI Bridge bot...")
 
+    # Bind shared Claude pool to this loop so digest worker threads can queue on it
+    claude_pool.configure(CLAUDE_MAX_CONCURRENCY, loop=asyncio.get_running_loop())
+    delivery_queue.configure(TELEGRAM_SEND_RATE, TELEGRAM_SEND_BURST)
+
+    # Restore conversation sessions from disk
+    configure_policy(SessionPolicy(
+        max_turns=SESSION_MAX_TURNS,
+        max_tokens=SESSION_MAX_TOKENS,
+        idle_timeout=SESSION_IDLE_HOURS * 3600
+    ))
+    if SESSION_BACKEND == "sqlite":
+        configure_backend(SqliteBackend(SESSION_DB_PATH))
+
+    # Claude spend ledger and budget admission
+    usage_ledger.configure(USAGE_DB_PATH, BudgetPolicy(
+        daily_usd=BUDGET_DAILY_USD,
+        weekly_usd=BUDGET_WEEKLY_USD,
+        downscale_at=BUDGET_DOWNSCALE_AT,
+        defer_at=BUDGET_DEFER_AT,
+        defer_seconds=BUDGET_DEFER_HOURS * 3600,
+        downscale_limit=BUDGET_DOWNSCALE_LIMIT
+    ))
+
+    # Jobs the previous run did not finish (drain deadline or crash)
+    shutdown_coordinator.configure(JOB_JOURNAL_PATH, SHUTDOWN_DRAIN_SECONDS)
+    interrupted = shutdown_coordinator.recover()
+    interrupted_kinds = {entry.kind for entry in interrupted}
+
+    startup.mark("state")
+
+    # Expose latency metrics locally if enabled
+    metrics_server = None
+    if METRICS_PORT:
+        metrics_server = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+
     # Start newsletter scheduler if configured
     scheduler_task = None
     if NEWSLETTER_ENABLED:
@@ -51,7 +155,7 @@ async def main():
             schedule_minute=NEWSLETTER_SCHEDULE_MINUTE
         )
 
-        scheduler_task = asyncio.create_task(scheduler.start())
+        scheduler_task = asyncio.create_task(scheduler.start(resume="newsletter" in interrupted_kinds))
         logger.info("Newsletter scheduler enabled")
     else:
         logger.info("Newsletter scheduler disabled (IMAP not configured)")
@@ -67,14 +171,49 @@ async def main():
             schedule_hour=BLOG_SCHEDULE_HOUR,
             schedule_minute=BLOG_SCHEDULE_MINUTE
         )
-        blog_scheduler_task = asyncio.create_task(blog_scheduler.start())
+        blog_scheduler_task = asyncio.create_task(blog_scheduler.start(resume="blog" in interrupted_kinds))
         logger.info("Blog scheduler enabled")
     else:
         logger.info("Blog scheduler disabled (blog_sources.json not found)")
 
+    startup.mark("services")
+
     try:
-        await dp.start_polling(bot)
+        # Chat replies lost in the restart are reported, digests resume above
+        await report_interrupted_turns(bot, interrupted)
+
+        if TELEGRAM_MODE == "webhook":
+            from src.webhook import run_webhook
+
+            # Close the coordinator on the signal itself, the drain deadline starts there
+            stop = asyncio.Event()
+
+            def on_signal():
+                shutdown_coordinator.close()
+                stop.set()
+
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, on_signal)
+
+            await run_webhook(
+                dp, bot,
+                host=WEBHOOK_HOST,
+                port=WEBHOOK_PORT,
+                path=WEBHOOK_PATH,
+                base_url=WEBHOOK_BASE_URL,
+                secret=WEBHOOK_SECRET,
+                drain_timeout=SHUTDOWN_DRAIN_SECONDS,
+                stop=stop
+            )
+        else:
+            # A leftover webhook would make getUpdates fail
+            await bot.delete_webhook()
+            await dp.start_polling(bot, close_bot_session=False)
     finally:
+        # No new Claude jobs from here on, running ones get until the deadline to reply
+        await shutdown_coordinator.drain()
+
         if scheduler_task:
             scheduler_task.cancel()
             try:
@@ -89,6 +228,12 @@ async def main():
             except asyncio.CancelledError:
                 pass
 
+        if metrics_server:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+
+        close_backend()
+        usage_ledger.close()
         await bot.session.close()
 
 
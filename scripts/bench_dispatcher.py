@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# ABOUTME: Load generator feeding synthetic or recorded Telegram updates to the bot (polling or webhook path)
+# ABOUTME: Mocks the Bot API session, reports handler concurrency, event-loop lag and end-to-end latency
+
+"""
+Dispatcher Load Generator
+
+Builds the real dispatcher from main.py and pushes Update objects at a
+fixed rate (optionally in bursts), either straight into dp.feed_update as
+the polling loop would, or as HTTP POSTs to the local webhook server.
+Outgoing Bot API calls are answered by an in-memory
+session and Claude is replaced by scripts/fake_claude.py.
+
+Usage:
+  python scripts/bench_dispatcher.py --updates 200 --rate 20
+  python scripts/bench_dispatcher.py --burst 5 --rate 2 --latency 0.5
+  python scripts/bench_dispatcher.py --mode webhook --updates 200 --rate 20
+  python scripts/bench_dispatcher.py --replay recorded_updates.jsonl
+"""
+
+import os
+import sys
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).parent.parent
+FAKE_CLAUDE = PROJECT_ROOT / "scripts" / "fake_claude.py"
+USER_ID = 424242
+WEBHOOK_PATH = "/bench/webhook"
+WEBHOOK_SECRET = "bench-secret"
+
+# Must be set before src modules read their configuration
+os.environ["CLAUDE_BIN"] = f"{sys.executable} {FAKE_CLAUDE}"
+os.environ["TELEGRAM_BOT_TOKEN"] = "123456:bench-token"
+os.environ["ALLOWED_USER_ID"] = str(USER_ID)
+os.environ["SESSION_BACKEND"] = "memory"
+
+# Add project root to path
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import DeleteMessage, TelegramMethod
+from aiogram.types import Update
+
+from main import build_dispatcher
+from src import bot as bot_handlers
+from src.delivery import delivery_queue
+from src.worker_pool import claude_pool
+
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "data" / "bench"
+
+
+class FakeSession(BaseSession):
+    """Bot API session answering every call locally after an optional delay."""
+
+    def __init__(self, api_latency: float = 0.0):
+        super().__init__()
+        self.api_latency = api_latency
+        self.calls: dict[str, int] = {}
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: int | None = None) -> Any:
+        name = type(method).__name__
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.api_latency:
+            await asyncio.sleep(self.api_latency)
+
+        if isinstance(method, DeleteMessage):
+            return True
+
+        chat_id = getattr(method, "chat_id", None) or USER_ID
+        return method.__returning__.model_validate(
+            {
+                "message_id": getattr(method, "message_id", None) or next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": getattr(method, "text", ""),
+            },
+            context={"bot": bot},
+        )
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def synthetic_updates(count: int, new_every: int):
+    """Private text messages from the allowed user, with an occasional /new."""
+    for idx in range(count):
+        text = "/new" if new_every and idx and idx % new_every == 0 else f"Load test message {idx}"
+        yield Update.model_validate({
+            "update_id": idx + 1,
+            "message": {
+                "message_id": idx + 1,
+                "date": int(time.time()),
+                "chat": {"id": USER_ID, "type": "private"},
+                "from": {"id": USER_ID, "is_bot": False, "first_name": "Bench"},
+                "text": text,
+            },
+        })
+
+
+def recorded_updates(path: Path):
+    """Raw Update JSON objects, one per line (e.g. captured getUpdates results)."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield Update.model_validate(json.loads(line))
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires, i.e. how long the loop was blocked."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+class HandlerTracker:
+    """Outer update middleware measuring handler concurrency and send-to-handled latency."""
+
+    def __init__(self, expected: int):
+        self.expected = expected
+        self.sent_at: dict[int, float] = {}
+        self.latencies: list[float] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.errors = 0
+        self.finished = 0
+        self.done = asyncio.Event()
+
+    def mark_sent(self, update: Update) -> None:
+        self.sent_at[update.update_id] = time.perf_counter()
+
+    async def __call__(self, handler, event: Update, data: dict) -> Any:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await handler(event, data)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            sent = self.sent_at.pop(event.update_id, None)
+            if sent is not None:
+                self.latencies.append(time.perf_counter() - sent)
+            self.finished += 1
+            if self.finished >= self.expected:
+                self.done.set()
+
+
+async def polling_sender(dp, bot, tracker: HandlerTracker):
+    """Dispatch like the polling loop: one task per update."""
+    tasks = set()
+
+    async def feed(update: Update):
+        try:
+            await dp.feed_update(bot, update)
+        except Exception:
+            pass  # counted by the tracker
+
+    async def send(update: Update):
+        tracker.mark_sent(update)
+        task = asyncio.create_task(feed(update))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    yield send
+
+
+async def webhook_sender(dp, bot, tracker: HandlerTracker, port: int):
+    """Run the webhook server locally and POST updates to it like Telegram does."""
+    from aiohttp import ClientSession
+    from src.webhook import run_webhook
+
+    stop = asyncio.Event()
+    server = asyncio.create_task(run_webhook(
+        dp, bot, host="127.0.0.1", port=port, path=WEBHOOK_PATH, secret=WEBHOOK_SECRET, stop=stop
+    ))
+    await asyncio.sleep(0.2)
+
+    url = f"http://127.0.0.1:{port}{WEBHOOK_PATH}"
+    headers = {"X-Telegram-Bot-Api-Secret-Token": WEBHOOK_SECRET}
+
+    tasks = set()
+
+    async with ClientSession() as http:
+        async def post(update: Update):
+            payload = update.model_dump(mode="json", exclude_none=True, by_alias=True)
+            async with http.post(url, json=payload, headers=headers) as response:
+                if response.status != 200:
+                    tracker.errors += 1
+
+        async def send(update: Update):
+            tracker.mark_sent(update)
+            task = asyncio.create_task(post(update))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        try:
+            yield send
+        finally:
+            stop.set()
+            await server
+
+
+async def run_load(args, updates: list[Update]) -> dict:
+    loop = asyncio.get_running_loop()
+    claude_pool.configure(args.concurrency, loop=loop)
+    delivery_queue.configure(rate=args.send_rate, burst=args.send_burst)
+    if args.coalesce_ms is not None:
+        bot_handlers._coalescer.window = args.coalesce_ms / 1000
+
+    session = FakeSession(api_latency=args.api_latency)
+    bot = Bot(token=os.environ["TELEGRAM_BOT_TOKEN"], session=session)
+    dp = build_dispatcher()
+
+    tracker = HandlerTracker(expected=len(updates))
+    dp.update.outer_middleware(tracker)
+
+    if args.mode == "webhook":
+        sender = webhook_sender(dp, bot, tracker, args.port)
+    else:
+        sender = polling_sender(dp, bot, tracker)
+    send = await anext(sender)
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+
+    interval = args.burst / args.rate
+    wall_start = time.perf_counter()
+    for idx in range(0, len(updates), args.burst):
+        for update in updates[idx:idx + args.burst]:
+            await send(update)
+        await asyncio.sleep(interval)
+
+    await tracker.done.wait()
+    wall = time.perf_counter() - wall_start
+    await monitor.stop()
+    await sender.aclose()
+    await bot.session.close()
+
+    return {
+        "mode": args.mode,
+        "updates": len(updates),
+        "errors": tracker.errors,
+        "wall_seconds": wall,
+        "throughput": len(updates) / wall if wall else 0.0,
+        "max_handler_concurrency": tracker.max_in_flight,
+        "latency_p50": percentile(tracker.latencies, 50),
+        "latency_p99": percentile(tracker.latencies, 99),
+        "latency_max": max(tracker.latencies, default=0.0),
+        "loop_lag_p50": percentile(monitor.lags, 50),
+        "loop_lag_p99": percentile(monitor.lags, 99),
+        "loop_lag_max": max(monitor.lags, default=0.0),
+        "api_calls": session.calls,
+        "delivery": delivery_queue.stats(),
+        "pool": claude_pool.stats(),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Feed updates into the Dispatcher under load')
+    parser.add_argument('--mode', choices=['polling', 'webhook'], default='polling',
+                        help='Feed updates directly (as polling does) or POST them to the webhook server')
+    parser.add_argument('--port', type=int, default=18080, help='Local port for webhook mode')
+    parser.add_argument('--updates', type=int, default=100, help='Synthetic updates to send')
+    parser.add_argument('--replay', type=Path, default=None, help='JSONL file of recorded updates')
+    parser.add_argument('--rate', type=float, default=10.0, help='Updates per second')
+    parser.add_argument('--burst', type=int, default=1, help='Updates sent back-to-back per tick')
+    parser.add_argument('--new-every', type=int, default=0, help='Send /new every N updates (0 = never)')
+    parser.add_argument('--coalesce-ms', type=int, default=None,
+                        help='Override the message coalescing window (0 = one turn per message)')
+    parser.add_argument('--concurrency', type=int, default=2, help='Claude pool size')
+    parser.add_argument('--latency', type=float, default=0.2, help='Simulated Claude latency in seconds')
+    parser.add_argument('--api-latency', type=float, default=0.0, help='Simulated Bot API latency in seconds')
+    parser.add_argument('--send-rate', type=float, default=1000.0, help='Delivery queue rate per chat')
+    parser.add_argument('--send-burst', type=int, default=1000, help='Delivery queue burst per chat')
+    parser.add_argument('--output', type=Path, default=None, help='Where to save results JSON')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.environ["FAKE_CLAUDE_LATENCY"] = str(args.latency)
+    logging.disable(logging.CRITICAL)
+
+    updates = recorded_updates(args.replay) if args.replay else synthetic_updates(args.updates, args.new_every)
+    updates = list(updates)
+    report = asyncio.run(run_load(args, updates))
+
+    print(f"Mode:                 {report['mode']}")
+    print(f"Updates:              {report['updates']} ({report['errors']} errors) in {report['wall_seconds']:.2f}s")
+    print(f"Throughput:           {report['throughput']:.1f} updates/s")
+    print(f"Handler concurrency:  max {report['max_handler_concurrency']}")
+    print(f"End-to-end latency:   p50 {report['latency_p50']:.3f}s  p99 {report['latency_p99']:.3f}s  "
+          f"max {report['latency_max']:.3f}s")
+    print(f"Event-loop lag:       p50 {report['loop_lag_p50'] * 1000:.1f}ms  p99 {report['loop_lag_p99'] * 1000:.1f}ms  "
+          f"max {report['loop_lag_max'] * 1000:.1f}ms")
+    print(f"Bot API calls:        {report['api_calls']}")
+
+    report["created_at"] = datetime.now().isoformat()
+    report["config"] = {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()}
+
+    output = args.output or DEFAULT_OUTPUT_DIR / f"dispatcher-{args.mode}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n📁 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
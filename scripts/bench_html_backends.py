@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# ABOUTME: Benchmark of newsletter HTML to Markdown backends with and without the slimming pass
+# ABOUTME: Wraps the create_test_emails.py samples in marketing-style HTML and reports throughput and output size
+
+"""
+HTML Backends Benchmark
+
+Usage:
+  python scripts/bench_html_backends.py
+  python scripts/bench_html_backends.py --copies 50 --repeat 5
+  python scripts/bench_html_backends.py --raw   # samples as generated, without marketing markup
+"""
+
+import sys
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add project root and scripts to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from create_test_emails import SAMPLE_NEWSLETTERS
+from src.newsletter.email_converter import EmailConverter
+from src.newsletter.email_fetcher import EmailData
+from src.newsletter.markdown_backends import BACKENDS
+
+# What an email service wraps around the content: inline CSS, a hidden preheader,
+# nested single-column layout tables, Outlook conditionals and open-tracking pixels
+MARKETING_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{subject}</title>
+<style>{css}</style></head>
+<body style="margin:0;padding:0;background:#f4f4f4">
+<div style="display:none;max-height:0;overflow:hidden;mso-hide:all">{subject} - open for this week's picks&zwnj;&nbsp;{filler}</div>
+<!--[if mso]><table role="presentation" width="600"><tr><td><![endif]-->
+<table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0" style="background:#f4f4f4"><tr><td align="center">
+<table role="presentation" width="600" cellpadding="0" cellspacing="0" border="0" class="container"><tbody>
+<tr><td style="padding:24px 32px;font-family:Helvetica,Arial,sans-serif;font-size:16px;line-height:24px;color:#333">
+<table role="presentation" width="100%"><tr><td class="content" style="font-family:Helvetica,Arial,sans-serif">{content}</td></tr></table>
+</td></tr>
+<tr><td style="padding:16px 32px;font-size:12px;color:#999;font-family:Helvetica,Arial,sans-serif">
+<p style="margin:0">You received this email because you subscribed. <a href="https://example.com/unsubscribe?u=abc123" style="color:#999">Unsubscribe</a></p>
+</td></tr></tbody></table>
+</td></tr></table>
+<!--[if mso]></td></tr></table><![endif]-->
+<img src="https://track.example.com/open/abc123.gif" width="1" height="1" alt="" style="display:block;width:1px;height:1px">
+<script type="application/ld+json">{{"@context": "http://schema.org", "@type": "EmailMessage"}}</script>
+</body></html>"""
+
+CSS = "".join(
+    f".c{idx} {{ font-family: Helvetica, Arial, sans-serif; color: #{idx:06x}; padding: {idx % 24}px; }}\n"
+    for idx in range(300)
+)
+
+
+def make_corpus(copies: int, raw: bool) -> list[EmailData]:
+    emails = []
+    for copy in range(copies):
+        for idx, sample in enumerate(SAMPLE_NEWSLETTERS):
+            html = sample["html"] if raw else MARKETING_TEMPLATE.format(
+                subject=sample["subject"], css=CSS, filler="&nbsp;&zwnj;" * 80, content=sample["html"]
+            )
+            emails.append(EmailData(
+                sender=sample["sender"],
+                subject=sample["subject"],
+                date=datetime(2026, 2, 10),
+                body_text="",
+                body_html=html,
+                message_id=f"<bench{copy}-{idx}@example.com>"
+            ))
+    return emails
+
+
+def run(converter: EmailConverter, emails: list[EmailData], repeat: int) -> tuple[float, int]:
+    """Best wall time over repeats and total Markdown characters produced."""
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = sum(len(converter.html_to_markdown(email.body_html)) for email in emails)
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark HTML to Markdown backends')
+    parser.add_argument('--copies', type=int, default=20, help='Copies of the sample corpus')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration (best is reported)')
+    parser.add_argument('--raw', action='store_true', help='Use the samples without marketing markup')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    emails = make_corpus(args.copies, args.raw)
+    html_bytes = sum(len(email.body_html) for email in emails)
+    print(f"Corpus: {len(emails)} emails, {html_bytes / 1024:.0f} KiB of HTML\n")
+
+    print(f"{'backend':>10} {'slim':>5} {'emails/s':>10} {'MiB/s':>8} {'output KiB':>11} {'vs baseline':>12}")
+    baseline = None
+    for backend in BACKENDS:
+        for slim in (False, True):
+            converter = EmailConverter(backend=backend, slim=slim)
+            seconds, size = run(converter, emails, args.repeat)
+            baseline = baseline or seconds
+            print(f"{backend:>10} {'yes' if slim else 'no':>5} {len(emails) / seconds:>10.0f} "
+                  f"{html_bytes / seconds / 1024 / 1024:>8.2f} {size / 1024:>11.1f} {baseline / seconds:>11.1f}x")
+
+    print("\nBaseline: html2text without slimming (the previous converter)")
+
+
+if __name__ == "__main__":
+    main()
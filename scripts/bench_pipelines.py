@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# ABOUTME: Offline benchmark of the chat hot path and both digest pipelines against the fake claude CLI
+# ABOUTME: Reports throughput, p50/p99 latency and memory, saves results and compares with a baseline
+
+"""
+Pipeline Benchmark
+
+Runs the real bot/digest code with scripts/fake_claude.py standing in for
+the claude binary, so numbers reflect our own overhead plus simulated
+Claude latency.
+
+Usage:
+  python scripts/bench_pipelines.py
+  python scripts/bench_pipelines.py --runs 50 --concurrency 4 --latency 0.2
+  python scripts/bench_pipelines.py --baseline data/bench/pipelines-20250101-120000.json
+"""
+
+import os
+import sys
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+PROJECT_ROOT = Path(__file__).parent.parent
+FAKE_CLAUDE = PROJECT_ROOT / "scripts" / "fake_claude.py"
+
+# Must be set before src modules read their configuration
+os.environ["CLAUDE_BIN"] = f"{sys.executable} {FAKE_CLAUDE}"
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "bench-token")
+os.environ.setdefault("ALLOWED_USER_ID", "1")
+
+# Add project root to path
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src import bot
+from src.blog.runner import BlogRunner
+from src.blog.summarizer import BlogSummarizer
+from src.delivery import delivery_queue
+from src.newsletter.claude_runner import ClaudeRunner
+from src.worker_pool import claude_pool
+
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "data" / "bench"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def summarize(name: str, latencies: list[float], failures: int, wall: float, peak_bytes: int) -> dict:
+    return {
+        "name": name,
+        "runs": len(latencies) + failures,
+        "failures": failures,
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies, default=0.0),
+        "peak_python_mb": peak_bytes / 1024 / 1024,
+    }
+
+
+def make_message(user_id: int, text: str) -> MagicMock:
+    """Minimal aiogram Message double whose sends succeed instantly."""
+    sent = MagicMock()
+    sent.edit_text = AsyncMock()
+    sent.delete = AsyncMock()
+
+    message = MagicMock()
+    message.text = text
+    message.chat.id = user_id
+    message.from_user.id = user_id
+    message.answer = AsyncMock(return_value=sent)
+    return message
+
+
+async def bench_chat(runs: int, concurrency: int, streaming: bool) -> dict:
+    """Drive full chat turns (session, pool, Claude, formatting, delivery) for distinct users."""
+    claude_pool.configure(concurrency, loop=asyncio.get_running_loop())
+    delivery_queue.configure(rate=10_000, burst=10_000)
+    bot.CLAUDE_STREAMING = streaming
+
+    latencies = []
+    failures = 0
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(user_id: int):
+        nonlocal failures
+        message = make_message(user_id, f"benchmark question {user_id}")
+        async with gate:
+            start = time.perf_counter()
+            await bot._run_turn(user_id, [message])
+            elapsed = time.perf_counter() - start
+        replies = [call.args[0] for call in message.answer.call_args_list]
+        if any(str(text).startswith(("Execution error", "Error:")) for text in replies):
+            failures += 1
+        else:
+            latencies.append(elapsed)
+
+    tracemalloc.start()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(1000 + i) for i in range(runs)))
+    wall = time.perf_counter() - wall_start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mode = "stream" if streaming else "json"
+    return summarize(f"chat_{mode}", latencies, failures, wall, peak)
+
+
+def bench_blocking(name: str, runs: int, concurrency: int, job) -> dict:
+    """Run a blocking digest step `runs` times on a thread pool."""
+    latencies = []
+    failures = 0
+
+    def timed(idx: int):
+        start = time.perf_counter()
+        job(idx)
+        return time.perf_counter() - start
+
+    tracemalloc.start()
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(timed, idx) for idx in range(runs)]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                failures += 1
+    wall = time.perf_counter() - wall_start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return summarize(name, latencies, failures, wall, peak)
+
+
+def bench_digests(runs: int, concurrency: int, workdir: Path) -> list[dict]:
+    prompt_file = workdir / "prompt.md"
+    prompt_file.write_text("Benchmark prompt")
+
+    folder = workdir / "posts"
+    folder.mkdir()
+    (folder / "example.com.md").write_text("# Example post\n")
+
+    newsletter = ClaudeRunner(prompt_file=str(prompt_file))
+    blog_runner = BlogRunner(prompt_file=str(prompt_file))
+    summarizer = BlogSummarizer(prompt_file=str(prompt_file))
+
+    def fetch(idx: int):
+        out = workdir / f"blog-{idx}"
+        out.mkdir(exist_ok=True)
+        blog_runner.fetch_blog(url=f"https://blog{idx}.example.com", name=f"Blog {idx}", output_dir=out)
+
+    return [
+        bench_blocking("newsletter_analysis", runs, concurrency, lambda idx: newsletter.analyze_newsletters(str(folder))),
+        bench_blocking("blog_fetch", runs, concurrency, fetch),
+        bench_blocking("blog_summary", runs, concurrency, lambda idx: summarizer.summarize(folder)),
+    ]
+
+
+def compare(results: list[dict], baseline: dict, max_regression: float) -> bool:
+    """Print deltas against a baseline run, return False on a p50 regression."""
+    previous = {entry["name"]: entry for entry in baseline["results"]}
+    ok = True
+
+    print(f"\n{'benchmark':<22} {'p50 Δ':>9} {'p99 Δ':>9} {'thr Δ':>9}")
+    for entry in results:
+        old = previous.get(entry["name"])
+        if not old or not old["p50"]:
+            continue
+        p50 = entry["p50"] / old["p50"] - 1
+        p99 = entry["p99"] / old["p99"] - 1 if old["p99"] else 0.0
+        thr = entry["throughput"] / old["throughput"] - 1 if old["throughput"] else 0.0
+        flag = " ❌" if p50 > max_regression else ""
+        ok = ok and not flag
+        print(f"{entry['name']:<22} {p50:>+8.1%} {p99:>+8.1%} {thr:>+8.1%}{flag}")
+
+    return ok
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark chat and digest pipelines against fake claude')
+    parser.add_argument('--runs', type=int, default=20, help='Runs per benchmark')
+    parser.add_argument('--concurrency', type=int, default=2, help='Parallel runs (and Claude pool size)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated Claude latency in seconds')
+    parser.add_argument('--output-chars', type=int, default=2000, help='Simulated reply size')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Simulated Claude failure rate')
+    parser.add_argument('--output', type=Path, default=None, help='Where to save results JSON')
+    parser.add_argument('--baseline', type=Path, default=None, help='Previous results JSON to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='Fail if p50 is slower than baseline by more than this fraction')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    os.environ["FAKE_CLAUDE_LATENCY"] = str(args.latency)
+    os.environ["FAKE_CLAUDE_OUTPUT_CHARS"] = str(args.output_chars)
+    os.environ["FAKE_CLAUDE_FAILURE_RATE"] = str(args.failure_rate)
+
+    # Simulated failures are logged with tracebacks, keep benchmark output readable
+    logging.disable(logging.CRITICAL)
+
+    results = [
+        asyncio.run(bench_chat(args.runs, args.concurrency, streaming=False)),
+        asyncio.run(bench_chat(args.runs, args.concurrency, streaming=True)),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        results.extend(bench_digests(args.runs, args.concurrency, Path(tmp)))
+
+    print(f"{'benchmark':<22} {'runs':>5} {'fail':>5} {'runs/s':>8} {'p50 s':>8} {'p99 s':>8} {'peak MB':>8}")
+    for entry in results:
+        print(f"{entry['name']:<22} {entry['runs']:>5} {entry['failures']:>5} {entry['throughput']:>8.2f} "
+              f"{entry['p50']:>8.3f} {entry['p99']:>8.3f} {entry['peak_python_mb']:>8.2f}")
+
+    rusage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "config": {
+            "runs": args.runs,
+            "concurrency": args.concurrency,
+            "latency": args.latency,
+            "output_chars": args.output_chars,
+            "failure_rate": args.failure_rate,
+        },
+        "max_rss_kb": rusage.ru_maxrss,
+        "max_child_rss_kb": children.ru_maxrss,
+        "results": results,
+    }
+
+    output = args.output or DEFAULT_OUTPUT_DIR / f"pipelines-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nMax RSS: {rusage.ru_maxrss / 1024:.1f} MB (children: {children.ru_maxrss / 1024:.1f} MB)")
+    print(f"📁 Results saved to {output}")
+
+    if args.baseline:
+        if not compare(results, json.loads(args.baseline.read_text()), args.max_regression):
+            print(f"❌ p50 regression above {args.max_regression:.0%}")
+            sys.exit(1)
+        print("✅ No regression against baseline")
+
+
+if __name__ == "__main__":
+    main()
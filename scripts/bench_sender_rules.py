@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# ABOUTME: Benchmark of the compiled sender whitelist against the old linear substring scan
+# ABOUTME: Generates thousands of rules and From headers, checks both agree and reports messages per second
+
+"""
+Sender Rules Benchmark
+
+Usage:
+  python scripts/bench_sender_rules.py
+  python scripts/bench_sender_rules.py --rules 100 1000 5000 --messages 20000
+"""
+
+import sys
+import argparse
+import random
+import re
+import string
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.newsletter.sender_rules import SenderRules
+
+
+def legacy_allows(entries: list[str], sender: str) -> bool:
+    """Previous implementation: one substring check per whitelist entry."""
+    sender_lower = sender.lower()
+    return any(entry in sender_lower for entry in entries)
+
+
+def word(rng: random.Random, low: int = 4, high: int = 10) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(low, high)))
+
+
+def make_rules(rng: random.Random, count: int) -> list[str]:
+    """Mix of full addresses, @domains and bare names, like a grown senders.json."""
+    rules = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            rules.append(f"{word(rng)}@{word(rng)}.com")
+        elif kind < 0.9:
+            rules.append(f"@{word(rng)}.pl")
+        else:
+            rules.append(word(rng, 6, 12))
+    return rules
+
+
+def make_senders(rng: random.Random, rules: list[str], count: int, hit_rate: float) -> list[str]:
+    senders = []
+    for _ in range(count):
+        if rules and rng.random() < hit_rate:
+            rule = rng.choice(rules)
+            address = rule if "@" in rule and not rule.startswith("@") else f"{word(rng)}{rule if rule.startswith('@') else '@' + rule + '.io'}"
+        else:
+            address = f"{word(rng)}@{word(rng)}.net"
+        senders.append(f"{word(rng).title()} {word(rng).title()} <{address}>")
+    return senders
+
+
+def timed(func, senders: list[str]) -> tuple[float, list[bool]]:
+    start = time.perf_counter()
+    results = [func(sender) for sender in senders]
+    return time.perf_counter() - start, results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark compiled sender whitelist')
+    parser.add_argument('--rules', type=int, nargs='+', default=[10, 100, 1000, 5000], help='Whitelist sizes')
+    parser.add_argument('--messages', type=int, default=10000, help='From headers checked per size')
+    parser.add_argument('--hit-rate', type=float, default=0.2, help='Share of whitelisted senders')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'rules':>6} {'compile ms':>11} {'legacy msg/s':>13} {'regex msg/s':>12} {'compiled msg/s':>15} {'speedup':>8}")
+    for count in args.rules:
+        rules = make_rules(rng, count)
+        senders = make_senders(rng, rules, args.messages, args.hit_rate)
+
+        start = time.perf_counter()
+        compiled = SenderRules(rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+        alternation = re.compile("|".join(re.escape(rule) for rule in rules))
+
+        legacy_s, expected = timed(lambda s: legacy_allows(rules, s), senders)
+        regex_s, via_regex = timed(lambda s: alternation.search(s.lower()) is not None, senders)
+        compiled_s, actual = timed(compiled.allows, senders)
+
+        if actual != expected or via_regex != expected:
+            print(f"❌ Results differ from the legacy whitelist at {count} rules")
+            sys.exit(1)
+
+        n = len(senders)
+        print(f"{count:>6} {compile_ms:>11.1f} {n / legacy_s:>13.0f} {n / regex_s:>12.0f} "
+              f"{n / compiled_s:>15.0f} {legacy_s / compiled_s:>7.1f}x")
+
+    print("\n✅ Compiled rules agree with the legacy whitelist")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# ABOUTME: Micro-benchmark for the Telegram message splitter on multi-megabyte outputs
+# ABOUTME: Compares against the old re-slicing splitter and checks that time grows linearly with size
+
+"""
+Splitter Benchmark
+
+Usage:
+  python scripts/bench_splitter.py
+  python scripts/bench_splitter.py --sizes 1 2 4 8 --repeat 5
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.formatter import split_long_message
+
+SAMPLE_BLOCK = (
+    "## Section\n\n"
+    "Claude explains the change in a couple of sentences that wrap over several words "
+    "and end with a full stop.\n\n"
+    "```python\n"
+    "def handler(message):\n"
+    "    return message.text.upper()\n"
+    "```\n\n"
+    "- bullet one\n- bullet two\n\n"
+)
+
+
+def legacy_split(text: str, max_length: int = 4096) -> list[str]:
+    """Previous implementation: re-slices the remaining text on every chunk."""
+    if len(text) <= max_length:
+        return [text]
+    chunks = []
+    while text:
+        chunks.append(text[:max_length])
+        text = text[max_length:]
+    return chunks
+
+
+def make_text(megabytes: float) -> str:
+    target = int(megabytes * 1024 * 1024)
+    return (SAMPLE_BLOCK * (target // len(SAMPLE_BLOCK) + 1))[:target]
+
+
+def best_time(func, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark message splitter scaling')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1, 2, 4, 8], help='Input sizes in MB')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size (best is reported)')
+    parser.add_argument('--max-ratio', type=float, default=1.5,
+                        help='Fail if per-MB time of the largest input exceeds smallest by this factor')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    per_mb = []
+
+    print(f"{'size MB':>8} {'chunks':>8} {'new s':>10} {'new s/MB':>10} {'legacy s':>10}")
+    for size in args.sizes:
+        text = make_text(size)
+        new = best_time(split_long_message, text, args.repeat)
+        legacy = best_time(legacy_split, text, args.repeat)
+        chunks = len(split_long_message(text))
+        per_mb.append(new / size)
+        print(f"{size:>8.1f} {chunks:>8} {new:>10.4f} {new / size:>10.4f} {legacy:>10.4f}")
+
+    ratio = per_mb[-1] / per_mb[0]
+    print(f"\nPer-MB time ratio (largest/smallest): {ratio:.2f}")
+
+    if ratio > args.max_ratio:
+        print(f"❌ Splitter does not scale linearly (ratio > {args.max_ratio})")
+        sys.exit(1)
+    print("✅ Linear scaling")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# ABOUTME: Offline stand-in for the claude CLI used by tests and benchmarks
+# ABOUTME: Emits json, stream-json or text output with tunable latency, size and failure rate
+
+"""
+Fake Claude CLI
+
+Accepts the same arguments the bot passes to the real binary and
+behaves like it without any network access. Point the bot at it with:
+
+  CLAUDE_BIN="python3 scripts/fake_claude.py"
+
+Tuning (environment variables):
+  FAKE_CLAUDE_LATENCY        Total seconds per run (default 0.05)
+  FAKE_CLAUDE_FIRST_OUTPUT   Seconds before first streamed text (default: 20% of latency)
+  FAKE_CLAUDE_OUTPUT_CHARS   Length of the generated reply (default 800)
+  FAKE_CLAUDE_CHUNKS         Number of stream-json text deltas (default 20)
+  FAKE_CLAUDE_FAILURE_RATE   Probability of exiting with an error (default 0)
+  FAKE_CLAUDE_NO_CONTENT     Reply NO_NEW_CONTENT in text and json mode (blog fetch "nothing new")
+  FAKE_CLAUDE_SEED           Seed making failures reproducible per prompt
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+LOREM = (
+    "Frank checked the repository and found the following. "
+    "The change is small, the tests pass and the deployment is green. "
+)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Fake claude CLI")
+    parser.add_argument("-p", "--print", dest="prompt", default="")
+    parser.add_argument("--output-format", default="text", choices=["text", "json", "stream-json"])
+    parser.add_argument("--resume", default=None)
+    parser.add_argument("--allowedTools", default=None)
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--include-partial-messages", action="store_true")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
+def env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def make_reply(prompt: str, size: int) -> str:
+    header = f"Re: {prompt[:40]}\n\n"
+    body = (LOREM * (size // len(LOREM) + 1))[:max(0, size - len(header))]
+    return header + body
+
+
+def emit(event: dict) -> None:
+    sys.stdout.write(json.dumps(event) + "\n")
+    sys.stdout.flush()
+
+
+def usage_for(prompt: str, reply: str) -> dict:
+    return {"input_tokens": len(prompt) // 4, "output_tokens": len(reply) // 4}
+
+
+def cost_for(prompt: str, reply: str) -> float:
+    # Rough Sonnet-like pricing: $3 / $15 per million input / output tokens
+    return (len(prompt) // 4 * 3 + len(reply) // 4 * 15) / 1_000_000
+
+
+def run_stream(args, reply: str, session_id: str, latency: float, first_output: float, chunks: int) -> None:
+    emit({"type": "system", "subtype": "init", "session_id": session_id})
+    time.sleep(first_output)
+
+    chunks = max(1, chunks)
+    step = max(1, -(-len(reply) // chunks))
+    pieces = [reply[i:i + step] for i in range(0, len(reply), step)] or [""]
+    pause = max(0.0, latency - first_output) / len(pieces)
+
+    for piece in pieces:
+        if args.include_partial_messages:
+            emit({
+                "type": "stream_event",
+                "session_id": session_id,
+                "event": {"type": "content_block_delta", "delta": {"type": "text_delta", "text": piece}},
+            })
+        time.sleep(pause)
+
+    emit({
+        "type": "assistant",
+        "session_id": session_id,
+        "message": {"content": [{"type": "text", "text": reply}], "usage": usage_for(args.prompt, reply)},
+    })
+    emit({
+        "type": "result",
+        "subtype": "success",
+        "is_error": False,
+        "result": reply,
+        "session_id": session_id,
+        "duration_ms": int(latency * 1000),
+        "usage": usage_for(args.prompt, reply),
+        "total_cost_usd": cost_for(args.prompt, reply),
+    })
+
+
+def main(argv=None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    latency = env_float("FAKE_CLAUDE_LATENCY", 0.05)
+    first_output = min(latency, env_float("FAKE_CLAUDE_FIRST_OUTPUT", latency * 0.2))
+    size = int(env_float("FAKE_CLAUDE_OUTPUT_CHARS", 800))
+    chunks = int(env_float("FAKE_CLAUDE_CHUNKS", 20))
+    failure_rate = env_float("FAKE_CLAUDE_FAILURE_RATE", 0.0)
+    seed = os.getenv("FAKE_CLAUDE_SEED")
+
+    rng = random.Random(f"{seed}:{args.prompt}" if seed else None)
+    if rng.random() < failure_rate:
+        time.sleep(latency / 2)
+        sys.stderr.write("Error: simulated Claude failure\n")
+        return 1
+
+    session_id = args.resume or str(uuid.uuid4())
+
+    no_content = os.getenv("FAKE_CLAUDE_NO_CONTENT") and args.output_format != "stream-json"
+    reply = "NO_NEW_CONTENT" if no_content else make_reply(args.prompt, size)
+
+    if args.output_format == "stream-json":
+        run_stream(args, reply, session_id, latency, first_output, chunks)
+        return 0
+
+    time.sleep(latency)
+    if args.output_format == "json":
+        print(json.dumps({
+            "type": "result",
+            "subtype": "success",
+            "is_error": False,
+            "result": reply,
+            "session_id": session_id,
+            "duration_ms": int(latency * 1000),
+            "usage": usage_for(args.prompt, reply),
+            "total_cost_usd": cost_for(args.prompt, reply),
+        }))
+    else:
+        print(reply)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
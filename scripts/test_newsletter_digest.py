@@ -24,7 +24,11 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.newsletter.processor import NewsletterProcessor
-from src.config import IMAP_HOST, IMAP_PORT, IMAP_USER, IMAP_PASSWORD, TELEGRAM_BOT_TOKEN, ALLOWED_USER_ID, NEWSLETTER_SENDERS_FILE
+from src.config import (
+    IMAP_HOST, IMAP_PORT, IMAP_USER, IMAP_PASSWORD, IMAP_FETCH_BATCH, IMAP_SERVER_FILTER, IMAP_STORE_PATH,
+    IMAP_MAILBOXES, IMAP_CONNECTIONS, NEWSLETTER_CONVERT_WORKERS, NEWSLETTER_HTML_BACKEND, NEWSLETTER_HTML_SLIM,
+    TELEGRAM_BOT_TOKEN, ALLOWED_USER_ID, NEWSLETTER_SENDERS_FILE
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -86,7 +90,15 @@ def main():
             imap_port=IMAP_PORT,
             imap_user=IMAP_USER,
             imap_password=IMAP_PASSWORD,
-            senders_file=NEWSLETTER_SENDERS_FILE
+            senders_file=NEWSLETTER_SENDERS_FILE,
+            fetch_batch_size=IMAP_FETCH_BATCH,
+            server_filter=IMAP_SERVER_FILTER,
+            store_path=IMAP_STORE_PATH,
+            mailboxes=IMAP_MAILBOXES,
+            connections=IMAP_CONNECTIONS,
+            convert_workers=NEWSLETTER_CONVERT_WORKERS,
+            html_backend=NEWSLETTER_HTML_BACKEND,
+            html_slim=NEWSLETTER_HTML_SLIM
         )
 
         # Run processing
@@ -3,12 +3,15 @@
 
 import json
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any
 
+from src import metrics
 from src.blog.runner import BlogRunner
 from src.blog.summarizer import BlogSummarizer
+from src.shutdown import JobStopped, check_stop
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +25,14 @@ class BlogProcessor:
         self.runner = BlogRunner()
         self.summarizer = BlogSummarizer()
 
-    def process(self) -> Dict[str, Any]:
+    def process(self, max_items: int | None = None, stop: threading.Event | None = None) -> Dict[str, Any]:
         """
         Run complete blog scraping pipeline.
 
+        Args:
+            max_items: Fetch only the first this many sources (None = all)
+            stop: Event checked between blogs, also kills the running Claude call
+
         Returns:
             Dict with:
             {
@@ -35,12 +42,18 @@ class BlogProcessor:
                 "summary": str,
                 "error": str (if failed)
             }
+
+        Raises:
+            JobStopped: If stop was set before the pipeline finished
         """
         try:
             if not self.sources_file.exists():
                 raise FileNotFoundError(f"Blog sources file not found: {self.sources_file}")
 
             sources = json.loads(self.sources_file.read_text())["sources"]
+            if max_items is not None and len(sources) > max_items:
+                logger.info(f"Downscaled digest: fetching {max_items} of {len(sources)} blogs")
+                sources = sources[:max_items]
 
             week_num = datetime.now().isocalendar()[1]
             year = datetime.now().year
@@ -50,14 +63,19 @@ class BlogProcessor:
 
             saved = []
             for source in sources:
+                check_stop(stop, f"fetching {source['name']}")
                 try:
-                    path = self.runner.fetch_blog(
-                        url=source["url"],
-                        name=source["name"],
-                        output_dir=output_dir
-                    )
+                    with metrics.span("blog_fetch", blog=source["name"]):
+                        path = self.runner.fetch_blog(
+                            url=source["url"],
+                            name=source["name"],
+                            output_dir=output_dir,
+                            stop=stop
+                        )
                     if path:
                         saved.append(path)
+                except JobStopped:
+                    raise
                 except Exception as e:
                     logger.error(f"Failed to fetch {source['url']}: {e}")
 
@@ -69,7 +87,9 @@ class BlogProcessor:
                     "summary": "No new blog posts this week."
                 }
 
-            summary = self.summarizer.summarize(output_dir)
+            check_stop(stop, "the blog summary")
+            with metrics.span("blog_summary"):
+                summary = self.summarizer.summarize(output_dir, stop=stop)
 
             return {
                 "success": True,
@@ -78,6 +98,9 @@ class BlogProcessor:
                 "summary": summary
             }
 
+        except JobStopped:
+            logger.info("Blog processing stopped")
+            raise
         except Exception as e:
             logger.error(f"Blog processing failed: {e}", exc_info=True)
             return {
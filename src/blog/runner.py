@@ -1,11 +1,15 @@
 # ABOUTME: Runs Claude CLI per blog URL to fetch and summarize recent posts
 # ABOUTME: Returns None when no new content, saves markdown file when content found
 
-import subprocess
 import logging
 import re
+import threading
 from pathlib import Path
 
+from src.executor import CLAUDE_COMMAND, run_claude_process
+from src.usage import parse_text_output, usage_ledger
+from src.worker_pool import claude_pool, Lane
+
 logger = logging.getLogger(__name__)
 
 NO_NEW_CONTENT_MARKER = "NO_NEW_CONTENT"
@@ -17,7 +21,14 @@ class BlogRunner:
     def __init__(self, prompt_file: str = ".claude/prompts/blog_fetch_prompt.md"):
         self.prompt_file = Path(prompt_file)
 
-    def fetch_blog(self, url: str, name: str, output_dir: Path, timeout: int = 300) -> Path | None:
+    def fetch_blog(
+        self,
+        url: str,
+        name: str,
+        output_dir: Path,
+        timeout: int = 300,
+        stop: threading.Event | None = None
+    ) -> Path | None:
         """
         Fetch recent posts from a blog using Claude.
 
@@ -26,9 +37,13 @@ class BlogRunner:
             name: Human-readable blog name
             output_dir: Directory to save result markdown
             timeout: Max execution time in seconds
+            stop: Event that kills the Claude run once set
 
         Returns:
             Path to saved markdown file, or None if no new content
+
+        Raises:
+            JobStopped: If stop was set
         """
         if not self.prompt_file.exists():
             raise FileNotFoundError(f"Prompt file not found: {self.prompt_file}")
@@ -43,23 +58,25 @@ class BlogRunner:
 
         logger.info(f"Fetching blog: {name} ({url})")
 
-        result = subprocess.run(
-            [
-                "claude", "-p", full_prompt,
-                "--allowedTools", "WebFetch,WebSearch,Read,Write",
-                "--output-format", "text"
-            ],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=str(Path.cwd())
-        )
+        with claude_pool.slot_sync(Lane.SCHEDULED, f"blog-fetch:{name}"):
+            result = run_claude_process(
+                [
+                    *CLAUDE_COMMAND, "-p", full_prompt,
+                    "--allowedTools", "WebFetch,WebSearch,Read,Write",
+                    "--output-format", "json"
+                ],
+                timeout=timeout,
+                stop=stop,
+                cwd=str(Path.cwd())
+            )
 
         if result.returncode != 0:
             logger.error(f"Claude failed for {url}: {result.stderr}")
             raise Exception(f"Claude execution failed: {result.stderr}")
 
-        output = result.stdout.strip()
+        output, usage = parse_text_output(result.stdout)
+        usage_ledger.record("blog-fetch", usage)
+        output = output.strip()
 
         if NO_NEW_CONTENT_MARKER in output:
             logger.info(f"No new content for {name}")
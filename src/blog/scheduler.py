@@ -4,9 +4,15 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
+from src.delivery import delivery_queue
+from src.shutdown import ShuttingDown, run_stoppable, shutdown_coordinator
+from src.usage import Admission, usage_ledger
+from src.worker_pool import Lane
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +35,7 @@ class BlogScheduler:
         self.schedule_minute = schedule_minute
         self.processor_factory = processor_factory
         self._task: Optional[asyncio.Task] = None
+        self._deferred = False
 
     def _calculate_next_run(self, now: datetime) -> datetime:
         current_weekday = now.weekday()
@@ -53,8 +60,22 @@ class BlogScheduler:
         from src.config import BLOG_SOURCES_FILE
         return BlogProcessor(sources_file=BLOG_SOURCES_FILE)
 
-    async def start(self):
-        """Start the scheduler loop."""
+    async def start(self, resume: bool = False):
+        """
+        Start the scheduler loop.
+
+        Args:
+            resume: Run the digest right away (it was cut off by a restart)
+        """
+        if resume:
+            logger.info("Resuming blog digest interrupted by the last shutdown")
+            try:
+                await self._run_until_admitted()
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                logger.error(f"Resumed blog digest failed: {e}", exc_info=True)
+
         logger.info(f"Starting blog scheduler (day={self.schedule_day}, hour={self.schedule_hour}:{self.schedule_minute:02d})")
 
         while True:
@@ -65,7 +86,7 @@ class BlogScheduler:
 
                 logger.info(f"Next blog digest: {next_run} ({wait_seconds/3600:.1f}h from now)")
                 await asyncio.sleep(wait_seconds)
-                await self._run_digest()
+                await self._run_until_admitted()
 
             except asyncio.CancelledError:
                 logger.info("Blog scheduler cancelled")
@@ -74,37 +95,79 @@ class BlogScheduler:
                 logger.error(f"Blog scheduler error: {e}", exc_info=True)
                 await asyncio.sleep(3600)
 
-    async def _run_digest(self):
-        """Execute blog processing and send Telegram digest."""
+    async def _run_until_admitted(self):
+        """Run digest, retrying deferred runs until the next regular run is due."""
+        while not await self._run_tracked():
+            delay = usage_ledger.policy.defer_seconds
+            if datetime.now() + timedelta(seconds=delay) >= self._calculate_next_run(datetime.now()):
+                logger.warning("Blog digest skipped: over budget until next scheduled run")
+                self._deferred = False
+                return
+            logger.info(f"Blog digest deferred for {delay / 3600:.1f}h (budget)")
+            await asyncio.sleep(delay)
+
+    async def _run_tracked(self) -> bool:
+        """Run the digest as a journaled job, so a restart mid-run resumes it."""
+        try:
+            async with shutdown_coordinator.job("blog", self.user_id):
+                return await self._run_digest()
+        except ShuttingDown:
+            logger.info("Blog digest not started, shutting down")
+            return True
+
+    async def _run_digest(self) -> bool:
+        """
+        Execute blog processing and send Telegram digest.
+
+        Returns:
+            False if the run was deferred for budget reasons, True otherwise
+        """
         logger.info("Starting blog digest processing...")
 
         try:
+            decision = usage_ledger.admit(Lane.SCHEDULED)
+            if decision is Admission.DEFER:
+                if not self._deferred:
+                    await self._send("⏸ Blog digest odłożony - budżet Claude prawie wyczerpany (/usage)")
+                self._deferred = True
+                return False
+            self._deferred = False
+            max_items = usage_ledger.policy.downscale_limit if decision is Admission.DOWNSCALE else None
+
             processor = self._create_processor()
-            result = processor.process()
+            result = await run_stoppable(processor.process, max_items=max_items)
 
             if result["success"]:
                 summary = result["summary"]
                 blog_count = result["blog_count"]
 
                 header = f"📰 Tech Blog Digest - {blog_count} blogów z ostatniego tygodnia\n\n"
+                if max_items is not None:
+                    header += f"(Ograniczony budżet: sprawdzono tylko {max_items} blogów)\n\n"
                 message = header + summary
 
                 from src.formatter import split_long_message
                 for chunk in split_long_message(message):
-                    await self.bot.send_message(self.user_id, chunk)
+                    await self._send(chunk)
 
                 logger.info("Blog digest sent successfully")
             else:
                 error_msg = f"❌ Blog digest failed: {result.get('error', 'Unknown error')}"
-                await self.bot.send_message(self.user_id, error_msg)
+                await self._send(error_msg)
 
         except Exception as e:
             logger.error(f"Blog digest error: {e}", exc_info=True)
             try:
-                await self.bot.send_message(self.user_id, f"❌ Blog digest error: {e}")
+                await self._send(f"❌ Blog digest error: {e}")
             except Exception:
                 pass
 
+        return True
+
+    async def _send(self, text: str):
+        """Send message to the user through the rate-limited delivery queue."""
+        await delivery_queue.deliver(self.user_id, partial(self.bot.send_message, self.user_id, text))
+
     def stop(self):
         if self._task:
             self._task.cancel()
@@ -1,10 +1,14 @@
 # ABOUTME: Runs Claude CLI to summarize all blog posts collected in a folder
 # ABOUTME: Analogous to newsletter ClaudeRunner but for tech blogs
 
-import subprocess
 import logging
+import threading
 from pathlib import Path
 
+from src.executor import CLAUDE_COMMAND, run_claude_process
+from src.usage import parse_text_output, usage_ledger
+from src.worker_pool import claude_pool, Lane
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,19 +18,21 @@ class BlogSummarizer:
     def __init__(self, prompt_file: str = ".claude/prompts/blog_summary_prompt.md"):
         self.prompt_file = Path(prompt_file)
 
-    def summarize(self, folder: Path, timeout: int = 300) -> str:
+    def summarize(self, folder: Path, timeout: int = 300, stop: threading.Event | None = None) -> str:
         """
         Analyze all blog markdown files in folder and produce a summary.
 
         Args:
             folder: Path containing per-blog .md files
             timeout: Max execution time in seconds
+            stop: Event that kills the Claude run once set
 
         Returns:
             Summary text
 
         Raises:
             ValueError: If folder has no blog markdown files
+            JobStopped: If stop was set
             Exception: If Claude execution fails
         """
         md_files = [f for f in folder.glob("*.md") if f.name != "summary.md"]
@@ -41,24 +47,27 @@ class BlogSummarizer:
 
         logger.info(f"Running blog summary on {folder} ({len(md_files)} files)")
 
-        result = subprocess.run(
-            [
-                "claude", "-p", full_prompt,
-                "--allowedTools", "Read,Glob,Write",
-                "--output-format", "text"
-            ],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=str(Path.cwd())
-        )
+        with claude_pool.slot_sync(Lane.SCHEDULED, "blog-summary"):
+            result = run_claude_process(
+                [
+                    *CLAUDE_COMMAND, "-p", full_prompt,
+                    "--allowedTools", "Read,Glob,Write",
+                    "--output-format", "json"
+                ],
+                timeout=timeout,
+                stop=stop,
+                cwd=str(Path.cwd())
+            )
 
         if result.returncode != 0:
             logger.error(f"Claude summarizer failed: {result.stderr}")
             raise Exception(f"Claude execution failed: {result.stderr}")
 
+        output, usage = parse_text_output(result.stdout)
+        usage_ledger.record("blog-summary", usage)
+
         summary_path = folder / "summary.md"
         if summary_path.exists():
             return summary_path.read_text(encoding="utf-8")
 
-        return result.stdout
+        return output
@@ -2,11 +2,21 @@
 # ABOUTME: Receives messages, validates users, executes Claude prompts, returns formatted responses
 
 import logging
+import time
+from functools import partial
 from aiogram import types
-from src.config import ALLOWED_USER_ID
-from src.executor import execute_claude
+from src import metrics
+from src.cancellation import JobCancelled, cancel_registry
+from src.coalescer import MessageCoalescer
+from src.config import ALLOWED_USER_ID, CLAUDE_TIMEOUT, CLAUDE_STREAMING, COALESCE_WINDOW_MS
+from src.delivery import delivery_queue
+from src.executor import execute_claude_async, stream_claude
 from src.formatter import remove_ansi_codes, split_long_message
-from src.session import get_session, save_session, clear_session
+from src.session import get_session, get_carryover, save_session, record_turn, clear_session
+from src.shutdown import ShuttingDown, shutdown_coordinator
+from src.streaming import StreamingReply
+from src.usage import Admission, RunUsage, usage_ledger
+from src.worker_pool import claude_pool, Lane
 
 logger = logging.getLogger(__name__)
 
@@ -16,32 +26,88 @@ def is_authorized(message: types.Message) -> bool:
     return message.from_user.id == ALLOWED_USER_ID
 
 
+async def _reply(message: types.Message, text: str) -> types.Message:
+    """Answer a message through the rate-limited delivery queue."""
+    return await delivery_queue.deliver(message.chat.id, partial(message.answer, text))
+
+
 async def handle_message(message: types.Message):
     """Handle incoming text messages."""
     if not is_authorized(message):
-        await message.answer("Unauthorized")
+        await _reply(message, "Unauthorized")
         return
 
-    # Send thinking status
-    await message.answer("Frank myśli...")
+    # Rapid-fire messages are merged into a single Claude turn
+    await _coalescer.submit(message.from_user.id, message)
+
+
+async def _run_turn(user_id: int, messages: list[types.Message]):
+    """Run one Claude turn for a batch of coalesced messages, drained on shutdown."""
+    # Reply to the latest message of the batch
+    message = messages[-1]
+    prompt = "\n\n".join(m.text for m in messages)
 
     try:
-        user_id = message.from_user.id
-        prompt = message.text
+        # Journaled while running, so a restart can tell the user the reply was lost
+        async with shutdown_coordinator.job("chat", user_id, chat_id=message.chat.id, prompt=prompt[:500]):
+            await _answer(user_id, message, prompt)
+    except ShuttingDown:
+        await _reply(message, "🔄 Frank się restartuje, wyślij wiadomość ponownie za chwilę.")
+
+
+async def _answer(user_id: int, message: types.Message, prompt: str):
+    """Ask Claude and deliver the answer as a reply to message."""
+    started = time.perf_counter()
+
+    # Digests give way first, chat stops only once the budget is exhausted
+    if usage_ledger.admit(Lane.INTERACTIVE) is Admission.REJECT:
+        await _reply(message, "Budżet Claude został wyczerpany. Szczegóły: /usage")
+        return
 
-        # Get existing session if any
+    # Send thinking status (edited in place when streaming)
+    status = await _reply(message, "Frank myśli...")
+
+    try:
+        # Get existing session if any, a rotated session hands over its summary
         session_id = get_session(user_id)
+        carryover = None if session_id else get_carryover(user_id)
+        claude_prompt = f"{carryover}\n\n---\n\n{prompt}" if carryover else prompt
 
         # Execute Claude with session continuity
         logger.info(f"Executing Claude with prompt: {prompt[:50]}...")
-        result_text, new_session_id = execute_claude(prompt, session_id)
+        usage: list[RunUsage] = []
+        # /cancel unwinds this scope: the process group is killed and the slot released
+        async with cancel_registry.scope(user_id, "chat"):
+            async with claude_pool.slot(Lane.INTERACTIVE, f"chat:{user_id}"):
+                if CLAUDE_STREAMING:
+                    reply = StreamingReply(message, status)
+                    result_text, new_session_id = await stream_claude(
+                        claude_prompt, session_id, timeout=CLAUDE_TIMEOUT, on_text=reply.append, on_usage=usage.append
+                    )
+                else:
+                    reply = None
+                    result_text, new_session_id = await execute_claude_async(
+                        claude_prompt, session_id, timeout=CLAUDE_TIMEOUT, on_usage=usage.append
+                    )
+
+        run_usage = usage[-1] if usage else None
+        usage_ledger.record("chat", run_usage)
 
         # Save new session ID for future messages
         if new_session_id:
             save_session(user_id, new_session_id)
+            # Only stream-json reports the context size, otherwise the session keeps its estimate
+            if run_usage and run_usage.context_tokens is not None:
+                record_turn(user_id, claude_prompt, result_text, context_tokens=run_usage.context_tokens)
+            else:
+                record_turn(user_id, claude_prompt, result_text)
 
         if not result_text:
-            await message.answer("Error: Claude returned no output")
+            await _reply(message, "Error: Claude returned no output")
+            return
+
+        if reply:
+            await reply.finish(result_text)
             return
 
         # Format and send response
@@ -49,19 +115,77 @@ async def handle_message(message: types.Message):
         chunks = split_long_message(clean_output)
 
         for chunk in chunks:
-            await message.answer(chunk)
+            await _reply(message, chunk)
+
+    except JobCancelled:
+        # Session is left untouched, the next message resumes the previous turn
+        logger.info(f"Turn cancelled by user {user_id}")
+        await _reply(message, "⏹ Anulowano.")
 
     except Exception as e:
         logger.error(f"Execution error: {e}", exc_info=True)
-        await message.answer(f"Execution error: {str(e)}")
+        await _reply(message, f"Execution error: {str(e)}")
+
+    finally:
+        metrics.observe("chat_turn", time.perf_counter() - started)
+
+
+_coalescer = MessageCoalescer(_run_turn, window=COALESCE_WINDOW_MS / 1000)
+
+
+async def report_interrupted_turns(bot, entries: list) -> None:
+    """
+    Tell users which replies were lost when the bot last stopped.
+
+    Args:
+        bot: Bot to send the notices with
+        entries: Journal entries recovered on start-up (non-chat ones are skipped)
+    """
+    for entry in entries:
+        if entry.kind != "chat":
+            continue
+        chat_id = entry.payload.get("chat_id", entry.user_id)
+        prompt = entry.payload.get("prompt", "")
+        text = (f"⚠️ Restart przerwał odpowiedź na: „{prompt[:200]}”\n"
+                "Wyślij wiadomość ponownie, jeśli jest nadal aktualna.")
+        try:
+            await delivery_queue.deliver(chat_id, partial(bot.send_message, chat_id, text))
+        except Exception as e:
+            logger.error(f"Failed to report interrupted turn to {chat_id}: {e}")
 
 
 async def handle_new_command(message: types.Message):
     """Handle /new command to start fresh conversation."""
     if not is_authorized(message):
-        await message.answer("Unauthorized")
+        await _reply(message, "Unauthorized")
         return
 
     user_id = message.from_user.id
     clear_session(user_id)
-    await message.answer("Rozpoczynam nową konwersację. Historia została wyczyszczona.")
+    await _reply(message, "Rozpoczynam nową konwersację. Historia została wyczyszczona.")
+
+
+async def handle_usage_command(message: types.Message):
+    """Handle /usage command reporting Claude spend against the budget."""
+    if not is_authorized(message):
+        await _reply(message, "Unauthorized")
+        return
+
+    await _reply(message, usage_ledger.report())
+
+
+async def handle_cancel_command(message: types.Message):
+    """Handle /cancel command stopping the running Claude turn and queued messages."""
+    if not is_authorized(message):
+        await _reply(message, "Unauthorized")
+        return
+
+    user_id = message.from_user.id
+    dropped = _coalescer.discard(user_id)
+    cancelled = cancel_registry.cancel(user_id)
+
+    if not cancelled and not dropped:
+        await _reply(message, "Nic nie jest w toku.")
+    elif not cancelled:
+        await _reply(message, f"Anulowano {dropped} oczekujących wiadomości.")
+    # A cancelled turn confirms itself once the process is gone
@@ -0,0 +1,92 @@
+# ABOUTME: Registry of cancellable in-flight jobs keyed by user and job name
+# ABOUTME: /cancel cancels the job task; the scope turns that into JobCancelled so callers can tidy up
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised out of a job scope cancelled through the registry."""
+
+
+@dataclass
+class _Job:
+    """A running job and whether the registry cancelled it."""
+    task: asyncio.Task
+    cancelled: bool = False
+
+
+class CancellationRegistry:
+    """
+    Tracks running jobs so a user can stop them.
+
+    A job registers the task it runs in for the duration of a scope.
+    Cancelling it cancels the task, which unwinds everything awaited
+    inside the scope (subprocess kill, worker-pool slot release); the
+    scope then raises JobCancelled instead of CancelledError, the way
+    asyncio.timeout() turns its own cancellation into TimeoutError.
+    """
+
+    def __init__(self):
+        self._jobs: dict[tuple[int, str], _Job] = {}
+
+    def active(self, user_id: int) -> list[str]:
+        """Names of jobs currently running for a user."""
+        return [name for uid, name in self._jobs if uid == user_id]
+
+    @asynccontextmanager
+    async def scope(self, user_id: int, job: str):
+        """
+        Register the current task as a cancellable job.
+
+        Args:
+            user_id: User owning the job
+            job: Job name (chat, ...), one running job per user and name
+
+        Raises:
+            JobCancelled: If the job was cancelled through the registry
+        """
+        key = (user_id, job)
+        entry = _Job(asyncio.current_task())
+        self._jobs[key] = entry
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Only swallow our own cancellation, shutdown must still propagate
+            if entry.cancelled and entry.task.uncancel() == 0:
+                raise JobCancelled(f"{job} cancelled for user {user_id}") from None
+            raise
+        finally:
+            if self._jobs.get(key) is entry:
+                del self._jobs[key]
+
+    def cancel(self, user_id: int, job: str | None = None) -> list[str]:
+        """
+        Cancel running jobs of a user.
+
+        Args:
+            user_id: User whose jobs to cancel
+            job: Job name to cancel (None = all jobs of the user)
+
+        Returns:
+            Names of the jobs that were cancelled
+        """
+        cancelled = []
+        for (uid, name), entry in list(self._jobs.items()):
+            if uid != user_id or (job and name != job) or entry.cancelled:
+                continue
+            entry.cancelled = True
+            entry.task.cancel()
+            cancelled.append(name)
+
+        if cancelled:
+            logger.info(f"Cancelled jobs for user {user_id}: {', '.join(cancelled)}")
+        return cancelled
+
+
+# Process-wide registry shared by handlers and commands
+cancel_registry = CancellationRegistry()
@@ -0,0 +1,126 @@
+# ABOUTME: Per-user debounce that merges rapid-fire Telegram messages into one Claude turn
+# ABOUTME: Messages arriving while a turn runs are queued and folded into the next turn
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _UserQueue:
+    """Debounce state of a single user."""
+    pending: list = field(default_factory=list)
+    batch: Optional[asyncio.Future] = None
+    timer: Optional[asyncio.TimerHandle] = None
+    running: bool = False
+    last_arrival: float = 0.0
+
+
+class MessageCoalescer:
+    """Batches messages per user and runs one turn per batch, never two at once."""
+
+    def __init__(self, run_turn: Callable[[int, list[Any]], Awaitable[None]], window: float = 1.2):
+        """
+        Args:
+            run_turn: Coroutine processing a batch of messages for a user
+            window: Seconds to wait for follow-up messages before running
+        """
+        self.run_turn = run_turn
+        self.window = window
+        self._users: dict[int, _UserQueue] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def pending_count(self, user_id: int) -> int:
+        """Number of messages waiting for the next turn of a user."""
+        queue = self._users.get(user_id)
+        return len(queue.pending) if queue else 0
+
+    def discard(self, user_id: int) -> int:
+        """
+        Drop messages of a user that have not started a turn yet.
+
+        Handlers waiting on them return without a reply; a turn already
+        running is not affected.
+
+        Returns:
+            Number of dropped messages
+        """
+        queue = self._users.get(user_id)
+        if not queue or not queue.pending:
+            return 0
+
+        dropped, queue.pending = len(queue.pending), []
+        if queue.timer:
+            queue.timer.cancel()
+            queue.timer = None
+        if queue.batch and not queue.batch.done():
+            queue.batch.set_result(None)
+        queue.batch = None
+        if not queue.running:
+            del self._users[user_id]
+
+        logger.info(f"Dropped {dropped} pending messages of user {user_id}")
+        return dropped
+
+    async def submit(self, user_id: int, message: Any) -> None:
+        """Queue message and wait until the turn that includes it has finished."""
+        queue = self._users.setdefault(user_id, _UserQueue())
+        queue.pending.append(message)
+        queue.last_arrival = time.monotonic()
+        if queue.batch is None:
+            queue.batch = asyncio.get_running_loop().create_future()
+        batch = queue.batch
+
+        if queue.running:
+            logger.info(f"Turn in progress for user {user_id}, queued message ({len(queue.pending)} pending)")
+        else:
+            self._arm(user_id, queue, self.window)
+
+        # Shield so one cancelled handler does not cancel the shared batch
+        await asyncio.shield(batch)
+
+    def _arm(self, user_id: int, queue: _UserQueue, delay: float) -> None:
+        """(Re)start the debounce timer of a user."""
+        if queue.timer:
+            queue.timer.cancel()
+        queue.timer = asyncio.get_running_loop().call_later(delay, self._start, user_id)
+
+    def _start(self, user_id: int) -> None:
+        """Timer callback: hand the pending batch to a new turn."""
+        queue = self._users[user_id]
+        queue.timer = None
+        if queue.running or not queue.pending:
+            return
+
+        messages, queue.pending = queue.pending, []
+        batch, queue.batch = queue.batch, None
+        queue.running = True
+
+        if len(messages) > 1:
+            logger.info(f"Coalesced {len(messages)} messages from user {user_id} into one turn")
+        task = asyncio.get_running_loop().create_task(self._run(user_id, queue, messages, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, user_id: int, queue: _UserQueue, messages: list, batch: asyncio.Future) -> None:
+        try:
+            await self.run_turn(user_id, messages)
+            batch.set_result(None)
+        except asyncio.CancelledError:
+            batch.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Turn failed for user {user_id}: {e}", exc_info=True)
+            batch.set_exception(e)
+        finally:
+            queue.running = False
+            if queue.pending:
+                # Fold messages that arrived meanwhile into the next turn, honouring the window
+                elapsed = time.monotonic() - queue.last_arrival
+                self._arm(user_id, queue, max(0.0, self.window - elapsed))
+            else:
+                del self._users[user_id]
@@ -18,11 +18,85 @@ if not ALLOWED_USER_ID:
 
 ALLOWED_USER_ID = int(ALLOWED_USER_ID)
 
+# Max seconds for a single interactive Claude run (0 = no limit)
+CLAUDE_TIMEOUT = int(os.getenv("CLAUDE_TIMEOUT", "600")) or None
+
+# Stream replies via stream-json and live message edits instead of one final answer
+CLAUDE_STREAMING = os.getenv("CLAUDE_STREAMING", "true").lower() in ("1", "true", "yes")
+
+# Messages arriving within this window (ms) are merged into one Claude turn
+COALESCE_WINDOW_MS = int(os.getenv("COALESCE_WINDOW_MS", "1200"))
+
+# Max Claude processes running at once across chat and scheduled digests
+CLAUDE_MAX_CONCURRENCY = int(os.getenv("CLAUDE_MAX_CONCURRENCY", "2"))
+
+# Outbound Telegram pacing per chat (sustained messages/s and burst size)
+TELEGRAM_SEND_RATE = float(os.getenv("TELEGRAM_SEND_RATE", "1.0"))
+TELEGRAM_SEND_BURST = int(os.getenv("TELEGRAM_SEND_BURST", "3"))
+
+# Local Prometheus /metrics endpoint (0 = disabled)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# How updates arrive: "polling" (long polling) or "webhook" (aiohttp server)
+TELEGRAM_MODE = os.getenv("TELEGRAM_MODE", "polling").lower()
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram/webhook")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+
+if TELEGRAM_MODE not in ("polling", "webhook"):
+    raise ValueError(f"TELEGRAM_MODE must be 'polling' or 'webhook', got '{TELEGRAM_MODE}'")
+
+if TELEGRAM_MODE == "webhook" and not WEBHOOK_SECRET:
+    raise ValueError("WEBHOOK_SECRET not set in environment (required in webhook mode)")
+
+# Local state (sessions etc.) survives restarts in this directory
+DATA_DIR = Path(os.getenv("DATA_DIR", str(Path(__file__).parent.parent / "data")))
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite")  # sqlite | memory
+SESSION_DB_PATH = Path(os.getenv("SESSION_DB_PATH", str(DATA_DIR / "sessions.db")))
+
+# Session lifecycle: rotate long sessions (with a carried-over summary), expire idle ones
+SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "40"))
+SESSION_MAX_TOKENS = int(os.getenv("SESSION_MAX_TOKENS", "200000"))
+SESSION_IDLE_HOURS = float(os.getenv("SESSION_IDLE_HOURS", "12"))
+
+# Claude spend ledger and budget in USD (0 = unlimited); digests are downscaled,
+# then deferred as spend approaches the budget, chat stops only once it is exhausted
+USAGE_DB_PATH = Path(os.getenv("USAGE_DB_PATH", str(DATA_DIR / "usage.db")))
+BUDGET_DAILY_USD = float(os.getenv("BUDGET_DAILY_USD", "0"))
+BUDGET_WEEKLY_USD = float(os.getenv("BUDGET_WEEKLY_USD", "0"))
+BUDGET_DOWNSCALE_AT = float(os.getenv("BUDGET_DOWNSCALE_AT", "0.7"))
+BUDGET_DEFER_AT = float(os.getenv("BUDGET_DEFER_AT", "0.9"))
+BUDGET_DEFER_HOURS = float(os.getenv("BUDGET_DEFER_HOURS", "6"))
+BUDGET_DOWNSCALE_LIMIT = int(os.getenv("BUDGET_DOWNSCALE_LIMIT", "5"))
+
+# Graceful shutdown: seconds running Claude jobs get to finish, the rest is journaled
+# and resumed (digests) or reported (chat) on the next start
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", "60"))
+JOB_JOURNAL_PATH = Path(os.getenv("JOB_JOURNAL_PATH", str(DATA_DIR / "jobs.json")))
+
 # Newsletter digest configuration
 IMAP_HOST = os.getenv("IMAP_HOST")
 IMAP_PORT = int(os.getenv("IMAP_PORT", "993"))
 IMAP_USER = os.getenv("IMAP_USER")
 IMAP_PASSWORD = os.getenv("IMAP_PASSWORD")
+# Messages per UID FETCH round-trip
+IMAP_FETCH_BATCH = int(os.getenv("IMAP_FETCH_BATCH", "50"))
+# Let the server pre-filter by sender (SEARCH FROM terms built from senders.json)
+IMAP_SERVER_FILTER = os.getenv("IMAP_SERVER_FILTER", "false").lower() in ("1", "true", "yes")
+# Fetched newsletters and per-mailbox UID checkpoints, each run downloads only new mail
+IMAP_STORE_PATH = Path(os.getenv("IMAP_STORE_PATH", str(DATA_DIR / "newsletters.db")))
+# Mailboxes (folders or Gmail labels) to scan, comma-separated; several are scanned concurrently
+IMAP_MAILBOXES = [m.strip() for m in os.getenv("IMAP_MAILBOXES", "INBOX").split(",") if m.strip()]
+# Max IMAP connections open at once when scanning several mailboxes
+IMAP_CONNECTIONS = int(os.getenv("IMAP_CONNECTIONS", "3"))
+# Processes converting newsletter HTML to Markdown (0 = one per CPU core)
+NEWSLETTER_CONVERT_WORKERS = int(os.getenv("NEWSLETTER_CONVERT_WORKERS", "0")) or (os.cpu_count() or 1)
+# HTML to Markdown backend (html2text, lite) and whether newsletter HTML is slimmed before conversion
+NEWSLETTER_HTML_BACKEND = os.getenv("NEWSLETTER_HTML_BACKEND", "html2text")
+NEWSLETTER_HTML_SLIM = os.getenv("NEWSLETTER_HTML_SLIM", "true").lower() in ("1", "true", "yes")
 NEWSLETTER_SCHEDULE_DAY = int(os.getenv("NEWSLETTER_SCHEDULE_DAY", "6"))
 NEWSLETTER_SCHEDULE_HOUR = int(os.getenv("NEWSLETTER_SCHEDULE_HOUR", "20"))
 NEWSLETTER_SCHEDULE_MINUTE = int(os.getenv("NEWSLETTER_SCHEDULE_MINUTE", "0"))
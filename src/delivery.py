@@ -0,0 +1,178 @@
+# ABOUTME: Outbound Telegram delivery queue with per-chat token bucket pacing
+# ABOUTME: Keeps per-chat ordering, backs off on flood control (RetryAfter), tracks delivery latency
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from aiogram.exceptions import TelegramRetryAfter
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_RETRIES = metrics.registry.counter("frank_telegram_retries_total", "Flood-control back-offs")
+DELIVERY_FAILURES = metrics.registry.counter("frank_telegram_failures_total", "Telegram calls that failed for good")
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `burst` stored."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def take(self) -> None:
+        """Wait for and consume one token."""
+        while (wait := self.delay()) > 0:
+            await asyncio.sleep(wait)
+        self._tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        """Drain the bucket so the next send waits at least `seconds`."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+@dataclass
+class _Job:
+    send: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _Chat:
+    bucket: TokenBucket
+    jobs: deque = field(default_factory=deque)
+    worker: asyncio.Task | None = None
+
+
+class DeliveryQueue:
+    """Serialises all outbound Telegram calls per chat."""
+
+    def __init__(self, rate: float = 1.0, burst: int = 3, max_retries: int = 5):
+        """
+        Args:
+            rate: Sustained sends per second per chat
+            burst: Sends allowed back-to-back before pacing kicks in
+            max_retries: RetryAfter back-offs before giving up on a send
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self._chats: dict[Any, _Chat] = {}
+        self._delivered = 0
+        self._failed = 0
+        self._retries = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def configure(self, rate: float, burst: int) -> None:
+        """Set pacing for chats created from now on."""
+        self.rate = rate
+        self.burst = burst
+        logger.info(f"Delivery queue configured: {rate}/s per chat, burst {burst}")
+
+    def queue_depth(self) -> int:
+        """Number of sends waiting across all chats."""
+        return sum(len(chat.jobs) for chat in self._chats.values())
+
+    def stats(self) -> dict:
+        """Delivery counters and enqueue-to-delivered latency."""
+        return {
+            "delivered": self._delivered,
+            "failed": self._failed,
+            "retries": self._retries,
+            "queued": self.queue_depth(),
+            "avg_latency": self._latency_total / self._delivered if self._delivered else 0.0,
+            "max_latency": self._latency_max,
+        }
+
+    async def deliver(self, chat_id: Any, send: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Queue a Telegram call for a chat and wait until it is delivered.
+
+        Args:
+            chat_id: Chat the call targets (ordering and pacing key)
+            send: Zero-argument coroutine factory performing the call
+
+        Returns:
+            Whatever the Telegram call returned
+
+        Raises:
+            Exception: Error of the Telegram call once retries are exhausted
+        """
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = _Chat(bucket=TokenBucket(self.rate, self.burst))
+
+        job = _Job(send=send, future=asyncio.get_running_loop().create_future())
+        chat.jobs.append(job)
+
+        if chat.worker is None or chat.worker.done():
+            chat.worker = asyncio.create_task(self._drain(chat_id, chat))
+
+        return await job.future
+
+    async def _drain(self, chat_id: Any, chat: _Chat) -> None:
+        """Send queued jobs of a chat in order, exits once the queue is empty."""
+        while chat.jobs:
+            job = chat.jobs[0]
+            try:
+                result = await self._send_with_retry(chat_id, chat, job)
+            except Exception as e:
+                self._failed += 1
+                DELIVERY_FAILURES.inc()
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                latency = time.monotonic() - job.enqueued_at
+                self._delivered += 1
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+                metrics.observe("telegram_delivery", latency)
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                chat.jobs.popleft()
+
+    async def _send_with_retry(self, chat_id: Any, chat: _Chat, job: _Job) -> Any:
+        attempt = 0
+        while True:
+            await chat.bucket.take()
+            try:
+                with metrics.span("telegram_send"):
+                    return await job.send()
+            except TelegramRetryAfter as e:
+                attempt += 1
+                self._retries += 1
+                DELIVERY_RETRIES.inc()
+                if attempt > self.max_retries:
+                    logger.error(f"Giving up on delivery to {chat_id} after {attempt} flood-control retries")
+                    raise
+                logger.warning(f"Flood control for chat {chat_id}, retrying in {e.retry_after}s")
+                chat.bucket.pause(e.retry_after)
+
+
+# Process-wide queue shared by the bot handlers and digest schedulers
+delivery_queue = DeliveryQueue()
+
+metrics.registry.gauge("frank_telegram_queue_depth", "Telegram sends waiting for delivery", delivery_queue.queue_depth)
@@ -1,20 +1,96 @@
 # ABOUTME: Claude Code execution wrapper for running AI prompts via subprocess
-# ABOUTME: Handles subprocess calls to native Claude binary with error handling
+# ABOUTME: Provides blocking, asyncio and stream-json executors for the native Claude binary
 
+import asyncio
 import subprocess
 import logging
 import json
+import os
+import shlex
+import signal
+import threading
+import time
+from typing import Awaitable, Callable
+
+from src import metrics
+from src.shutdown import JobStopped
+from src.usage import RunUsage
 
 logger = logging.getLogger(__name__)
 
+CLAUDE_RUNS = metrics.registry.counter("frank_claude_runs_total", "Claude executions by mode and outcome")
+
+
+# Claude CLI invocation, overridable (e.g. with scripts/fake_claude.py for benchmarks)
+CLAUDE_COMMAND = shlex.split(os.getenv("CLAUDE_BIN", "claude"))
+
+# Seconds a killed claude process group gets to exit on SIGTERM before SIGKILL
+KILL_GRACE_SECONDS = 2.0
+
+# How often a blocking claude run checks whether its job was told to stop
+STOP_POLL_SECONDS = 0.5
+
+# Max size of a single stream-json line (final result event carries the whole reply)
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+
+def _build_command(prompt: str, session_id: str | None = None, output_format: str = "json") -> list[str]:
+    """Build claude CLI command, optionally resuming a session."""
+    cmd = [*CLAUDE_COMMAND, "-p", prompt, "--output-format", output_format]
+    if session_id:
+        logger.info(f"Resuming session: {session_id[:8]}...")
+        cmd.extend(["--resume", session_id])
+    return cmd
+
+
+def _parse_output(stdout: str) -> tuple[str, str, RunUsage | None]:
+    """
+    Parse JSON output of claude CLI.
+
+    Returns:
+        Tuple of (result_text, new_session_id, usage)
+
+    Raises:
+        ValueError: If JSON output cannot be parsed
+    """
+    try:
+        with metrics.span("claude_parse"):
+            response = json.loads(stdout)
+        result_text = response.get("result", "")
+        new_session_id = response.get("session_id", "")
+
+        if not new_session_id:
+            logger.warning("No session_id in Claude response")
+
+        logger.info(f"Parsed response: {len(result_text)} chars, session: {new_session_id[:8]}...")
+        return result_text, new_session_id, RunUsage.from_response(response)
+
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse Claude JSON output: {e}")
+        logger.error(f"Raw output: {stdout[:200]}...")
+        raise ValueError(f"Invalid JSON from Claude: {e}")
+
+
+def _report_usage(usage: RunUsage | None, on_usage: Callable[[RunUsage], None] | None) -> None:
+    """Hand usage of a finished run to the caller."""
+    if usage is None:
+        logger.debug("No usage in Claude response")
+    elif on_usage:
+        on_usage(usage)
 
-def execute_claude(prompt: str, session_id: str | None = None) -> tuple[str, str]:
+
+def execute_claude(
+    prompt: str,
+    session_id: str | None = None,
+    on_usage: Callable[[RunUsage], None] | None = None
+) -> tuple[str, str]:
     """
     Execute Claude Code with given prompt, optionally continuing a session.
 
     Args:
         prompt: User prompt to send to Claude
         session_id: Optional session ID to resume conversation
+        on_usage: Optional callback receiving tokens and cost of the run
 
     Returns:
         Tuple of (result_text, new_session_id)
@@ -25,36 +101,322 @@ def execute_claude(prompt: str, session_id: str | None = None) -> tuple[str, str
     """
     logger.info(f"Executing Claude with prompt: {prompt[:50]}...")
 
-    # Build command
-    cmd = ["claude", "-p", prompt, "--output-format", "json"]
-    if session_id:
-        logger.info(f"Resuming session: {session_id[:8]}...")
-        cmd.extend(["--resume", session_id])
+    cmd = _build_command(prompt, session_id)
 
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        timeout=None
-    )
+    with metrics.span("claude_run", mode="sync"):
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=None
+        )
+    CLAUDE_RUNS.inc(mode="sync", outcome="ok" if result.returncode == 0 else "error")
 
     logger.info(f"Claude returned {len(result.stdout)} chars")
     if result.stderr:
         logger.warning(f"Claude stderr: {result.stderr}")
 
-    # Parse JSON output
+    result_text, new_session_id, usage = _parse_output(result.stdout)
+    _report_usage(usage, on_usage)
+    return result_text, new_session_id
+
+
+def _signal_group(proc: asyncio.subprocess.Process | subprocess.Popen, sig: int) -> None:
+    """Send a signal to the process group of a claude run (the CLI and its tool processes)."""
     try:
-        response = json.loads(result.stdout)
-        result_text = response.get("result", "")
-        new_session_id = response.get("session_id", "")
+        os.killpg(proc.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
 
-        if not new_session_id:
-            logger.warning("No session_id in Claude response")
 
-        logger.info(f"Parsed response: {len(result_text)} chars, session: {new_session_id[:8]}...")
-        return result_text, new_session_id
+async def _kill_process(proc: asyncio.subprocess.Process, grace: float = KILL_GRACE_SECONDS) -> None:
+    """
+    Stop a claude run and reap it.
 
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse Claude JSON output: {e}")
-        logger.error(f"Raw output: {result.stdout[:200]}...")
-        raise ValueError(f"Invalid JSON from Claude: {e}")
+    The CLI runs in its own session, so the whole process group (MCP
+    servers, tool shells) is terminated: SIGTERM first so the CLI can
+    flush its session transcript, SIGKILL after the grace period and for
+    anything left behind once the leader exited.
+    """
+    if proc.returncode is None:
+        _signal_group(proc, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=grace)
+        except asyncio.TimeoutError:
+            pass
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+    _signal_group(proc, signal.SIGKILL)
+    await proc.wait()
+
+
+def _kill_process_sync(proc: subprocess.Popen, grace: float = KILL_GRACE_SECONDS) -> None:
+    """Blocking counterpart of _kill_process for runs started from worker threads."""
+    if proc.poll() is None:
+        _signal_group(proc, signal.SIGTERM)
+        try:
+            proc.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            pass
+    _signal_group(proc, signal.SIGKILL)
+    proc.communicate()
+
+
+def run_claude_process(
+    cmd: list[str],
+    timeout: float,
+    stop: threading.Event | None = None,
+    cwd: str | None = None
+) -> subprocess.CompletedProcess:
+    """
+    Run a claude command from a worker thread, like subprocess.run with a stop switch.
+
+    The CLI gets its own session so a timeout or a stop kills the whole
+    process group, not only the CLI.
+
+    Args:
+        cmd: Command line to run
+        timeout: Max execution time in seconds
+        stop: Event that, once set, kills the run
+        cwd: Working directory of the process
+
+    Returns:
+        Completed process with text stdout and stderr
+
+    Raises:
+        subprocess.TimeoutExpired: If the run exceeds timeout
+        JobStopped: If stop was set before or during the run
+    """
+    if stop is not None and stop.is_set():
+        raise JobStopped("Stopped before starting Claude")
+
+    deadline = time.monotonic() + timeout
+    proc = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=cwd, start_new_session=True
+    )
+    while True:
+        try:
+            stdout, stderr = proc.communicate(timeout=max(0.0, min(STOP_POLL_SECONDS, deadline - time.monotonic())))
+            return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+        except subprocess.TimeoutExpired:
+            pass
+
+        if stop is not None and stop.is_set():
+            logger.info(f"Claude run stopped, killing process {proc.pid}")
+            CLAUDE_RUNS.inc(mode="thread", outcome="cancelled")
+            _kill_process_sync(proc)
+            raise JobStopped("Claude run stopped")
+        if time.monotonic() >= deadline:
+            logger.error(f"Claude run timeout after {timeout}s, killing process {proc.pid}")
+            CLAUDE_RUNS.inc(mode="thread", outcome="timeout")
+            _kill_process_sync(proc)
+            raise subprocess.TimeoutExpired(cmd, timeout)
+
+
+async def execute_claude_async(
+    prompt: str,
+    session_id: str | None = None,
+    timeout: float | None = None,
+    on_usage: Callable[[RunUsage], None] | None = None
+) -> tuple[str, str]:
+    """
+    Execute Claude Code without blocking the event loop.
+
+    Same contract as execute_claude. The subprocess and its process group
+    are killed when the timeout expires or when the awaiting task is
+    cancelled (e.g. by /cancel).
+
+    Args:
+        prompt: User prompt to send to Claude
+        session_id: Optional session ID to resume conversation
+        timeout: Max execution time in seconds (None = no limit)
+        on_usage: Optional callback receiving tokens and cost of the run
+
+    Returns:
+        Tuple of (result_text, new_session_id)
+
+    Raises:
+        FileNotFoundError: If claude binary not found
+        TimeoutError: If execution exceeds timeout
+        ValueError: If JSON output cannot be parsed
+    """
+    logger.info(f"Executing Claude (async) with prompt: {prompt[:50]}...")
+
+    cmd = _build_command(prompt, session_id)
+
+    started = time.perf_counter()
+    with metrics.span("claude_spawn"):
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
+        )
+
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.error(f"Claude execution timeout after {timeout}s, killing process {proc.pid}")
+        CLAUDE_RUNS.inc(mode="async", outcome="timeout")
+        await _kill_process(proc)
+        raise TimeoutError(f"Claude execution timeout after {timeout}s")
+    except asyncio.CancelledError:
+        logger.info(f"Claude execution cancelled, killing process {proc.pid}")
+        CLAUDE_RUNS.inc(mode="async", outcome="cancelled")
+        await _kill_process(proc)
+        raise
+
+    metrics.observe("claude_run", time.perf_counter() - started, mode="async")
+    CLAUDE_RUNS.inc(mode="async", outcome="ok" if proc.returncode == 0 else "error")
+
+    stdout_text = stdout.decode("utf-8", errors="replace")
+    stderr_text = stderr.decode("utf-8", errors="replace")
+
+    logger.info(f"Claude returned {len(stdout_text)} chars")
+    if stderr_text:
+        logger.warning(f"Claude stderr: {stderr_text}")
+
+    result_text, new_session_id, usage = _parse_output(stdout_text)
+    _report_usage(usage, on_usage)
+    return result_text, new_session_id
+
+
+def _extract_text_delta(event: dict, partial_seen: bool) -> str:
+    """Return text carried by a stream-json event, if any."""
+    event_type = event.get("type")
+
+    if event_type == "stream_event":
+        delta = event.get("event", {}).get("delta", {})
+        if delta.get("type") == "text_delta":
+            return delta.get("text", "")
+
+    # Complete assistant messages repeat partial deltas, use them only as a fallback
+    elif event_type == "assistant" and not partial_seen:
+        content = event.get("message", {}).get("content", [])
+        return "".join(block.get("text", "") for block in content if block.get("type") == "text")
+
+    return ""
+
+
+async def stream_claude(
+    prompt: str,
+    session_id: str | None = None,
+    timeout: float | None = None,
+    on_text: Callable[[str], Awaitable[None]] | None = None,
+    on_usage: Callable[[RunUsage], None] | None = None
+) -> tuple[str, str]:
+    """
+    Execute Claude Code in stream-json mode, reporting text as it arrives.
+
+    Reads newline-delimited events from the subprocess and awaits on_text
+    for every text fragment. Same contract and kill semantics as
+    execute_claude_async.
+
+    Args:
+        prompt: User prompt to send to Claude
+        session_id: Optional session ID to resume conversation
+        timeout: Max execution time in seconds (None = no limit)
+        on_text: Optional coroutine callback receiving text fragments
+        on_usage: Optional callback receiving tokens and cost of the run
+
+    Returns:
+        Tuple of (result_text, new_session_id)
+
+    Raises:
+        FileNotFoundError: If claude binary not found
+        TimeoutError: If execution exceeds timeout
+    """
+    logger.info(f"Streaming Claude with prompt: {prompt[:50]}...")
+
+    cmd = _build_command(prompt, session_id, output_format="stream-json")
+    cmd.extend(["--verbose", "--include-partial-messages"])
+
+    started = time.perf_counter()
+    with metrics.span("claude_spawn"):
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT,
+            start_new_session=True
+        )
+
+    # Drain stderr concurrently so a chatty process never blocks on a full pipe
+    stderr_task = asyncio.create_task(proc.stderr.read())
+
+    result_text = ""
+    new_session_id = ""
+    usage = None
+    context_tokens = None
+    partial_seen = False
+    first_text_seen = False
+    event_count = 0
+
+    try:
+        async with asyncio.timeout(timeout):
+            async for raw_line in proc.stdout:
+                line = raw_line.strip()
+                if not line:
+                    continue
+
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed stream line: {line[:100]!r}")
+                    continue
+
+                event_count += 1
+                new_session_id = event.get("session_id") or new_session_id
+
+                if event.get("type") == "stream_event":
+                    partial_seen = True
+                if event.get("type") == "assistant":
+                    # Per-request usage, the last one is the context Claude ended with
+                    message_usage = event.get("message", {}).get("usage")
+                    if isinstance(message_usage, dict):
+                        context_tokens = RunUsage.context_size(message_usage)
+                if event.get("type") == "result":
+                    result_text = event.get("result", "")
+                    usage = RunUsage.from_response(event)
+                    if usage and context_tokens is not None:
+                        usage.context_tokens = context_tokens
+                    continue
+
+                text = _extract_text_delta(event, partial_seen)
+                if text and not first_text_seen:
+                    first_text_seen = True
+                    metrics.observe("claude_first_output", time.perf_counter() - started)
+                if text and on_text:
+                    await on_text(text)
+
+            await proc.wait()
+
+    except TimeoutError:
+        logger.error(f"Claude stream timeout after {timeout}s, killing process {proc.pid}")
+        CLAUDE_RUNS.inc(mode="stream", outcome="timeout")
+        stderr_task.cancel()
+        await _kill_process(proc)
+        raise TimeoutError(f"Claude execution timeout after {timeout}s")
+    except BaseException:
+        logger.info(f"Claude stream interrupted, killing process {proc.pid}")
+        CLAUDE_RUNS.inc(mode="stream", outcome="cancelled")
+        stderr_task.cancel()
+        await _kill_process(proc)
+        raise
+
+    stderr_text = (await stderr_task).decode("utf-8", errors="replace")
+    if stderr_text:
+        logger.warning(f"Claude stderr: {stderr_text}")
+
+    metrics.observe("claude_run", time.perf_counter() - started, mode="stream")
+    CLAUDE_RUNS.inc(mode="stream", outcome="ok" if proc.returncode == 0 else "error")
+
+    if not new_session_id:
+        logger.warning("No session_id in Claude stream")
+    _report_usage(usage, on_usage)
+
+    logger.info(f"Streamed {event_count} events: {len(result_text)} chars, session: {new_session_id[:8]}...")
+    return result_text, new_session_id
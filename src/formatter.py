@@ -1,23 +1,173 @@
 # ABOUTME: Output formatting utilities for cleaning Claude Code terminal output
 # ABOUTME: Removes ANSI color codes and splits long messages for Telegram compatibility
 
+import codecs
 import re
+from typing import Iterator
+
+# Complete ANSI/OSC escape sequences and stray control characters (tab/newline kept)
+_CONTROL_RE = re.compile(
+    r'\x1B\][^\x07\x1B]*(?:\x07|\x1B\\)'  # OSC (titles, hyperlinks) ended by BEL or ST
+    r'|\x1B\[[0-?]*[ -/]*[@-~]'              # CSI (colors, cursor movement)
+    r'|\x1B[ -/]*[0-~]'                       # other escapes (charset selection, Fe/Fp/Fs)
+    r'|[\x00-\x08\x0B-\x1F\x7F]'              # remaining C0 controls and DEL
+)
+
+# Escape sequence cut off at the end of a chunk
+_PARTIAL_RE = re.compile(r'\x1B(?:\][^\x07\x1B]*\x1B?|\[[0-?]*[ -/]*|[ -/]*)')
+
+# Longest partial sequence carried between chunks before it is dropped as garbage
+_MAX_PENDING = 4096
+
+# Lines opening or closing a Markdown code block
+_FENCE_RE = re.compile(r'^```[^\n]*$', re.MULTILINE)
+# Only a bare fence closes a block, "```py" inside an open block is content (CommonMark)
+_CLOSING_FENCE_RE = re.compile(r'```\s*')
+_FENCE_CLOSE = "\n```"
 
 
 def remove_ansi_codes(text: str) -> str:
     """Remove ANSI escape codes from text."""
-    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    return ansi_escape.sub('', text)
+    return _CONTROL_RE.sub('', text)
 
 
-def split_long_message(text: str, max_length: int = 4096) -> list[str]:
-    """Split text into chunks that fit Telegram's message size limit."""
-    if len(text) <= max_length:
-        return [text]
+class AnsiSanitizer:
+    """
+    Incremental ANSI/control-sequence stripper for streamed output.
+
+    Accepts str or bytes chunks split at arbitrary points. An escape
+    sequence (or UTF-8 character) cut at a chunk boundary is carried
+    over and completed by the next chunk, so each chunk is scanned once.
+    """
+
+    def __init__(self, encoding: str = "utf-8"):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._pending = ""
+
+    def feed(self, chunk: str | bytes) -> str:
+        """Sanitize next chunk, returning the text that is safe to emit."""
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+
+        text = self._pending + chunk if self._pending else chunk
+        self._pending = ""
+
+        split = self._partial_start(text)
+        if split is not None:
+            text, self._pending = text[:split], text[split:]
+
+        return _CONTROL_RE.sub('', text)
+
+    def flush(self) -> str:
+        """Emit whatever is left at end of stream (unfinished escapes are dropped)."""
+        text = self._decoder.decode(b"", final=True)
+        self._pending = ""
+        return _CONTROL_RE.sub('', text)
+
+    def _partial_start(self, text: str) -> int | None:
+        """Offset of an unfinished escape sequence at the end of text, if any."""
+        floor = max(0, len(text) - _MAX_PENDING)
+        last = text.rfind('\x1B', floor)
+        if last == -1:
+            return None
+
+        # An OSC split right after the ESC of its ST terminator spans two ESCs
+        previous = text.rfind('\x1B', floor, last)
+        for start in (previous, last):
+            if start != -1 and _PARTIAL_RE.fullmatch(text, start):
+                return start
+        return None
+
+
+def _next_fence_state(line: str, open_fence: str | None) -> str | None:
+    """Fence state after a fence line: any fence opens a block, only a bare one closes it."""
+    if open_fence is None:
+        return line
+    return None if _CLOSING_FENCE_RE.fullmatch(line) else open_fence
+
+
+def _fence_state(text: str, start: int, end: int, open_fence: str | None) -> str | None:
+    """Return opening line of the code block still open at `end` (None if outside)."""
+    for match in _FENCE_RE.finditer(text, start, end):
+        open_fence = _next_fence_state(match.group(), open_fence)
+    return open_fence
 
-    chunks = []
-    while text:
-        chunks.append(text[:max_length])
-        text = text[max_length:]
 
-    return chunks
+def _find_cut(text: str, start: int, limit: int, open_fence: str | None) -> tuple[int, int]:
+    """
+    Pick where to end the chunk starting at `start` (exclusive `limit`).
+
+    Prefers code block boundaries, then paragraphs, lines and words, and
+    only cuts hard when no boundary lies in the second half of the window.
+
+    Returns:
+        Tuple of (chunk_end, next_chunk_start)
+    """
+    min_pos = start + (limit - start) // 2
+
+    # Just before an opening fence or just after a closing one
+    fence_cut = None
+    state = open_fence
+    for match in _FENCE_RE.finditer(text, start, limit):
+        next_state = _next_fence_state(match.group(), state)
+        if state is None and match.start() >= min_pos:
+            fence_cut = (match.start(), match.start())
+        elif state is not None and next_state is None and min_pos <= match.end() < limit:
+            fence_cut = (match.end(), match.end() + 1)
+        state = next_state
+    if fence_cut:
+        return fence_cut
+
+    for separator in ("\n\n", "\n", " "):
+        pos = text.rfind(separator, min_pos, limit)
+        if pos != -1:
+            return pos, pos + len(separator)
+
+    return limit, limit
+
+
+def iter_message_chunks(text: str, max_length: int = 4096) -> Iterator[str]:
+    """
+    Lazily split text into chunks that fit Telegram's message size limit.
+
+    Single pass over the text: cuts at the nicest boundary available and
+    keeps Markdown code fences balanced by closing an open block at the
+    end of a chunk and reopening it (with its language) in the next one.
+    """
+    length = len(text)
+    if length <= max_length:
+        yield text
+        return
+
+    start = 0
+    open_fence = None
+
+    while start < length:
+        prefix = f"{open_fence}\n" if open_fence else ""
+        budget = max_length - len(prefix)
+        if budget <= 2 * len(_FENCE_CLOSE):
+            # Fence line too long to repeat, continue without reopening it
+            prefix, budget, open_fence = "", max_length, None
+
+        if length - start <= budget:
+            yield prefix + text[start:]
+            return
+
+        cut, next_start = _find_cut(text, start, start + budget, open_fence)
+        end_fence = _fence_state(text, start, cut, open_fence)
+
+        # Leave room to close a block that is still open at the cut
+        if end_fence and len(prefix) + (cut - start) + len(_FENCE_CLOSE) > max_length:
+            cut, next_start = _find_cut(text, start, start + budget - len(_FENCE_CLOSE), open_fence)
+            end_fence = _fence_state(text, start, cut, open_fence)
+
+        suffix = _FENCE_CLOSE if end_fence else ""
+        yield prefix + text[start:cut] + suffix
+
+        start = next_start
+        open_fence = end_fence
+
+
+def split_long_message(text: str, max_length: int = 4096) -> list[str]:
+    """Split text into chunks that fit Telegram's message size limit."""
+    return list(iter_message_chunks(text, max_length))
@@ -0,0 +1,130 @@
+# ABOUTME: Asyncio front-end scanning several IMAP mailboxes concurrently over a small connection pool
+# ABOUTME: Reuses EmailFetcher's whitelist, date window and sync logic and merges results by Message-ID
+
+import asyncio
+import imaplib
+import logging
+from contextlib import asynccontextmanager
+from typing import Callable, List
+
+from src import metrics
+from src.newsletter.email_fetcher import EmailData, EmailFetcher
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """
+    At most `size` logged-in IMAP connections shared by concurrent scans.
+
+    The queue starts with `size` empty slots; a slot is turned into a
+    connection when first needed and back into an empty slot when the
+    connection breaks, so waiters never hang on a dead connection.
+    """
+
+    def __init__(self, connect: Callable[[], imaplib.IMAP4], size: int):
+        self._connect = connect
+        self._slots: asyncio.Queue = asyncio.Queue()
+        for _ in range(max(1, size)):
+            self._slots.put_nowait(None)
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a connection, opening it on first use."""
+        imap = await self._slots.get()
+        try:
+            if imap is None:
+                imap = await asyncio.to_thread(self._connect)
+            yield imap
+        except (imaplib.IMAP4.abort, OSError):
+            # Connection is gone, the next borrower opens a fresh one
+            imap = None
+            raise
+        finally:
+            self._slots.put_nowait(imap)
+
+    async def close(self) -> None:
+        """Log out of every open connection."""
+        while not self._slots.empty():
+            imap = self._slots.get_nowait()
+            if imap is None:
+                continue
+            try:
+                await asyncio.to_thread(imap.logout)
+            except Exception as e:
+                logger.debug(f"IMAP logout failed: {e}")
+
+
+def merge_by_message_id(results: List[List[EmailData]]) -> List[EmailData]:
+    """
+    Merge per-mailbox results, keeping the first copy of each Message-ID.
+
+    Gmail exposes one message under every label it carries, so the same
+    newsletter can show up in INBOX and a label folder. Messages without
+    a Message-ID are all kept. The result is ordered by date.
+    """
+    seen = set()
+    merged = []
+    for emails in results:
+        for email_data in emails:
+            key = email_data.message_id.strip()
+            if key and key in seen:
+                continue
+            seen.add(key)
+            merged.append(email_data)
+    return sorted(merged, key=lambda e: e.date.timestamp())
+
+
+class AsyncEmailFetcher:
+    """Scans several mailboxes at once with the settings of an EmailFetcher."""
+
+    def __init__(self, fetcher: EmailFetcher, mailboxes: List[str], connections: int = 3):
+        """
+        Args:
+            fetcher: Fetcher providing credentials, whitelist, batching and store
+            mailboxes: Mailboxes to scan, earlier ones win on duplicates
+            connections: Max IMAP connections open at once
+        """
+        self.fetcher = fetcher
+        self.mailboxes = mailboxes
+        self.connections = connections
+
+    async def fetch_last_week(self) -> List[EmailData]:
+        """
+        Fetch last week's whitelisted emails from all mailboxes.
+
+        A mailbox that cannot be scanned (missing label, server error) is
+        logged and skipped; the fetch fails only when every mailbox does.
+        """
+        self.fetcher.batches = []
+        store = self.fetcher.open_store()
+        pool = ConnectionPool(self.fetcher.connect, min(self.connections, len(self.mailboxes)))
+
+        try:
+            results = await asyncio.gather(
+                *(self._scan(pool, mailbox, store) for mailbox in self.mailboxes),
+                return_exceptions=True
+            )
+        finally:
+            await pool.close()
+            if store:
+                store.close()
+
+        scanned = []
+        for mailbox, result in zip(self.mailboxes, results):
+            if isinstance(result, Exception):
+                logger.error(f"Scanning {mailbox} failed: {result}")
+                continue
+            scanned.append(result)
+
+        if not scanned and results:
+            raise results[0]
+
+        emails = merge_by_message_id(scanned)
+        logger.info(f"Fetched {len(emails)} emails from {len(scanned)}/{len(self.mailboxes)} mailboxes")
+        return emails
+
+    async def _scan(self, pool: ConnectionPool, mailbox: str, store) -> List[EmailData]:
+        async with pool.connection() as imap:
+            with metrics.span("imap_mailbox", mailbox=mailbox):
+                return await asyncio.to_thread(self.fetcher.fetch_mailbox, imap, mailbox, store)
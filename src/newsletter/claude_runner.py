@@ -3,8 +3,14 @@
 
 import subprocess
 import logging
+import threading
 from pathlib import Path
 
+from src.executor import CLAUDE_COMMAND, run_claude_process
+from src.shutdown import JobStopped
+from src.usage import parse_text_output, usage_ledger
+from src.worker_pool import claude_pool, Lane
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,18 +20,20 @@ class ClaudeRunner:
     def __init__(self, prompt_file: str = ".claude/prompts/newsletter_analysis_prompt.md"):
         self.prompt_file = Path(prompt_file)
 
-    def analyze_newsletters(self, folder_path: str, timeout: int = 300) -> str:
+    def analyze_newsletters(self, folder_path: str, timeout: int = 300, stop: threading.Event | None = None) -> str:
         """
         Analyze newsletters in folder using Claude.
 
         Args:
             folder_path: Path to folder containing .md files
             timeout: Max execution time in seconds (default 5 minutes)
+            stop: Event that kills the Claude run once set
 
         Returns:
             Claude's analysis output
 
         Raises:
+            JobStopped: If stop was set
             Exception: If Claude execution fails
         """
         # Load base prompt template
@@ -40,26 +48,31 @@ class ClaudeRunner:
         logger.info(f"Running Claude analysis on {folder_path}")
 
         try:
-            result = subprocess.run(
-                [
-                    "claude", "-p", full_prompt,
-                    "--allowedTools", "Read,Glob,Write",
-                    "--output-format", "text"
-                ],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                cwd=str(Path.cwd())
-            )
+            with claude_pool.slot_sync(Lane.SCHEDULED, "newsletter-analysis"):
+                result = run_claude_process(
+                    [
+                        *CLAUDE_COMMAND, "-p", full_prompt,
+                        "--allowedTools", "Read,Glob,Write",
+                        "--output-format", "json"
+                    ],
+                    timeout=timeout,
+                    stop=stop,
+                    cwd=str(Path.cwd())
+                )
 
             if result.returncode != 0:
                 logger.error(f"Claude failed with exit code {result.returncode}")
                 logger.error(f"stderr: {result.stderr}")
                 raise Exception(f"Claude execution failed: {result.stderr}")
 
+            output, usage = parse_text_output(result.stdout)
+            usage_ledger.record("newsletter", usage)
+
             logger.info("Claude analysis completed successfully")
-            return result.stdout
+            return output
 
+        except JobStopped:
+            raise
         except subprocess.TimeoutExpired:
             logger.error(f"Claude execution timeout after {timeout}s")
             raise Exception(f"Claude execution timeout after {timeout}s")
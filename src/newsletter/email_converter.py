@@ -1,24 +1,119 @@
 # ABOUTME: Converts email data to Markdown format with metadata
-# ABOUTME: Handles HTML to Markdown conversion and filename generation
+# ABOUTME: Slims HTML and converts it with a pluggable backend, in batches over a process pool, and names the files
 
-import html2text
+import logging
 import re
+from concurrent.futures import Executor
+from functools import partial
+from typing import List, Optional, Sequence, Tuple
+
+from src import metrics
 from src.newsletter.email_fetcher import EmailData
+from src.newsletter.html_slimmer import has_text, parse_tree, slim_tree
+from src.newsletter.markdown_backends import BACKENDS, get_backend
+
+logger = logging.getLogger(__name__)
+
+# Batches smaller than this are converted in-process, shipping them to workers costs more than it saves
+PARALLEL_MIN_BATCH = 4
+
+# Converters of a pool worker process by (backend, slim), built on their first chunk
+_worker_converters: dict = {}
+
+
+def _convert_chunk(options: Tuple[str, bool], emails: List[EmailData]) -> List[str]:
+    """Convert a chunk of emails in a worker process."""
+    converter = _worker_converters.get(options)
+    if converter is None:
+        converter = _worker_converters[options] = EmailConverter(*options)
+    # No metrics here: the worker process has its own registry nobody scrapes
+    return [converter.render(email) for email in emails]
 
 
 class EmailConverter:
     """Converts emails to Markdown format."""
 
-    def __init__(self):
-        self.html_converter = html2text.HTML2Text()
-        self.html_converter.ignore_links = False
-        self.html_converter.body_width = 0  # Don't wrap lines
+    def __init__(self, backend: str = "html2text", slim: bool = True):
+        """
+        Args:
+            backend: Name of the HTML to Markdown backend (see markdown_backends.BACKENDS)
+            slim: Strip styles, hidden elements, tracking pixels and layout tables first
+
+        Raises:
+            ValueError: If the backend is not registered
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown HTML converter backend {backend!r}, choose from: {', '.join(BACKENDS)}")
+        self.backend_name = backend
+        self.slim = slim
+        self._backend = None
+
+    @property
+    def backend(self):
+        """HTML to Markdown backend, imported and built on the first HTML email."""
+        if self._backend is None:
+            self._backend = get_backend(self.backend_name)
+        return self._backend
+
+    def html_to_markdown(self, html: str) -> str:
+        """Convert an HTML body, slimming it first when enabled."""
+        if not self.slim:
+            return self.backend.convert(html)
+        root = slim_tree(html)
+        if not has_text(root) and has_text(parse_tree(html)):
+            # Broken markup (e.g. an unclosed hidden element) can swallow everything, convert unslimmed
+            logger.warning("Slimming removed all text, converting unslimmed HTML")
+            return self.backend.convert(html)
+        return self.backend.convert_tree(root)
 
     def to_markdown(self, email: EmailData) -> str:
         """Convert email to Markdown with frontmatter."""
+        if email.body_html:
+            with metrics.span("html_convert"):
+                return self.render(email)
+        return self.render(email)
+
+    def convert_batch(
+        self,
+        emails: Sequence[EmailData],
+        start: int = 1,
+        executor: Optional[Executor] = None,
+        chunk_size: int = 4
+    ) -> List[Tuple[str, str]]:
+        """
+        Convert a batch of emails, spreading the work over a process pool.
+
+        Emails are submitted in chunks of chunk_size to cut pickling
+        round-trips; results come back in input order. Without an
+        executor, or for fewer than PARALLEL_MIN_BATCH emails, conversion
+        runs in-process.
+
+        Args:
+            emails: Emails in digest order
+            start: Sequence number of the first email
+            executor: Process pool to convert on
+            chunk_size: Emails per submitted task
+
+        Returns:
+            (filename, markdown) pairs in input order
+        """
+        filenames = [self.generate_filename(email, sequence=seq) for seq, email in enumerate(emails, start=start)]
+
+        if executor is None or len(emails) < PARALLEL_MIN_BATCH:
+            return list(zip(filenames, (self.to_markdown(email) for email in emails)))
+
+        chunks = [list(emails[i:i + chunk_size]) for i in range(0, len(emails), chunk_size)]
+        markdowns = []
+        with metrics.span("html_convert_batch"):
+            for converted in executor.map(partial(_convert_chunk, (self.backend_name, self.slim)), chunks):
+                markdowns.extend(converted)
+        return list(zip(filenames, markdowns))
+
+    def render(self, email: EmailData) -> str:
+        """Markdown with frontmatter, without metrics (safe in pool workers)."""
         # Convert HTML to Markdown if available, otherwise use plain text
         if email.body_html:
-            content = self.html_converter.handle(email.body_html)
+            content = self.html_to_markdown(email.body_html)
         else:
             content = email.body_text
 
@@ -1,18 +1,29 @@
 # ABOUTME: IMAP email fetcher for newsletter digest
-# ABOUTME: Connects to IMAP server, fetches emails from last 7 days, extracts metadata and content
+# ABOUTME: Streams last week's emails from batched UID FETCH round-trips, headers first, bodies only for whitelisted senders
 
 import imaplib
 import email
 import json
+import re
+import time
 from email.header import decode_header
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional
 import logging
 
+from src import metrics
+from src.newsletter.sender_rules import SenderRules
+
 logger = logging.getLogger(__name__)
 
+# UID of a message in a FETCH response part, e.g. b'1 (UID 101 RFC822 {123}'
+_UID_RE = re.compile(rb'UID (\d+)')
+
+# Headers needed to whitelist, date and name a message without downloading it
+HEADER_FIELDS = "FROM SUBJECT DATE MESSAGE-ID"
+
 
 @dataclass
 class EmailData:
@@ -25,15 +36,117 @@ class EmailData:
     message_id: str
 
 
+@dataclass
+class FetchBatch:
+    """Timing of one UID FETCH round-trip."""
+    messages: int
+    bytes: int
+    seconds: float
+    phase: str = "body"  # header | body
+
+
+def message_sets(uids: List[int], batch_size: int) -> Iterator[str]:
+    """
+    Split UIDs into IMAP message sets of at most batch_size messages.
+
+    Consecutive UIDs collapse into ranges, e.g. [1, 2, 3, 7, 9, 10] -> "1:3,7,9:10".
+    """
+    uids = sorted(set(uids))
+    for start in range(0, len(uids), batch_size):
+        batch = uids[start:start + batch_size]
+        ranges = []
+        first = last = batch[0]
+        for uid in batch[1:]:
+            if uid == last + 1:
+                last = uid
+                continue
+            ranges.append(f"{first}:{last}" if last > first else str(first))
+            first = last = uid
+        ranges.append(f"{first}:{last}" if last > first else str(first))
+        yield ",".join(ranges)
+
+
+def iter_fetch_response(response: list) -> Iterator[tuple[int | None, bytes]]:
+    """
+    Yield (uid, literal) pairs from a multi-message FETCH response.
+
+    The UID usually precedes the literal, but servers may send it after,
+    in the trailing part (b' UID 101)'). Parts are released as they are
+    consumed, so a parsed message can be freed before the next one is
+    decoded.
+    """
+    literal = None
+    for idx, part in enumerate(response):
+        response[idx] = None
+        if isinstance(part, tuple):
+            if literal is not None:
+                yield None, literal
+            match = _UID_RE.search(part[0])
+            if match:
+                yield int(match.group(1)), part[1]
+                literal = None
+            else:
+                literal = part[1]
+        elif literal is not None:
+            match = _UID_RE.search(part or b"")
+            yield (int(match.group(1)) if match else None), literal
+            literal = None
+    if literal is not None:
+        yield None, literal
+
+
+def search_criteria(since_date: str, senders: List[str], min_uid: int | None = None) -> str:
+    """
+    Build a UID SEARCH query for mail since a date, optionally from given senders.
+
+    IMAP OR takes two operands, so n senders nest as OR a OR b c.
+    min_uid restricts the search to UIDs from that one up (incremental sync).
+    """
+    query = f'SINCE {since_date}'
+    if min_uid is not None:
+        query = f'UID {min_uid}:* {query}'
+    if not senders:
+        return f'({query})'
+    terms = [f'FROM "{sender.lstrip("@")}"' for sender in senders]
+    senders_query = terms[-1]
+    for term in reversed(terms[:-1]):
+        senders_query = f'OR {term} {senders_query}'
+    return f'({query} {senders_query})'
+
+
+def quote_mailbox(name: str) -> str:
+    """Quote a mailbox name for SELECT when it contains spaces or specials (e.g. [Gmail]/All Mail)."""
+    if name and not any(c in name for c in ' ()"\\{%*'):
+        return name
+    return '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
 class EmailFetcher:
     """Fetches emails from IMAP server."""
 
-    def __init__(self, host: str, port: int, user: str, password: str, senders_file: Optional[Path] = None):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        senders_file: Optional[Path] = None,
+        batch_size: int = 50,
+        server_filter: bool = False,
+        store_path: Optional[Path] = None
+    ):
         self.host = host
         self.port = port
         self.user = user
         self.password = password
-        self._allowed_senders = self._load_senders(senders_file) if senders_file else []
+        self.batch_size = batch_size
+        # Narrow SEARCH with FROM terms from the whitelist (the client-side check stays authoritative)
+        self.server_filter = server_filter
+        # Local message cache with sync checkpoints (None = fetch the whole week every run)
+        self.store_path = store_path
+        self._rules = SenderRules(self._load_senders(senders_file) if senders_file else [])
+        # Round-trips of the last fetch, for diagnostics and benchmarks
+        self.batches: List[FetchBatch] = []
 
     def _load_senders(self, path: Path) -> List[str]:
         """Load allowed senders from JSON whitelist file."""
@@ -42,86 +155,257 @@ class EmailFetcher:
             return []
         with open(path) as f:
             data = json.load(f)
-        senders = [s.lower() for s in data.get("senders", [])]
-        logger.info(f"Loaded {len(senders)} whitelisted senders")
+        senders = [s for s in data.get("senders", []) if isinstance(s, str)]
+        logger.info(f"Loaded {len(senders)} sender rules")
         return senders
 
     def _is_allowed(self, sender: str) -> bool:
-        """Check if sender matches any entry in the whitelist."""
-        if not self._allowed_senders:
-            return True
-        sender_lower = sender.lower()
-        return any(entry in sender_lower for entry in self._allowed_senders)
-
-    def fetch_last_week(self) -> List[EmailData]:
-        """Fetch all emails from the last 7 days."""
-        emails = []
-
-        try:
-            # Connect to IMAP server
-            imap = imaplib.IMAP4_SSL(self.host, self.port)
-            imap.login(self.user, self.password)
-            imap.select('INBOX')
+        """Check the sender against the compiled whitelist (everyone is allowed without one)."""
+        return self._rules.allows(sender)
 
-            # Calculate date 7 days ago
-            since_date = (datetime.now() - timedelta(days=7)).strftime("%d-%b-%Y")
+    def connect(self) -> imaplib.IMAP4:
+        """Open a logged-in IMAP connection."""
+        imap = imaplib.IMAP4_SSL(self.host, self.port)
+        imap.login(self.user, self.password)
+        return imap
 
-            # Search for emails since that date
-            status, messages = imap.search(None, f'(SINCE {since_date})')
+    def open_store(self):
+        """Open the local message store, None when incremental sync is off."""
+        if not self.store_path:
+            return None
+        from src.newsletter.message_store import MessageStore
 
-            if status != 'OK':
-                logger.error("Failed to search emails")
-                return emails
+        return MessageStore(self.store_path)
 
-            email_ids = messages[0].split()
+    def fetch_last_week(self, mailbox: str = 'INBOX') -> List[EmailData]:
+        """
+        Fetch all emails from the last 7 days.
 
-            for email_id in email_ids:
-                status, msg_data = imap.fetch(email_id, '(RFC822)')
+        With a message store, only UIDs above the mailbox checkpoint are
+        downloaded and the week is assembled from the local cache.
 
-                if status != 'OK':
-                    logger.warning(f"Failed to fetch email {email_id}")
-                    continue
+        Args:
+            mailbox: Mailbox (folder or Gmail label) to scan
+        """
+        return list(self.iter_last_week(mailbox))
 
-                # Parse email
-                raw_email = msg_data[0][1]
-                msg = email.message_from_bytes(raw_email)
+    def iter_last_week(self, mailbox: str = 'INBOX') -> Iterator[EmailData]:
+        """
+        Yield emails from the last 7 days one by one, as they are parsed.
 
-                # Extract metadata
-                subject = self._decode_header(msg.get('Subject', ''))
-                sender = self._decode_header(msg.get('From', ''))
-                date_str = msg.get('Date', '')
-                message_id = msg.get('Message-ID', '')
+        The connection is logged out once the iterator is exhausted or closed.
 
-                # Parse date
-                try:
-                    date = email.utils.parsedate_to_datetime(date_str)
-                except:
-                    date = datetime.now()
+        Args:
+            mailbox: Mailbox (folder or Gmail label) to scan
+        """
+        self.batches = []
+        store = self.open_store()
+        imap = None
 
-                if not self._is_allowed(sender):
-                    logger.debug(f"Skipping non-whitelisted sender: {sender}")
-                    continue
-
-                # Extract body
-                body_text, body_html = self._extract_body(msg)
-
-                emails.append(EmailData(
-                    sender=sender,
-                    subject=subject,
-                    date=date,
-                    body_text=body_text,
-                    body_html=body_html,
-                    message_id=message_id
-                ))
-
-            imap.close()
+        try:
+            # Connect to IMAP server
+            imap = self.connect()
+            yield from self.iter_mailbox(imap, mailbox, store)
             imap.logout()
+            imap = None
 
         except Exception as e:
             logger.error(f"IMAP error: {e}", exc_info=True)
             raise
+        finally:
+            if imap is not None:
+                # Abandoned mid-scan, drop the connection without waiting on the server
+                try:
+                    imap.shutdown()
+                except Exception:
+                    pass
+            if store:
+                store.close()
+
+    def fetch_mailbox(self, imap: imaplib.IMAP4, mailbox: str, store=None) -> List[EmailData]:
+        """
+        Fetch last week's whitelisted emails of one mailbox over an open connection.
+
+        Args:
+            imap: Logged-in IMAP connection
+            mailbox: Mailbox to scan
+            store: Optional MessageStore for incremental sync
+
+        Raises:
+            imaplib.IMAP4.error: If the mailbox cannot be selected
+        """
+        return list(self.iter_mailbox(imap, mailbox, store))
+
+    def iter_mailbox(self, imap: imaplib.IMAP4, mailbox: str, store=None) -> Iterator[EmailData]:
+        """
+        Yield last week's whitelisted emails of one mailbox over an open connection.
+
+        Without a store each message is yielded as soon as its batch
+        arrives; with one, new messages go to disk first and the week is
+        then read back one message at a time. The mailbox is closed again
+        afterwards, so the connection can be reused for another one.
+
+        Args:
+            imap: Logged-in IMAP connection
+            mailbox: Mailbox to scan
+            store: Optional MessageStore for incremental sync
+
+        Raises:
+            imaplib.IMAP4.error: If the mailbox cannot be selected
+        """
+        status, data = imap.select(quote_mailbox(mailbox))
+        if status != 'OK':
+            raise imaplib.IMAP4.error(f"Cannot select mailbox {mailbox}: {data}")
+
+        # Calculate date 7 days ago (SINCE matches whole days)
+        since = (datetime.now() - timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0)
+        since_date = since.strftime("%d-%b-%Y")
+
+        checkpoint = None
+        if store:
+            from src.newsletter.message_store import Checkpoint
+
+            uidvalidity = self._uidvalidity(imap)
+            checkpoint = store.checkpoint(mailbox)
+            if checkpoint and checkpoint.uidvalidity != uidvalidity:
+                logger.warning(f"UIDVALIDITY of {mailbox} changed, resyncing the whole week")
+                store.reset(mailbox)
+                checkpoint = None
+
+        # Search by UID, which stays valid across the FETCH round-trips
+        senders = self._rules.search_terms() if self.server_filter else []
+        min_uid = checkpoint.last_uid + 1 if checkpoint else None
+        status, messages = imap.uid('SEARCH', None, search_criteria(since_date, senders, min_uid))
+
+        if status != 'OK':
+            logger.error(f"Failed to search emails in {mailbox}")
+            imap.close()
+            return
+
+        uids = [int(uid) for uid in messages[0].split()]
+        if checkpoint:
+            # "n:*" still matches the highest UID when nothing is newer
+            uids = [uid for uid in uids if uid > checkpoint.last_uid]
+        highest_uid = max(uids, default=checkpoint.last_uid if checkpoint else 0)
+        # Lowest UID of every batch the server refused or answered without UIDs, the checkpoint stays below them
+        failed: List[int] = []
+        logger.info(f"Found {len(uids)} new emails in {mailbox} since {since_date}, "
+                    f"fetching in batches of {self.batch_size}")
+
+        # Phase 1: headers only, bodies are downloaded for whitelisted senders alone
+        if self._rules:
+            uids = self._whitelisted_uids(imap, uids, failed)
+
+        # Phase 2: full messages
+        for message_set in message_sets(uids, self.batch_size):
+            for uid, raw_email in self._fetch(imap, message_set, '(UID RFC822)', "body", failed):
+                if not store:
+                    yield self._parse_message(raw_email)
+                elif uid is not None:
+                    store.add(mailbox, uidvalidity, uid, self._parse_message(raw_email))
+                # Without a UID it cannot be stored, the checkpoint stays below it and the next run refetches
+
+        imap.close()
+
+        if store:
+            # Advance only once every new message is stored, an interrupted run refetches
+            if failed:
+                highest_uid = min(failed) - 1
+                logger.warning(f"Fetching some emails of {mailbox} failed, keeping checkpoint at UID {highest_uid}")
+            store.save_checkpoint(mailbox, Checkpoint(uidvalidity, highest_uid))
+            store.prune(since - timedelta(days=7))
+            # Whitelist may have shrunk since a message was cached
+            count = 0
+            for email_data in store.since(mailbox, since):
+                if self._is_allowed(email_data.sender):
+                    count += 1
+                    yield email_data
+            logger.info(f"Assembled {count} emails of the week in {mailbox} from the local store")
+
+    def _uidvalidity(self, imap: imaplib.IMAP4) -> int:
+        """UIDVALIDITY reported by the last SELECT."""
+        _, data = imap.response('UIDVALIDITY')
+        if not data or data[0] is None:
+            raise ValueError("Server did not report UIDVALIDITY")
+        return int(data[0])
+
+    def _whitelisted_uids(self, imap: imaplib.IMAP4, uids: List[int], failed: List[int]) -> List[int]:
+        """Fetch headers of the given messages and keep UIDs of whitelisted senders (failed batches go to failed)."""
+        allowed = []
+        items = f'(UID BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})])'
+        for message_set in message_sets(uids, self.batch_size):
+            for uid, raw_headers in self._fetch(imap, message_set, items, "header", failed):
+                sender = self._decode_header(email.message_from_bytes(raw_headers).get('From', ''))
+                if uid is not None and self._is_allowed(sender):
+                    allowed.append(uid)
+                else:
+                    logger.debug(f"Skipping non-whitelisted sender: {sender}")
 
-        return emails
+        logger.info(f"{len(allowed)} of {len(uids)} emails from whitelisted senders")
+        return allowed
+
+    def _fetch(
+        self, imap: imaplib.IMAP4, message_set: str, items: str, phase: str, failed: List[int]
+    ) -> Iterator[tuple[int | None, bytes]]:
+        """
+        Fetch one message set in a single round-trip and yield its messages one by one.
+
+        A refused batch yields nothing and records its lowest UID in failed,
+        as does a batch with a message the server sent without its UID.
+        """
+        started = time.perf_counter()
+        status, response = imap.uid('FETCH', message_set, items)
+        elapsed = time.perf_counter() - started
+
+        # Message sets are built from sorted UIDs, the first number is the lowest
+        lowest = int(re.match(r'\d+', message_set).group())
+        if status != 'OK':
+            logger.warning(f"Failed to fetch {phase} of emails {message_set}")
+            failed.append(lowest)
+            return
+
+        batch = FetchBatch(messages=0, bytes=0, seconds=elapsed, phase=phase)
+        self.batches.append(batch)
+        metrics.observe("imap_fetch_batch", elapsed, phase=phase)
+
+        for uid, literal in iter_fetch_response(response):
+            batch.messages += 1
+            batch.bytes += len(literal)
+            if uid is None and lowest not in failed:
+                logger.warning(f"Server sent {phase} of a message in {message_set} without its UID")
+                failed.append(lowest)
+            yield uid, literal
+
+        logger.info(f"Fetched {phase} of UIDs {message_set}: {batch.messages} emails, "
+                    f"{batch.bytes / 1024:.0f} KiB in {batch.seconds:.2f}s")
+
+    def _parse_message(self, raw_email: bytes) -> EmailData:
+        """Parse a raw RFC822 message."""
+        msg = email.message_from_bytes(raw_email)
+
+        # Extract metadata
+        subject = self._decode_header(msg.get('Subject', ''))
+        sender = self._decode_header(msg.get('From', ''))
+        date_str = msg.get('Date', '')
+        message_id = msg.get('Message-ID', '')
+
+        # Parse date
+        try:
+            date = email.utils.parsedate_to_datetime(date_str)
+        except:
+            date = datetime.now()
+
+        # Extract body
+        body_text, body_html = self._extract_body(msg)
+
+        return EmailData(
+            sender=sender,
+            subject=subject,
+            date=date,
+            body_text=body_text,
+            body_html=body_html,
+            message_id=message_id
+        )
 
     def _decode_header(self, header: str) -> str:
         """Decode email header handling encoding."""
@@ -0,0 +1,189 @@
+# ABOUTME: Pre-conversion slimming of newsletter HTML into a small element tree
+# ABOUTME: Drops styles, scripts, hidden preheaders, tracking pixels and unwraps single-column layout tables
+
+import html
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Union
+
+# Dropped together with everything inside them
+DROPPED_TAGS = {"head", "style", "script", "noscript", "template", "title", "meta", "link", "svg", "iframe", "object"}
+
+# May appear inside <head>, any other start tag means the body began even without </head>
+HEAD_CONTENT_TAGS = {"title", "meta", "link", "style", "script", "base", "noscript", "template"}
+
+# Never have content or an end tag
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Attributes converters use, everything else (style, class, widths...) is dropped after slimming
+KEPT_ATTRS = {"href", "src", "alt", "title", "colspan", "rowspan", "start"}
+
+TABLE_SECTIONS = {"thead", "tbody", "tfoot"}
+CELLS = {"td", "th"}
+
+_HIDDEN_STYLE = re.compile(
+    r"display\s*:\s*none|visibility\s*:\s*hidden|mso-hide\s*:\s*all|opacity\s*:\s*0(?![.\d]*[1-9])",
+    re.IGNORECASE
+)
+_PIXEL_STYLE = re.compile(r"(?:^|;)\s*(?:width|height)\s*:\s*[01](?:px)?\s*(?:;|$)", re.IGNORECASE)
+
+
+@dataclass
+class Node:
+    """Element of the slimmed tree, children are Nodes or text."""
+    tag: str
+    attrs: Dict[str, str] = field(default_factory=dict)
+    children: List[Union["Node", str]] = field(default_factory=list)
+
+
+class _TreeBuilder(HTMLParser):
+    """Forgiving HTML to Node tree parser that skips dropped and hidden subtrees while parsing."""
+
+    def __init__(self, slim: bool = True):
+        super().__init__(convert_charrefs=True)
+        # Without slimming only never-visible tags (head, style, script...) are skipped
+        self.slim = slim
+        self.root = Node("")
+        self._stack = [self.root]
+        # Open tags of a subtree being skipped, it ends when the count drops to zero
+        self._skip_tag = None
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag:
+            # An unclosed <head> or <title> ends where body content starts
+            if self._skip_tag == "head" and tag not in HEAD_CONTENT_TAGS or self._skip_tag == "title":
+                self._skip_tag, self._skip_depth = None, 0
+            else:
+                if tag == self._skip_tag:
+                    self._skip_depth += 1
+                return
+
+        attrs = {name: value or "" for name, value in attrs}
+        if tag in DROPPED_TAGS or self.slim and (_is_hidden(attrs) or (tag == "img" and _is_pixel(attrs))):
+            if tag not in VOID_TAGS:
+                self._skip_tag, self._skip_depth = tag, 1
+            return
+
+        if self.slim:
+            attrs = {name: value for name, value in attrs.items() if name in KEPT_ATTRS}
+        node = Node(tag, attrs)
+        self._stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_endtag(self, tag):
+        if self._skip_tag:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if not self._skip_depth:
+                    self._skip_tag = None
+            return
+
+        # Close up to the matching open tag, stray end tags are ignored
+        for idx in range(len(self._stack) - 1, 0, -1):
+            if self._stack[idx].tag == tag:
+                del self._stack[idx:]
+                return
+
+    def handle_data(self, data):
+        if not self._skip_tag and data:
+            self._stack[-1].children.append(data)
+
+
+def _is_hidden(attrs: Dict[str, str]) -> bool:
+    return "hidden" in attrs or bool(_HIDDEN_STYLE.search(attrs.get("style", "")))
+
+
+def _is_pixel(attrs: Dict[str, str]) -> bool:
+    """Tracking pixel: sized at most 1x1 or without a source."""
+    if not attrs.get("src"):
+        return True
+    for name in ("width", "height"):
+        value = attrs.get(name, "").strip().lower().removesuffix("px")
+        if value in ("0", "1"):
+            return True
+    return bool(_PIXEL_STYLE.search(attrs.get("style", "")))
+
+
+def _rows(table: Node) -> List[Node]:
+    rows = []
+    for child in table.children:
+        if isinstance(child, Node):
+            if child.tag == "tr":
+                rows.append(child)
+            elif child.tag in TABLE_SECTIONS:
+                rows.extend(c for c in child.children if isinstance(c, Node) and c.tag == "tr")
+    return rows
+
+
+def _unwrap_tables(node: Node) -> None:
+    """Replace layout tables (one cell per row) by their cells' content, innermost first."""
+    children = []
+    for child in node.children:
+        if isinstance(child, Node):
+            _unwrap_tables(child)
+            if child.tag == "table":
+                rows = _rows(child)
+                cells = [[c for c in row.children if isinstance(c, Node) and c.tag in CELLS] for row in rows]
+                if all(len(row) <= 1 for row in cells):
+                    children.extend(Node("div", children=row[0].children) for row in cells if row)
+                    continue
+            elif child.tag == "center":
+                child.tag = "div"
+        children.append(child)
+    node.children = children
+
+
+def has_text(node: Node) -> bool:
+    """True if the tree contains any non-whitespace text."""
+    return any(child.strip() if isinstance(child, str) else has_text(child) for child in node.children)
+
+
+def parse_tree(markup: str) -> Node:
+    """Parse HTML into a tree, dropping only never-visible content (head, style, script, comments)."""
+    builder = _TreeBuilder(slim=False)
+    builder.feed(markup)
+    builder.close()
+    return builder.root
+
+
+def slim_tree(markup: str) -> Node:
+    """
+    Parse newsletter HTML into a slimmed tree.
+
+    Removes <head>, <style>, <script> and similar, comments, hidden
+    elements (display:none, visibility:hidden, mso-hide, the hidden
+    attribute), tracking pixels and presentational attributes, and
+    unwraps single-column layout tables.
+    """
+    builder = _TreeBuilder()
+    builder.feed(markup)
+    builder.close()
+    _unwrap_tables(builder.root)
+    return builder.root
+
+
+def serialize(node: Node) -> str:
+    """Render a tree back to HTML."""
+    parts: List[str] = []
+    _serialize(node, parts)
+    return "".join(parts)
+
+
+def _serialize(node: Node, parts: List[str]) -> None:
+    for child in node.children:
+        if isinstance(child, str):
+            parts.append(html.escape(child, quote=False))
+            continue
+        attrs = "".join(f' {name}="{html.escape(value)}"' for name, value in child.attrs.items())
+        parts.append(f"<{child.tag}{attrs}>")
+        if child.tag not in VOID_TAGS:
+            _serialize(child, parts)
+            parts.append(f"</{child.tag}>")
+
+
+def slim_html(markup: str) -> str:
+    """Slimmed HTML, see slim_tree()."""
+    return serialize(slim_tree(markup))
@@ -0,0 +1,185 @@
+# ABOUTME: Pluggable HTML to Markdown backends for newsletter conversion (html2text and a built-in lite renderer)
+# ABOUTME: Backends take raw HTML or an already slimmed tree, the lite one renders the tree without a second parse
+
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Type
+
+from src.newsletter.html_slimmer import Node, parse_tree, serialize
+
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "header", "footer", "main", "aside", "nav", "table", "tr",
+    "thead", "tbody", "tfoot", "form", "figure", "figcaption", "address", "dl", "dt", "dd", "body", "html"
+}
+CELL_TAGS = {"td", "th"}
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+_WHITESPACE = re.compile(r"\s+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_LINE_BREAKS = re.compile(r"\n\s*\n")
+_LIST_ITEM = re.compile(r"\s*(?:[*>]|\d+\.)\s")
+
+
+class MarkdownBackend(ABC):
+    """HTML to Markdown converter, subclasses implement convert()."""
+
+    name = ""
+
+    @abstractmethod
+    def convert(self, html: str) -> str:
+        """Convert raw HTML to Markdown."""
+
+    def convert_tree(self, root: Node) -> str:
+        """Convert a slimmed tree, by default through its serialized HTML."""
+        return self.convert(serialize(root))
+
+
+class Html2TextBackend(MarkdownBackend):
+    """html2text: thorough and faithful, but slow on heavy HTML."""
+
+    name = "html2text"
+
+    def __init__(self):
+        import html2text
+
+        self.converter = html2text.HTML2Text()
+        self.converter.ignore_links = False
+        self.converter.body_width = 0  # Don't wrap lines
+
+    def convert(self, html: str) -> str:
+        return self.converter.handle(html)
+
+
+class LiteBackend(MarkdownBackend):
+    """
+    Built-in renderer of the slimmed tree.
+
+    Covers what newsletters use (headings, paragraphs, links, images,
+    emphasis, lists, quotes, code); anything else is rendered as its text.
+    Raw HTML is parsed into an unslimmed tree (head, style and script dropped).
+    """
+
+    name = "lite"
+
+    def convert(self, html: str) -> str:
+        return self.convert_tree(parse_tree(html))
+
+    def convert_tree(self, root: Node) -> str:
+        lines = []
+        fenced = False
+        for line in self._render(root, 0, False).split("\n"):
+            if line.startswith("```"):
+                fenced = not fenced
+            elif not fenced:
+                # Keep list and quote indentation, drop whitespace left over from inline text
+                line = line.rstrip()
+                line = line if _LIST_ITEM.match(line) else line.lstrip()
+            lines.append(line)
+        return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip() + "\n"
+
+    def _render(self, node, depth: int, pre: bool) -> str:
+        if isinstance(node, str):
+            return node if pre else _WHITESPACE.sub(" ", node)
+
+        tag = node.tag
+        if tag == "br":
+            return "\n"
+        if tag == "hr":
+            return "\n\n* * *\n\n"
+        if tag == "img":
+            src = node.attrs.get("src", "")
+            return f"![{node.attrs.get('alt', '')}]({src})" if src else ""
+        if tag == "pre":
+            code = "".join(self._render(child, depth, True) for child in node.children).strip("\n")
+            return f"\n\n```\n{code}\n```\n\n"
+        if tag in ("ul", "ol"):
+            return self._render_list(node, depth, pre)
+
+        inner = "".join(self._render(child, depth, pre) for child in node.children)
+
+        if tag in HEADINGS:
+            text = inner.strip()
+            return f"\n\n{'#' * HEADINGS[tag]} {text}\n\n" if text else ""
+        if tag == "a":
+            text, href = inner.strip(), node.attrs.get("href", "")
+            return f"[{text}]({href})" if text and href else inner
+        if tag in ("strong", "b"):
+            return _wrap(inner, "**")
+        if tag in ("em", "i"):
+            return _wrap(inner, "_")
+        if tag == "code":
+            return _wrap(inner, "`")
+        if tag == "blockquote":
+            lines = [line.strip() for line in inner.strip().split("\n")]
+            quoted = _BLANK_LINES.sub("\n\n", "\n".join(lines)).replace("\n", "\n> ").replace("> \n", ">\n")
+            quoted = f"> {quoted}"
+            return f"\n\n{quoted}\n\n"
+        if tag in CELL_TAGS:
+            return f"{inner.strip()} "
+        if tag in BLOCK_TAGS or tag == "li":
+            return f"\n\n{inner.strip()}\n\n"
+        return inner
+
+    def _render_list(self, node: Node, depth: int, pre: bool) -> str:
+        items: List[str] = []
+        ordered = node.tag == "ol"
+        number = int(node.attrs.get("start", "1") or 1) if ordered else 0
+        indent = "  " * depth
+        for child in node.children:
+            if not isinstance(child, Node):
+                continue
+            if child.tag in ("ul", "ol"):
+                items.append(self._render_list(child, depth + 1, pre).strip("\n"))
+                continue
+            text = "".join(self._render(c, depth + 1, pre) for c in child.children)
+            # Items stay tight, nested lists and paragraphs go on the following lines
+            text = _LINE_BREAKS.sub("\n", text).strip()
+            marker = f"{number}." if ordered else "*"
+            number += 1
+            items.append(f"{indent}{marker} {text}")
+        return "\n\n" + "\n".join(items) + "\n\n"
+
+
+def _wrap(text: str, marker: str) -> str:
+    stripped = text.strip()
+    if not stripped:
+        return text
+    # Keep the surrounding spaces outside the markers, "a<b> x </b>b" -> "a **x** b"
+    lead = " " if text[:1].isspace() else ""
+    trail = " " if text[-1:].isspace() else ""
+    return f"{lead}{marker}{stripped}{marker}{trail}"
+
+
+# Registered backends by name, see NEWSLETTER_HTML_BACKEND
+BACKENDS: Dict[str, Type[MarkdownBackend]] = {}
+
+
+def register_backend(backend: Type[MarkdownBackend]) -> Type[MarkdownBackend]:
+    """
+    Register a backend class under its name.
+
+    Raises:
+        TypeError: If the class does not implement every abstract method
+    """
+    if getattr(backend, "__abstractmethods__", None):
+        raise TypeError(f"Backend {backend.__name__} does not implement: {', '.join(sorted(backend.__abstractmethods__))}")
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+register_backend(Html2TextBackend)
+register_backend(LiteBackend)
+
+
+def get_backend(name: str) -> MarkdownBackend:
+    """
+    Create a backend by name.
+
+    Raises:
+        ValueError: If no backend of that name is registered
+    """
+    try:
+        factory = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown HTML converter backend {name!r}, choose from: {', '.join(BACKENDS)}")
+    return factory()
@@ -0,0 +1,131 @@
+# ABOUTME: Local SQLite cache of fetched newsletters with per-mailbox UIDVALIDITY/UID sync checkpoints
+# ABOUTME: Lets each run fetch only new UIDs and assemble the weekly set from messages already on disk
+
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from src.newsletter.email_fetcher import EmailData
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Checkpoint:
+    """Sync position of a mailbox: valid only while UIDVALIDITY is unchanged."""
+    uidvalidity: int
+    last_uid: int
+
+
+class MessageStore:
+    """
+    SQLite store of whitelisted messages and mailbox checkpoints.
+
+    Messages are keyed by (mailbox, uidvalidity, uid), so re-fetching a
+    message after an interrupted run simply replaces it.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "mailbox TEXT PRIMARY KEY, "
+            "uidvalidity INTEGER NOT NULL, "
+            "last_uid INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "mailbox TEXT NOT NULL, "
+            "uidvalidity INTEGER NOT NULL, "
+            "uid INTEGER NOT NULL, "
+            "ts REAL NOT NULL, "
+            "date TEXT NOT NULL, "
+            "sender TEXT NOT NULL, "
+            "subject TEXT NOT NULL, "
+            "message_id TEXT NOT NULL, "
+            "body_text TEXT NOT NULL, "
+            "body_html TEXT NOT NULL, "
+            "PRIMARY KEY (mailbox, uidvalidity, uid))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS messages_ts ON messages (ts)")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def checkpoint(self, mailbox: str) -> Optional[Checkpoint]:
+        """Last sync position of a mailbox (None if never synced)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT uidvalidity, last_uid FROM checkpoints WHERE mailbox = ?", (mailbox,)
+            ).fetchone()
+        return Checkpoint(*row) if row else None
+
+    def save_checkpoint(self, mailbox: str, checkpoint: Checkpoint) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+                (mailbox, checkpoint.uidvalidity, checkpoint.last_uid)
+            )
+
+    def reset(self, mailbox: str) -> None:
+        """Forget a mailbox whose UIDs were invalidated (UIDVALIDITY changed)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE mailbox = ?", (mailbox,))
+            self._conn.execute("DELETE FROM checkpoints WHERE mailbox = ?", (mailbox,))
+        logger.info(f"Message store reset for mailbox {mailbox}")
+
+    def add(self, mailbox: str, uidvalidity: int, uid: int, email: EmailData) -> None:
+        """Store a fetched message."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (mailbox, uidvalidity, uid, email.date.timestamp(), email.date.isoformat(),
+                 email.sender, email.subject, email.message_id, email.body_text, email.body_html)
+            )
+
+    def since(self, mailbox: str, cutoff: datetime) -> Iterator[EmailData]:
+        """
+        Stored messages of a mailbox dated at or after cutoff, in UID order.
+
+        Bodies are loaded one message at a time as the iterator advances.
+        """
+        with self._lock:
+            keys = self._conn.execute(
+                "SELECT uidvalidity, uid FROM messages WHERE mailbox = ? AND ts >= ? ORDER BY uid",
+                (mailbox, cutoff.timestamp())
+            ).fetchall()
+        for uidvalidity, uid in keys:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT date, sender, subject, message_id, body_text, body_html FROM messages "
+                    "WHERE mailbox = ? AND uidvalidity = ? AND uid = ?",
+                    (mailbox, uidvalidity, uid)
+                ).fetchone()
+            if row is None:
+                continue
+            date, sender, subject, message_id, body_text, body_html = row
+            yield EmailData(
+                sender=sender,
+                subject=subject,
+                date=datetime.fromisoformat(date),
+                body_text=body_text,
+                body_html=body_html,
+                message_id=message_id
+            )
+
+    def prune(self, cutoff: datetime) -> int:
+        """Drop messages dated before cutoff, returns how many were removed."""
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM messages WHERE ts < ?", (cutoff.timestamp(),)).rowcount
+        if removed:
+            logger.info(f"Pruned {removed} cached messages older than {cutoff:%Y-%m-%d}")
+        return removed
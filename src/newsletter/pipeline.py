@@ -0,0 +1,164 @@
+# ABOUTME: Streaming fetch → convert → write pipeline for the weekly newsletter export
+# ABOUTME: Stages run in their own threads joined by bounded queues, so only a few messages are in memory at once
+
+import heapq
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple, TypeVar
+
+from src.newsletter.email_converter import PARALLEL_MIN_BATCH, EmailConverter
+from src.newsletter.email_fetcher import EmailData
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# End-of-stream marker passed through the queues
+_DONE = object()
+
+# Conversion workers start from a clean server process: forking the bot (event loop,
+# flusher and prefetch threads, SQLite connections) could copy locks held by other threads
+WORKER_START_METHOD = "forkserver"
+
+
+class _Failed:
+    """Exception raised by a stage, re-raised in the consuming thread."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(items: Iterable[T], depth: int = 1, name: str = "prefetch") -> Iterator[T]:
+    """
+    Iterate items in a background thread, at most `depth` items ahead.
+
+    The producer blocks once the queue is full, so a slow consumer keeps
+    memory bounded instead of letting the producer run away. Errors are
+    re-raised in the consumer. Closing the returned iterator stops the
+    producer and closes its source (e.g. logs out of IMAP).
+
+    Args:
+        items: Source iterable, consumed only by the background thread
+        depth: Max items waiting between producer and consumer
+        name: Thread name, for logs and debugging
+    """
+    handoff: queue.Queue = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                handoff.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        source = iter(items)
+        try:
+            for item in source:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failed(e))
+        finally:
+            close = getattr(source, "close", None)
+            if close:
+                close()
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = handoff.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def most_recent(emails: Iterable[EmailData], limit: int) -> list[EmailData]:
+    """Keep the `limit` most recent emails, oldest first, holding no more than that many."""
+    return sorted(heapq.nlargest(limit, emails, key=lambda e: e.date.timestamp()),
+                  key=lambda e: e.date.timestamp())
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Group items into lists of up to size."""
+    source = iter(items)
+    while batch := list(itertools.islice(source, size)):
+        yield batch
+
+
+def export_markdown(
+    emails: Iterable[EmailData],
+    converter: EmailConverter,
+    output_dir: Path,
+    depth: int = 1,
+    workers: int = 1,
+    chunk_size: int = 4
+) -> int:
+    """
+    Convert emails to Markdown files as they arrive.
+
+    Fetching/parsing, conversion and writing overlap: while one message
+    is converted, the next is downloaded and the previous one written.
+    With several workers, conversion takes windows of workers * chunk_size
+    messages and spreads each over a process pool, which is only started
+    once a window is big enough to be worth it. Files are numbered in
+    arrival order. The output folder is created on the first message, so
+    an empty week leaves nothing on disk.
+
+    Args:
+        emails: Emails in digest order, typically a lazy fetcher iterator
+        converter: Converter producing file names and contents
+        output_dir: Folder to write the .md files to
+        depth: Messages (or windows) buffered between consecutive stages
+        workers: Conversion processes, 1 converts in the pipeline thread
+        chunk_size: Messages per task submitted to a worker
+
+    Returns:
+        Number of files written
+    """
+    window = max(1, workers) * chunk_size if workers > 1 else 1
+
+    def convert() -> Iterator[List[Tuple[str, str]]]:
+        pool = None
+        sequence = 1
+        fetched = prefetch(emails, depth, name="newsletter-fetch")
+        try:
+            for batch in batched(fetched, window):
+                if pool is None and workers > 1 and len(batch) >= PARALLEL_MIN_BATCH:
+                    pool = ProcessPoolExecutor(
+                        max_workers=workers, mp_context=multiprocessing.get_context(WORKER_START_METHOD)
+                    )
+                    logger.info(f"Converting newsletters on {workers} worker processes")
+                yield converter.convert_batch(batch, start=sequence, executor=pool, chunk_size=chunk_size)
+                sequence += len(batch)
+        finally:
+            fetched.close()
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+    written = 0
+    for converted in prefetch(convert(), depth, name="newsletter-convert"):
+        for filename, markdown in converted:
+            if not written:
+                output_dir.mkdir(parents=True, exist_ok=True)
+                logger.info(f"Saving emails to {output_dir}")
+            (output_dir / filename).write_text(markdown, encoding='utf-8')
+            written += 1
+            logger.debug(f"Saved {filename}")
+
+    return written
@@ -1,15 +1,20 @@
 # ABOUTME: Orchestrates newsletter processing pipeline
-# ABOUTME: Coordinates email fetching, conversion, storage, and Claude analysis
+# ABOUTME: Coordinates streamed email fetching, conversion and storage, then Claude analysis
 
+import asyncio
 import logging
 import json
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List
 
-from src.newsletter.email_fetcher import EmailFetcher
+from src import metrics
+from src.newsletter.email_fetcher import EmailData, EmailFetcher
 from src.newsletter.email_converter import EmailConverter
 from src.newsletter.claude_runner import ClaudeRunner
+from src.newsletter.pipeline import export_markdown, most_recent
+from src.shutdown import JobStopped, check_stop
 
 logger = logging.getLogger(__name__)
 
@@ -17,16 +22,56 @@ logger = logging.getLogger(__name__)
 class NewsletterProcessor:
     """Orchestrates the newsletter digest pipeline."""
 
-    def __init__(self, imap_host: str, imap_port: int, imap_user: str, imap_password: str, senders_file: Path = None):
-        self.fetcher = EmailFetcher(imap_host, imap_port, imap_user, imap_password, senders_file=senders_file)
-        self.converter = EmailConverter()
+    def __init__(
+        self,
+        imap_host: str,
+        imap_port: int,
+        imap_user: str,
+        imap_password: str,
+        senders_file: Path = None,
+        fetch_batch_size: int = 50,
+        server_filter: bool = False,
+        store_path: Path = None,
+        mailboxes: List[str] | None = None,
+        connections: int = 3,
+        pipeline_depth: int = 1,
+        convert_workers: int = 1,
+        html_backend: str = "html2text",
+        html_slim: bool = True
+    ):
+        self.fetcher = EmailFetcher(
+            imap_host, imap_port, imap_user, imap_password,
+            senders_file=senders_file, batch_size=fetch_batch_size, server_filter=server_filter,
+            store_path=store_path
+        )
+        self.mailboxes = mailboxes or ["INBOX"]
+        self.connections = connections
+        # Messages buffered between the fetch, convert and write stages
+        self.pipeline_depth = pipeline_depth
+        # Processes converting HTML to Markdown (1 = in the pipeline thread)
+        self.convert_workers = convert_workers
+        self.converter = EmailConverter(backend=html_backend, slim=html_slim)
         self.runner = ClaudeRunner()
         self.base_dir = Path("newsletters")
 
-    def process(self) -> Dict[str, Any]:
+    def _emails(self) -> Iterable[EmailData]:
+        """Last week's emails, streamed from one mailbox or merged from several scanned concurrently."""
+        if len(self.mailboxes) == 1:
+            return self.fetcher.iter_last_week(self.mailboxes[0])
+
+        from src.newsletter.async_fetcher import AsyncEmailFetcher
+
+        # process() runs in a worker thread, so it can own a private event loop
+        return asyncio.run(AsyncEmailFetcher(self.fetcher, self.mailboxes, self.connections).fetch_last_week())
+
+    def process(self, max_items: int | None = None, stop: threading.Event | None = None) -> Dict[str, Any]:
         """
         Run complete newsletter processing pipeline.
 
+        Args:
+            max_items: Analyze only this many most recent emails (None = all)
+            stop: Event checked between emails, also kills the running Claude call
+
         Returns:
             Dict with processing results:
             {
@@ -36,13 +81,32 @@ class NewsletterProcessor:
                 "summary": str,
                 "error": str (if failed)
             }
+
+        Raises:
+            JobStopped: If stop was set before the pipeline finished
         """
         try:
-            # Step 1: Fetch emails
-            logger.info("Fetching emails from last week...")
-            emails = self.fetcher.fetch_last_week()
+            week_num = datetime.now().isocalendar()[1]
+            year = datetime.now().year
+            folder_name = f"{week_num:02d}_{year}"
+            output_dir = self.base_dir / folder_name
 
-            if not emails:
+            # Steps 1-3: Fetch, convert and save emails, streamed one message at a time
+            logger.info("Fetching emails from last week...")
+            emails = self._emails()
+            if max_items is not None:
+                logger.info(f"Downscaled digest: keeping at most {max_items} most recent emails")
+                emails = most_recent(emails, max_items)
+            if stop is not None:
+                emails = _until_stopped(emails, stop)
+
+            with metrics.span("newsletter_export"):
+                email_count = export_markdown(
+                    emails, self.converter, output_dir,
+                    depth=self.pipeline_depth, workers=self.convert_workers
+                )
+
+            if not email_count:
                 logger.info("No emails found in last week")
                 return {
                     "success": True,
@@ -51,30 +115,12 @@ class NewsletterProcessor:
                     "summary": "No newsletters received this week."
                 }
 
-            logger.info(f"Fetched {len(emails)} emails")
-
-            # Step 2: Create output folder
-            week_num = datetime.now().isocalendar()[1]
-            year = datetime.now().year
-            folder_name = f"{week_num:02d}_{year}"
-            output_dir = self.base_dir / folder_name
-            output_dir.mkdir(parents=True, exist_ok=True)
-
-            logger.info(f"Saving emails to {output_dir}")
-
-            # Step 3: Convert and save emails
-            for idx, email_data in enumerate(emails, start=1):
-                markdown = self.converter.to_markdown(email_data)
-                filename = self.converter.generate_filename(email_data, sequence=idx)
-
-                file_path = output_dir / filename
-                file_path.write_text(markdown, encoding='utf-8')
-                logger.debug(f"Saved {filename}")
+            logger.info(f"Saved {email_count} emails to {output_dir}")
 
             # Step 4: Save metadata
             metadata = {
                 "processed_at": datetime.now().isoformat(),
-                "email_count": len(emails),
+                "email_count": email_count,
                 "week": week_num,
                 "year": year
             }
@@ -83,8 +129,10 @@ class NewsletterProcessor:
             metadata_path.write_text(json.dumps(metadata, indent=2), encoding='utf-8')
 
             # Step 5: Run Claude analysis
+            check_stop(stop, "the newsletter analysis")
             logger.info("Running Claude analysis...")
-            analysis_output = self.runner.analyze_newsletters(str(output_dir))
+            with metrics.span("newsletter_analysis"):
+                analysis_output = self.runner.analyze_newsletters(str(output_dir), stop=stop)
 
             # Step 6: Read generated summary
             summary_path = output_dir / "summary.md"
@@ -99,11 +147,14 @@ class NewsletterProcessor:
 
             return {
                 "success": True,
-                "email_count": len(emails),
+                "email_count": email_count,
                 "folder": str(output_dir),
                 "summary": summary
             }
 
+        except JobStopped:
+            logger.info("Newsletter processing stopped")
+            raise
         except Exception as e:
             logger.error(f"Newsletter processing failed: {e}", exc_info=True)
             return {
@@ -113,3 +164,10 @@ class NewsletterProcessor:
                 "summary": None,
                 "error": str(e)
             }
+
+
+def _until_stopped(emails: Iterable[EmailData], stop: threading.Event) -> Iterable[EmailData]:
+    """Pass emails through, raising JobStopped at the next one once stop is set."""
+    for email in emails:
+        check_stop(stop, "the next email")
+        yield email
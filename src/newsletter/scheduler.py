@@ -4,8 +4,14 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
+from functools import partial
 from typing import Optional
 
+from src.delivery import delivery_queue
+from src.shutdown import ShuttingDown, run_stoppable, shutdown_coordinator
+from src.usage import Admission, usage_ledger
+from src.worker_pool import Lane
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +34,7 @@ class NewsletterScheduler:
         self.schedule_minute = schedule_minute
         self.processor_factory = processor_factory
         self._task: Optional[asyncio.Task] = None
+        self._deferred = False
 
     def _calculate_next_run(self, now: datetime) -> datetime:
         """
@@ -62,8 +69,22 @@ class NewsletterScheduler:
 
         return next_run
 
-    async def start(self):
-        """Start the scheduler loop."""
+    async def start(self, resume: bool = False):
+        """
+        Start the scheduler loop.
+
+        Args:
+            resume: Run the digest right away (it was cut off by a restart)
+        """
+        if resume:
+            logger.info("Resuming newsletter digest interrupted by the last shutdown")
+            try:
+                await self._run_until_admitted()
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                logger.error(f"Resumed newsletter digest failed: {e}", exc_info=True)
+
         logger.info(f"Starting newsletter scheduler (day={self.schedule_day}, hour={self.schedule_hour})")
 
         while True:
@@ -77,8 +98,8 @@ class NewsletterScheduler:
                 # Wait until scheduled time
                 await asyncio.sleep(wait_seconds)
 
-                # Run processing
-                await self._run_digest()
+                # Run processing, retried later while over budget
+                await self._run_until_admitted()
 
             except asyncio.CancelledError:
                 logger.info("Newsletter scheduler cancelled")
@@ -88,28 +109,75 @@ class NewsletterScheduler:
                 # Wait 1 hour before retrying on error
                 await asyncio.sleep(3600)
 
-    async def _run_digest(self):
-        """Execute newsletter processing and send to Telegram."""
+    async def _run_until_admitted(self):
+        """Run digest, retrying deferred runs until the next regular run is due."""
+        while not await self._run_tracked():
+            delay = usage_ledger.policy.defer_seconds
+            if datetime.now() + timedelta(seconds=delay) >= self._calculate_next_run(datetime.now()):
+                logger.warning("Newsletter digest skipped: over budget until next scheduled run")
+                self._deferred = False
+                return
+            logger.info(f"Newsletter digest deferred for {delay / 3600:.1f}h (budget)")
+            await asyncio.sleep(delay)
+
+    async def _run_tracked(self) -> bool:
+        """Run the digest as a journaled job, so a restart mid-run resumes it."""
+        try:
+            async with shutdown_coordinator.job("newsletter", self.user_id):
+                return await self._run_digest()
+        except ShuttingDown:
+            logger.info("Newsletter digest not started, shutting down")
+            return True
+
+    async def _run_digest(self) -> bool:
+        """
+        Execute newsletter processing and send to Telegram.
+
+        Returns:
+            False if the run was deferred for budget reasons, True otherwise
+        """
         logger.info("Starting newsletter digest processing...")
 
         try:
+            # Digests give way to interactive chat as the Claude budget runs low
+            decision = usage_ledger.admit(Lane.SCHEDULED)
+            if decision is Admission.DEFER:
+                if not self._deferred:
+                    await self._send("⏸ Newsletter digest odłożony - budżet Claude prawie wyczerpany (/usage)")
+                self._deferred = True
+                return False
+            self._deferred = False
+            max_items = usage_ledger.policy.downscale_limit if decision is Admission.DOWNSCALE else None
+
             # Create processor (factory pattern for testing)
             if self.processor_factory:
                 processor = self.processor_factory()
             else:
                 from src.newsletter.processor import NewsletterProcessor
-                from src.config import IMAP_HOST, IMAP_PORT, IMAP_USER, IMAP_PASSWORD, NEWSLETTER_SENDERS_FILE
+                from src.config import (
+                    IMAP_HOST, IMAP_PORT, IMAP_USER, IMAP_PASSWORD, IMAP_FETCH_BATCH, IMAP_SERVER_FILTER,
+                    IMAP_STORE_PATH, IMAP_MAILBOXES, IMAP_CONNECTIONS, NEWSLETTER_CONVERT_WORKERS,
+                    NEWSLETTER_HTML_BACKEND, NEWSLETTER_HTML_SLIM, NEWSLETTER_SENDERS_FILE
+                )
 
                 processor = NewsletterProcessor(
                     imap_host=IMAP_HOST,
                     imap_port=IMAP_PORT,
                     imap_user=IMAP_USER,
                     imap_password=IMAP_PASSWORD,
-                    senders_file=NEWSLETTER_SENDERS_FILE
+                    senders_file=NEWSLETTER_SENDERS_FILE,
+                    fetch_batch_size=IMAP_FETCH_BATCH,
+                    server_filter=IMAP_SERVER_FILTER,
+                    store_path=IMAP_STORE_PATH,
+                    mailboxes=IMAP_MAILBOXES,
+                    connections=IMAP_CONNECTIONS,
+                    convert_workers=NEWSLETTER_CONVERT_WORKERS,
+                    html_backend=NEWSLETTER_HTML_BACKEND,
+                    html_slim=NEWSLETTER_HTML_SLIM
                 )
 
-            # Run processing (blocking, but runs in executor implicitly)
-            result = processor.process()
+            # Run blocking pipeline in a worker thread, stopped with its Claude call if the job is cancelled
+            result = await run_stoppable(processor.process, max_items=max_items)
 
             # Send result to Telegram
             if result["success"]:
@@ -117,6 +185,8 @@ class NewsletterScheduler:
                 email_count = result["email_count"]
 
                 header = f"📬 Newsletter Digest - {email_count} maili z ostatniego tygodnia\n\n"
+                if max_items is not None:
+                    header += f"(Ograniczony budżet: tylko {max_items} najnowszych maili)\n\n"
                 message = header + summary
 
                 # Split if too long (Telegram limit 4096 chars)
@@ -124,12 +194,12 @@ class NewsletterScheduler:
                 chunks = split_long_message(message)
 
                 for chunk in chunks:
-                    await self.bot.send_message(self.user_id, chunk)
+                    await self._send(chunk)
 
                 logger.info("Newsletter digest sent successfully")
             else:
                 error_msg = f"❌ Newsletter digest failed: {result.get('error', 'Unknown error')}"
-                await self.bot.send_message(self.user_id, error_msg)
+                await self._send(error_msg)
                 logger.error(f"Processing failed: {result.get('error')}")
 
         except Exception as e:
@@ -137,10 +207,16 @@ class NewsletterScheduler:
             error_msg = f"❌ Newsletter digest error: {str(e)}"
 
             try:
-                await self.bot.send_message(self.user_id, error_msg)
+                await self._send(error_msg)
             except Exception as send_error:
                 logger.error(f"Failed to send error message: {send_error}")
 
+        return True
+
+    async def _send(self, text: str):
+        """Send message to the user through the rate-limited delivery queue."""
+        await delivery_queue.deliver(self.user_id, partial(self.bot.send_message, self.user_id, text))
+
     def stop(self):
         """Stop the scheduler."""
         if self._task:
@@ -0,0 +1,197 @@
+# ABOUTME: Compiled newsletter sender whitelist: hash lookups for addresses and domains, Aho-Corasick for substrings
+# ABOUTME: Supports exact, domain, regex and exclusion rules on top of the plain substring entries of senders.json
+
+import logging
+import re
+from collections import deque
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rule prefixes in senders.json, anything else is a plain substring entry
+ADDRESS_PREFIX = "addr:"
+DOMAIN_PREFIX = "domain:"
+REGEX_PREFIX = "re:"
+EXCLUDE_PREFIX = "!"
+
+# Below this many substring entries a plain `in` loop beats walking the automaton in Python
+AUTOMATON_THRESHOLD = 128
+
+
+class SubstringMatcher:
+    """
+    Aho-Corasick automaton answering "does the text contain any pattern?".
+
+    One pass over the text regardless of the number of patterns, instead
+    of one `in` check per pattern.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[bool] = [False]
+
+        for pattern in patterns:
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(False)
+                node = nxt
+            self._out[node] = True
+
+        # Breadth-first so every failure link points to an already linked, shallower node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] or self._out[self._fail[nxt]]
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1 or self._out[0]
+
+    def search(self, text: str) -> bool:
+        """True if any pattern occurs in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        if out[0]:
+            return True
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                return True
+        return False
+
+
+def _address(sender: str) -> str:
+    """Bare address of a From header, '"Name" <a@b.c>' -> 'a@b.c'."""
+    start = sender.rfind("<")
+    if start != -1:
+        end = sender.find(">", start)
+        return sender[start + 1:end if end != -1 else None].strip()
+    return sender.strip()
+
+
+class _RuleSet:
+    """One side (include or exclude) of the whitelist, compiled for matching."""
+
+    def __init__(self):
+        self.addresses: set[str] = set()
+        self.domains: set[str] = set()
+        self.regexes: List[re.Pattern] = []
+        self.substrings: List[str] = []
+        self.matcher: Optional[SubstringMatcher] = None
+        self._plain: set[str] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.addresses or self.domains or self.regexes or self.substrings)
+
+    def add(self, entry: str) -> None:
+        if entry.startswith(ADDRESS_PREFIX):
+            self.addresses.add(entry[len(ADDRESS_PREFIX):].strip().lower())
+        elif entry.startswith(DOMAIN_PREFIX):
+            self.domains.add(entry[len(DOMAIN_PREFIX):].strip().lstrip("@").lower())
+        elif entry.startswith(REGEX_PREFIX):
+            try:
+                self.regexes.append(re.compile(entry[len(REGEX_PREFIX):], re.IGNORECASE))
+            except re.error as e:
+                logger.warning(f"Ignoring invalid sender regex {entry!r}: {e}")
+        else:
+            self.substrings.append(entry.lower())
+
+    def compile(self) -> None:
+        if len(self.substrings) >= AUTOMATON_THRESHOLD:
+            self.matcher = SubstringMatcher(self.substrings)
+        # Plain full addresses and @domains are hit by hash before any substring scan
+        self._plain = set(self.substrings)
+
+    def matches(self, sender: str, address: str, domain_suffixes: List[str]) -> bool:
+        if address in self.addresses or address in self._plain:
+            return True
+        if any(suffix in self.domains for suffix in domain_suffixes):
+            return True
+        if domain_suffixes and "@" + domain_suffixes[0] in self._plain:
+            return True
+        if self.matcher:
+            if self.matcher.search(sender):
+                return True
+        elif any(entry in sender for entry in self.substrings):
+            return True
+        return any(regex.search(sender) for regex in self.regexes)
+
+
+class SenderRules:
+    """
+    Compiled sender whitelist.
+
+    Entries of senders.json:
+        "news@x.com", "@x.com", "x"  plain, matches if contained in the From header
+        "addr:news@x.com"              exact address
+        "domain:x.com"                 address at x.com or any subdomain of it
+        "re:^.*@(a|b)\\.com>?$"        regex searched in the From header
+        "!<any of the above>"          exclusion, wins over every include
+
+    Without include rules every sender not excluded is allowed.
+    """
+
+    def __init__(self, entries: Iterable[str]):
+        self._include = _RuleSet()
+        self._exclude = _RuleSet()
+        for entry in entries:
+            if entry.startswith(EXCLUDE_PREFIX):
+                self._exclude.add(entry[len(EXCLUDE_PREFIX):])
+            else:
+                self._include.add(entry)
+        self._include.compile()
+        self._exclude.compile()
+        # A short list of plain entries (the usual senders.json) is fastest as a straight scan
+        self._scan_only = (
+            not self._exclude and not self._include.matcher
+            and not (self._include.addresses or self._include.domains or self._include.regexes)
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self._include or self._exclude)
+
+    def allows(self, sender: str) -> bool:
+        """Check a decoded From header against the rules."""
+        if not self:
+            return True
+
+        sender_lower = sender.lower()
+        if self._scan_only:
+            return any(entry in sender_lower for entry in self._include.substrings)
+
+        address = _address(sender_lower)
+        domain = address.rpartition("@")[2] if "@" in address else ""
+        # news.x.com -> [news.x.com, x.com, com], one set lookup each
+        labels = domain.split(".") if domain else []
+        suffixes = [".".join(labels[i:]) for i in range(len(labels))]
+
+        if self._exclude and self._exclude.matches(sender_lower, address, suffixes):
+            return False
+        if not self._include:
+            return True
+        return self._include.matches(sender_lower, address, suffixes)
+
+    def search_terms(self) -> List[str]:
+        """
+        FROM terms for server-side SEARCH narrowing.
+
+        Empty when the includes cannot be expressed as FROM substrings
+        (regex rules), in which case the server must not narrow at all.
+        """
+        if self._include.regexes:
+            return []
+        return sorted(self._include.addresses | self._include.domains) + self._include.substrings
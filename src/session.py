@@ -1,32 +1,337 @@
-# ABOUTME: Session storage for Claude conversation continuity per Telegram user
-# ABOUTME: Manages session IDs in memory for conversation history tracking
+# ABOUTME: Session storage and lifecycle for Claude conversation continuity per Telegram user
+# ABOUTME: Read-through cache over pluggable backend, tracks usage, rotates long and expires idle sessions
 
+import json
 import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
-# Global dictionary: {telegram_user_id: claude_session_id}
-_sessions: dict[int, str] = {}
+
+@dataclass
+class SessionRecord:
+    """Claude session of a user with lifecycle counters."""
+    session_id: str
+    turns: int = 0
+    tokens: int = 0
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    summary: str = ""  # carried over from a rotated session, sent with the next prompt
+    recent: list[str] = field(default_factory=list)  # compact recent exchanges for the next summary
+
+
+@dataclass
+class SessionPolicy:
+    """Thresholds bounding how long a resumed session may grow."""
+    max_turns: int = 40
+    max_tokens: int = 200_000
+    idle_timeout: float = 12 * 3600
+    summary_turns: int = 3
+    summary_chars: int = 200
+
+
+# Global dictionary: {telegram_user_id: SessionRecord}
+# Hot-path cache in front of the configured backend
+_sessions: dict[int, SessionRecord] = {}
+
+_policy = SessionPolicy()
+
+# Marks a pending delete in the write-behind buffer
+_DELETED = object()
+
+
+class SessionBackend:
+    """Persistence interface for session records. Base implementation keeps nothing."""
+
+    def load_all(self) -> dict[int, SessionRecord]:
+        """Return all persisted sessions (used to warm the cache)."""
+        return {}
+
+    def get(self, user_id: int) -> SessionRecord | None:
+        """Look up a single session on cache miss."""
+        return None
+
+    def put(self, user_id: int, record: SessionRecord) -> None:
+        """Persist session record for a user."""
+
+    def delete(self, user_id: int) -> None:
+        """Remove persisted session for a user."""
+
+    def close(self) -> None:
+        """Flush pending writes and release resources."""
+
+
+class MemoryBackend(SessionBackend):
+    """Process-local storage, sessions are lost on restart."""
+
+
+_COLUMNS = {
+    "turns": "INTEGER NOT NULL DEFAULT 0",
+    "tokens": "INTEGER NOT NULL DEFAULT 0",
+    "created_at": "REAL NOT NULL DEFAULT 0",
+    "last_used": "REAL NOT NULL DEFAULT 0",
+    "summary": "TEXT NOT NULL DEFAULT ''",
+    "recent": "TEXT NOT NULL DEFAULT '[]'",
+}
+
+_SELECT = "SELECT user_id, session_id, turns, tokens, created_at, last_used, summary, recent FROM sessions"
+
+
+def _to_row(user_id: int, record: SessionRecord) -> tuple:
+    return (
+        user_id, record.session_id, record.turns, record.tokens,
+        record.created_at, record.last_used, record.summary, json.dumps(record.recent)
+    )
+
+
+def _from_row(row: tuple) -> SessionRecord:
+    _, session_id, turns, tokens, created_at, last_used, summary, recent = row
+    return SessionRecord(
+        session_id=session_id, turns=turns, tokens=tokens,
+        created_at=created_at, last_used=last_used,
+        summary=summary, recent=json.loads(recent)
+    )
+
+
+class SqliteBackend(SessionBackend):
+    """
+    SQLite session store in WAL mode with write-behind batching.
+
+    Writes are buffered and flushed by a background thread every
+    flush_interval seconds (or sooner once batch_size writes are pending),
+    so save/clear never wait on disk in the bot hot path.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 1.0, batch_size: int = 32):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._pending: dict[int, object] = {}
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "user_id INTEGER PRIMARY KEY, "
+            "session_id TEXT NOT NULL, "
+            "updated_at REAL NOT NULL)"
+        )
+        self._migrate()
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="session-flusher", daemon=True)
+        self._flusher.start()
+        logger.info(f"SQLite session store ready: {self.path}")
+
+    def _migrate(self) -> None:
+        """Add lifecycle columns to stores created by older versions."""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        for name, definition in _COLUMNS.items():
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE sessions ADD COLUMN {name} {definition}")
+        if "last_used" not in existing:
+            # Legacy rows start their lifecycle at the last write
+            self._conn.execute("UPDATE sessions SET created_at = updated_at, last_used = updated_at")
+
+    def load_all(self) -> dict[int, SessionRecord]:
+        with self._lock:
+            rows = self._conn.execute(_SELECT).fetchall()
+            sessions = {row[0]: _from_row(row) for row in rows}
+            for user_id, value in self._pending.items():
+                if value is _DELETED:
+                    sessions.pop(user_id, None)
+                else:
+                    sessions[user_id] = _from_row(value)
+        return sessions
+
+    def get(self, user_id: int) -> SessionRecord | None:
+        with self._lock:
+            if user_id in self._pending:
+                value = self._pending[user_id]
+                return None if value is _DELETED else _from_row(value)
+            row = self._conn.execute(f"{_SELECT} WHERE user_id = ?", (user_id,)).fetchone()
+        return _from_row(row) if row else None
+
+    def put(self, user_id: int, record: SessionRecord) -> None:
+        # Snapshot now, the cached record keeps mutating on the event loop thread
+        self._enqueue(user_id, _to_row(user_id, record))
+
+    def delete(self, user_id: int) -> None:
+        self._enqueue(user_id, _DELETED)
+
+    def flush(self) -> None:
+        """Write all pending changes in a single transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            now = time.time()
+            self._conn.execute("BEGIN")
+            for user_id, value in pending.items():
+                if value is _DELETED:
+                    self._conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+                else:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO sessions "
+                        "(user_id, session_id, turns, tokens, created_at, last_used, summary, recent, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        value + (now,)
+                    )
+            self._conn.execute("COMMIT")
+        logger.debug(f"Flushed {len(pending)} session changes")
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        self._conn.close()
+        logger.info("SQLite session store closed")
+
+    def _enqueue(self, user_id: int, value: object) -> None:
+        with self._lock:
+            self._pending[user_id] = value
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"Session flush failed: {e}", exc_info=True)
+
+
+_backend: SessionBackend = MemoryBackend()
+
+
+def configure_backend(backend: SessionBackend) -> None:
+    """
+    Replace session backend and warm the cache from it.
+
+    Args:
+        backend: Backend to persist sessions in
+    """
+    global _backend
+    _backend.close()
+    _backend = backend
+    _sessions.clear()
+    _sessions.update(backend.load_all())
+    logger.info(f"Session backend {type(backend).__name__} loaded {len(_sessions)} sessions")
+
+
+def configure_policy(policy: SessionPolicy) -> None:
+    """Set rotation and idle expiry thresholds."""
+    global _policy
+    _policy = policy
+    logger.info(f"Session policy: {policy}")
+
+
+def close_backend() -> None:
+    """Flush and close the active session backend."""
+    _backend.close()
+
+
+def _get_record(user_id: int) -> SessionRecord | None:
+    """Cached record for a user, reading through to the backend on miss."""
+    record = _sessions.get(user_id)
+    if record is None:
+        record = _backend.get(user_id)
+        if record:
+            _sessions[user_id] = record
+    return record
+
+
+def _build_summary(record: SessionRecord) -> str:
+    """Compact carry-over context from the latest exchanges of a session."""
+    if not record.recent:
+        return ""
+    exchanges = "\n".join(record.recent)
+    return f"Kontekst z poprzedniej rozmowy (skrót ostatnich wymian):\n{exchanges}"
+
+
+def _apply_lifecycle(user_id: int, record: SessionRecord) -> SessionRecord | None:
+    """Expire idle sessions and rotate sessions past the thresholds."""
+    if not record.session_id:
+        return record
+
+    idle = time.time() - record.last_used
+    if idle > _policy.idle_timeout:
+        logger.info(f"Session for user {user_id} expired after {idle / 3600:.1f}h idle")
+        del _sessions[user_id]
+        _backend.delete(user_id)
+        return None
+
+    if record.turns >= _policy.max_turns or record.tokens >= _policy.max_tokens:
+        logger.info(
+            f"Rotating session for user {user_id}: {record.turns} turns, ~{record.tokens} tokens"
+        )
+        rotated = SessionRecord(session_id="", summary=_build_summary(record))
+        _sessions[user_id] = rotated
+        _backend.put(user_id, rotated)
+        return rotated
+
+    return record
 
 
 def get_session(user_id: int) -> str | None:
     """
     Get session ID for a user.
 
+    Idle sessions expire and sessions over the rotation thresholds are
+    retired here, so callers start a fresh session (see get_carryover).
+
     Args:
         user_id: Telegram user ID
 
     Returns:
         Session ID if exists, None otherwise
     """
-    session_id = _sessions.get(user_id)
+    record = _get_record(user_id)
+    if record:
+        record = _apply_lifecycle(user_id, record)
+
+    session_id = record.session_id if record else None
     if session_id:
         logger.info(f"Found existing session for user {user_id}: {session_id[:8]}...")
     else:
         logger.info(f"No existing session for user {user_id}")
+        session_id = None
     return session_id
 
 
+def get_carryover(user_id: int) -> str | None:
+    """
+    Get summary of a rotated session to prepend to the first prompt of the next one.
+
+    Args:
+        user_id: Telegram user ID
+
+    Returns:
+        Summary text if a rotation is pending, None otherwise
+    """
+    record = _get_record(user_id)
+    if record and not record.session_id and record.summary:
+        return record.summary
+    return None
+
+
 def save_session(user_id: int, session_id: str) -> None:
     """
     Save session ID for a user.
@@ -35,10 +340,53 @@ def save_session(user_id: int, session_id: str) -> None:
         user_id: Telegram user ID
         session_id: Claude session ID to save
     """
-    _sessions[user_id] = session_id
+    record = _get_record(user_id)
+    if record is None:
+        record = SessionRecord(session_id=session_id)
+        _sessions[user_id] = record
+    else:
+        if not record.session_id:
+            # First turn of a rotated session, summary has been delivered
+            record.summary = ""
+        record.session_id = session_id
+        record.last_used = time.time()
+    _backend.put(user_id, record)
     logger.info(f"Saved session for user {user_id}: {session_id[:8]}...")
 
 
+def record_turn(
+    user_id: int,
+    prompt: str,
+    reply: str,
+    tokens: int | None = None,
+    context_tokens: int | None = None
+) -> None:
+    """
+    Account a completed turn against the user's session.
+
+    Args:
+        user_id: Telegram user ID
+        prompt: Prompt sent to Claude
+        reply: Claude's reply
+        tokens: Tokens added by the turn (estimated from text length when unknown)
+        context_tokens: Context size reported by Claude, replaces the running estimate
+    """
+    record = _sessions.get(user_id)
+    if record is None:
+        return
+
+    limit = _policy.summary_chars
+    record.turns += 1
+    if context_tokens is not None:
+        record.tokens = context_tokens
+    else:
+        record.tokens += tokens if tokens is not None else (len(prompt) + len(reply)) // 4
+    record.last_used = time.time()
+    record.recent.append(f"- Użytkownik: {prompt[:limit]}\n  Frank: {reply[:limit]}")
+    del record.recent[:-_policy.summary_turns]
+    _backend.put(user_id, record)
+
+
 def clear_session(user_id: int) -> None:
     """
     Clear session ID for a user (starts fresh conversation).
@@ -47,8 +395,9 @@ def clear_session(user_id: int) -> None:
         user_id: Telegram user ID
     """
     if user_id in _sessions:
-        old_session = _sessions[user_id]
+        old_session = _sessions[user_id].session_id
         del _sessions[user_id]
         logger.info(f"Cleared session for user {user_id}: {old_session[:8]}...")
     else:
         logger.info(f"No session to clear for user {user_id}")
+    _backend.delete(user_id)
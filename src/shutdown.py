@@ -0,0 +1,213 @@
+# ABOUTME: Shutdown coordinator that drains in-flight Claude jobs up to a deadline before exit
+# ABOUTME: Running jobs are journaled to disk so the next start can resume digests and report lost chat turns
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class ShuttingDown(Exception):
+    """Raised when a job is started after shutdown began."""
+
+
+class JobStopped(Exception):
+    """Raised in a worker thread whose job was told to stop."""
+
+
+def check_stop(stop: threading.Event | None, what: str) -> None:
+    """
+    Stop point of a blocking job, called between items.
+
+    Raises:
+        JobStopped: If the job's stop event is set
+    """
+    if stop is not None and stop.is_set():
+        raise JobStopped(f"Stopped before {what}")
+
+
+async def run_stoppable(func, *args, **kwargs):
+    """
+    Run a blocking job in a worker thread that stops when its task is cancelled.
+
+    func receives a threading.Event as the stop keyword argument. Cancelling
+    the awaiting task alone would leave the thread running (and any claude
+    process it waits on); instead the event is set and the cancellation
+    waits until the thread returns, so nothing outlives the drain deadline
+    or completes a job that was already journaled.
+    """
+    stop = threading.Event()
+    future = asyncio.ensure_future(asyncio.to_thread(func, *args, stop=stop, **kwargs))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        stop.set()
+        await asyncio.wait([future])
+        if not future.cancelled() and future.exception():
+            logger.info(f"Stopped job thread: {future.exception()}")
+        raise
+
+
+@dataclass
+class JournalEntry:
+    """A Claude job that was running (chat turn or digest)."""
+    kind: str
+    user_id: int
+    payload: dict = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+
+
+@dataclass
+class _Job:
+    entry: JournalEntry
+    task: asyncio.Task
+    done: asyncio.Future
+
+
+class ShutdownCoordinator:
+    """
+    Tracks in-flight jobs and drains them on shutdown.
+
+    Every running job is written ahead to a small JSON journal, so jobs
+    lost to a crash are found on the next start just like jobs that did
+    not finish before the drain deadline. A job that completes (or fails)
+    normally is removed from the journal.
+    """
+
+    def __init__(self, journal_path: Path | None = None, drain_seconds: float = 60.0):
+        self.journal_path = Path(journal_path) if journal_path else None
+        self.drain_seconds = drain_seconds
+        self.closing = False
+        self._deadline: float | None = None
+        self._jobs: dict[str, _Job] = {}
+        self._interrupted: list[JournalEntry] = []
+
+    def configure(self, journal_path: Path | None = None, drain_seconds: float | None = None) -> None:
+        """Set where the journal is kept and how long shutdown waits for jobs."""
+        if journal_path:
+            self.journal_path = Path(journal_path)
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        if drain_seconds is not None:
+            self.drain_seconds = drain_seconds
+        logger.info(f"Shutdown coordinator configured: journal={self.journal_path or 'memory'}, "
+                    f"drain={self.drain_seconds}s")
+
+    def in_flight(self) -> list[JournalEntry]:
+        """Jobs currently running."""
+        return [job.entry for job in self._jobs.values()]
+
+    def recover(self) -> list[JournalEntry]:
+        """
+        Load jobs left unfinished by the previous run and clear the journal.
+
+        Returns:
+            Journal entries, oldest first (empty when there is no journal)
+        """
+        if not self.journal_path or not self.journal_path.exists():
+            return []
+
+        try:
+            entries = [JournalEntry(**item) for item in json.loads(self.journal_path.read_text())]
+        except (OSError, ValueError, TypeError) as e:
+            logger.error(f"Unreadable job journal {self.journal_path}, ignoring: {e}")
+            entries = []
+
+        self.journal_path.unlink(missing_ok=True)
+        if entries:
+            logger.warning(f"Recovered {len(entries)} unfinished jobs: "
+                           f"{', '.join(entry.kind for entry in entries)}")
+        return sorted(entries, key=lambda entry: entry.started_at)
+
+    @asynccontextmanager
+    async def job(self, kind: str, user_id: int, **payload):
+        """
+        Track the current task as an in-flight job.
+
+        Args:
+            kind: Job type (chat, newsletter, blog)
+            user_id: User the job belongs to
+            **payload: JSON-serializable details needed to resume or report it
+
+        Raises:
+            ShuttingDown: If shutdown already began
+        """
+        if self.closing:
+            raise ShuttingDown(f"Not starting {kind} job, shutting down")
+
+        entry = JournalEntry(kind=kind, user_id=user_id, payload=payload)
+        job = _Job(entry, asyncio.current_task(), asyncio.get_running_loop().create_future())
+        self._jobs[entry.id] = job
+        self._write()
+        try:
+            yield entry
+        except asyncio.CancelledError:
+            if self.closing:
+                # Cut off by the drain deadline, keep it for the next start
+                self._interrupted.append(entry)
+            raise
+        finally:
+            del self._jobs[entry.id]
+            self._write()
+            job.done.set_result(None)
+
+    def close(self) -> None:
+        """Stop accepting jobs and start the drain deadline (idempotent)."""
+        if self.closing:
+            return
+        self.closing = True
+        self._deadline = time.monotonic() + self.drain_seconds
+        logger.info(f"Shutdown started: {len(self._jobs)} jobs in flight, draining for up to {self.drain_seconds}s")
+
+    async def drain(self) -> list[JournalEntry]:
+        """
+        Wait for in-flight jobs until the deadline, then cancel the rest.
+
+        Returns:
+            Jobs that did not finish and were left in the journal
+        """
+        self.close()
+        jobs = list(self._jobs.values())
+        if jobs:
+            remaining = max(0.0, self._deadline - time.monotonic())
+            _, pending = await asyncio.wait([job.done for job in jobs], timeout=remaining)
+            unfinished = [job for job in jobs if job.done in pending]
+            if unfinished:
+                logger.warning(f"Cancelling {len(unfinished)} jobs still running at the drain deadline")
+                for job in unfinished:
+                    job.task.cancel()
+                await asyncio.gather(*(job.done for job in unfinished), return_exceptions=True)
+
+        if self._interrupted:
+            logger.warning(f"Journaled {len(self._interrupted)} unfinished jobs for the next start")
+        else:
+            logger.info("All jobs drained")
+        return list(self._interrupted)
+
+    def _write(self) -> None:
+        """Persist running and interrupted jobs (atomic replace)."""
+        if not self.journal_path:
+            return
+
+        entries = self._interrupted + [job.entry for job in self._jobs.values()]
+        try:
+            if not entries:
+                self.journal_path.unlink(missing_ok=True)
+                return
+            tmp = self.journal_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps([asdict(entry) for entry in entries], ensure_ascii=False))
+            os.replace(tmp, self.journal_path)
+        except OSError as e:
+            logger.error(f"Failed to write job journal {self.journal_path}: {e}")
+
+
+# Process-wide coordinator shared by chat turns and digest schedulers
+shutdown_coordinator = ShutdownCoordinator()
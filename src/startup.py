@@ -0,0 +1,52 @@
+# ABOUTME: Phase-by-phase wall-clock timing of bot start-up (imports, config, state restore, connect)
+# ABOUTME: Logs a one-line breakdown once the bot is ready and exports each phase as a metrics span
+
+import logging
+import time
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    Times consecutive start-up phases.
+
+    Each mark() closes the phase running since the previous mark, so the
+    phases add up to the total time since the timer was created.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: list[tuple[str, float]] = []
+
+    def mark(self, phase: str) -> float:
+        """
+        Close the current phase.
+
+        Args:
+            phase: Name of the phase that just finished
+
+        Returns:
+            Seconds spent in the phase
+        """
+        now = time.perf_counter()
+        seconds, self._last = now - self._last, now
+        self.phases.append((phase, seconds))
+        metrics.observe("startup", seconds, phase=phase)
+        return seconds
+
+    @property
+    def total(self) -> float:
+        """Seconds from creation to the last mark."""
+        return self._last - self.started
+
+    def report(self) -> str:
+        """One-line breakdown, e.g. 'Started in 4.31s: config 0.01s, aiogram 4.10s, ...'."""
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases)
+        return f"Started in {self.total:.2f}s: {phases}"
+
+    def log(self) -> None:
+        logger.info(self.report())
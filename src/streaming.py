@@ -0,0 +1,90 @@
+# ABOUTME: Live Telegram reply that is progressively edited while Claude streams output
+# ABOUTME: Throttles edits, rolls over to new messages past the Telegram size limit
+
+import logging
+import time
+from functools import partial
+
+from src.delivery import DeliveryQueue, delivery_queue
+from src.formatter import AnsiSanitizer, remove_ansi_codes, split_long_message
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingReply:
+    """Renders streamed text into a growing series of Telegram messages."""
+
+    def __init__(
+        self,
+        message,
+        placeholder,
+        max_length: int = 4096,
+        edit_interval: float = 1.0,
+        delivery: DeliveryQueue = delivery_queue
+    ):
+        """
+        Args:
+            message: Incoming user message (used to send rollover messages)
+            placeholder: Already sent status message that gets edited first
+            max_length: Max characters per Telegram message
+            edit_interval: Min seconds between interim edits
+            delivery: Queue pacing the edits and sends
+        """
+        self._message = message
+        self._delivery = delivery
+        self._chat_id = message.chat.id
+        self._messages = [placeholder]
+        self._rendered = [None]
+        self._parts: list[str] = []
+        self._sanitizer = AnsiSanitizer()
+        self._max_length = max_length
+        self._edit_interval = edit_interval
+        self._last_render = 0.0
+
+    @property
+    def text(self) -> str:
+        """Text streamed so far."""
+        return "".join(self._parts)
+
+    async def append(self, fragment: str) -> None:
+        """Add streamed fragment, re-rendering at most once per edit interval."""
+        # Sanitize incrementally so renders never rescan the whole preview
+        self._parts.append(self._sanitizer.feed(fragment))
+
+        now = time.monotonic()
+        if now - self._last_render < self._edit_interval:
+            return
+        self._last_render = now
+
+        try:
+            await self._render(self.text)
+        except Exception as e:
+            # Interim edits are best effort, the final render reports failures
+            logger.warning(f"Interim stream edit failed: {e}")
+
+    async def finish(self, final_text: str) -> None:
+        """Replace streamed preview with the final result text."""
+        await self._render(remove_ansi_codes(final_text))
+
+    async def _render(self, text: str) -> None:
+        """Sync Telegram messages with already sanitized text, editing only what changed."""
+        if not text.strip():
+            return
+
+        chunks = split_long_message(text, max_length=self._max_length)
+
+        for idx, chunk in enumerate(chunks):
+            if idx < len(self._messages):
+                if self._rendered[idx] != chunk:
+                    await self._delivery.deliver(self._chat_id, partial(self._messages[idx].edit_text, chunk))
+                    self._rendered[idx] = chunk
+            else:
+                sent = await self._delivery.deliver(self._chat_id, partial(self._message.answer, chunk))
+                self._messages.append(sent)
+                self._rendered.append(chunk)
+
+        # Final text may be shorter than the streamed preview
+        while len(self._messages) > len(chunks):
+            stale = self._messages.pop()
+            self._rendered.pop()
+            await self._delivery.deliver(self._chat_id, stale.delete)
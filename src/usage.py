@@ -0,0 +1,267 @@
+# ABOUTME: Token and cost accounting for every Claude run with daily/weekly aggregates in SQLite
+# ABOUTME: Budget-aware admission: digests are downscaled or deferred before interactive chat is refused
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+
+from src.worker_pool import Lane
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RunUsage:
+    """Tokens and cost reported by a single Claude run."""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    cost_usd: float = 0.0
+    # Context size after the last model call of the run, None when only run totals are known
+    context_tokens: int | None = None
+
+    @staticmethod
+    def context_size(usage: dict) -> int:
+        """
+        Context size after a single model call.
+
+        Takes the usage of one API request (the "usage" of a stream-json
+        assistant message). The result object's usage is totalled over every
+        model call of the run, so it is not a measure of the context.
+        """
+        return sum(
+            int(usage.get(name, 0) or 0)
+            for name in ("input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens", "output_tokens")
+        )
+
+    @classmethod
+    def from_response(cls, response: dict) -> "RunUsage | None":
+        """Extract usage from a claude CLI result object (None if it carries none)."""
+        usage = response.get("usage")
+        cost = response.get("total_cost_usd", response.get("cost_usd"))
+        if not isinstance(usage, dict) and cost is None:
+            return None
+
+        usage = usage if isinstance(usage, dict) else {}
+        return cls(
+            input_tokens=int(usage.get("input_tokens", 0) or 0),
+            output_tokens=int(usage.get("output_tokens", 0) or 0),
+            cache_read_tokens=int(usage.get("cache_read_input_tokens", 0) or 0),
+            cache_creation_tokens=int(usage.get("cache_creation_input_tokens", 0) or 0),
+            cost_usd=float(cost or 0.0),
+        )
+
+
+def parse_text_output(stdout: str) -> tuple[str, RunUsage | None]:
+    """
+    Parse output of a runner invoked with --output-format json.
+
+    Falls back to treating stdout as the plain text answer when it is not
+    a JSON result object (older CLI or text output).
+
+    Returns:
+        Tuple of (result_text, usage)
+    """
+    try:
+        response = json.loads(stdout)
+    except json.JSONDecodeError:
+        return stdout, None
+    if not isinstance(response, dict) or "result" not in response:
+        return stdout, None
+    return response.get("result") or "", RunUsage.from_response(response)
+
+
+class Admission(Enum):
+    """Budget decision for a Claude job."""
+    ALLOW = "allow"
+    DOWNSCALE = "downscale"  # run with reduced scope
+    DEFER = "defer"          # postpone until budget frees up
+    REJECT = "reject"        # budget exhausted
+
+
+@dataclass
+class BudgetPolicy:
+    """Spend limits (0 = unlimited) and thresholds as a fraction of the limit."""
+    daily_usd: float = 0.0
+    weekly_usd: float = 0.0
+    downscale_at: float = 0.7
+    defer_at: float = 0.9
+    defer_seconds: float = 6 * 3600
+    downscale_limit: int = 5
+
+
+def _day_start(now: datetime) -> float:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+def _week_start(now: datetime) -> float:
+    monday = now - timedelta(days=now.weekday())
+    return _day_start(monday)
+
+
+class UsageLedger:
+    """
+    Append-only log of Claude runs with aggregate queries.
+
+    Keeps rows in SQLite (in memory until configured with a path); one
+    small insert per Claude run, so writes happen inline under a lock.
+    """
+
+    def __init__(self, path: Path | None = None, policy: BudgetPolicy | None = None):
+        self.policy = policy or BudgetPolicy()
+        self._lock = threading.Lock()
+        self._conn = self._connect(path)
+
+    def _connect(self, path: Path | None) -> sqlite3.Connection:
+        if path:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path) if path else ":memory:", check_same_thread=False, isolation_level=None)
+        if path:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            "ts REAL NOT NULL, "
+            "source TEXT NOT NULL, "
+            "input_tokens INTEGER NOT NULL, "
+            "output_tokens INTEGER NOT NULL, "
+            "cache_read_tokens INTEGER NOT NULL, "
+            "cache_creation_tokens INTEGER NOT NULL, "
+            "cost_usd REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS usage_ts ON usage (ts)")
+        return conn
+
+    def configure(self, path: Path | None = None, policy: BudgetPolicy | None = None) -> None:
+        """Switch to a persistent store and/or a new budget policy."""
+        with self._lock:
+            if path:
+                self._conn.close()
+                self._conn = self._connect(path)
+            if policy:
+                self.policy = policy
+        logger.info(f"Usage ledger configured: store={path or 'memory'}, policy={self.policy}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def record(self, source: str, usage: RunUsage | None, ts: float | None = None) -> None:
+        """
+        Log usage of a Claude run.
+
+        Args:
+            source: Pipeline that ran Claude (chat, newsletter, blog-fetch, ...)
+            usage: Usage reported by the run (ignored when None)
+            ts: Unix timestamp of the run (defaults to now)
+        """
+        if usage is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (ts or time.time(), source, usage.input_tokens, usage.output_tokens,
+                 usage.cache_read_tokens, usage.cache_creation_tokens, usage.cost_usd)
+            )
+        logger.info(f"Usage [{source}]: {usage.input_tokens} in / {usage.output_tokens} out, ${usage.cost_usd:.4f}")
+
+    def totals(self, since: float) -> dict:
+        """Aggregate runs, tokens and cost since a timestamp."""
+        with self._lock:
+            runs, tokens_in, tokens_out, cost = self._conn.execute(
+                "SELECT COUNT(*), "
+                "COALESCE(SUM(input_tokens + cache_read_tokens + cache_creation_tokens), 0), "
+                "COALESCE(SUM(output_tokens), 0), COALESCE(SUM(cost_usd), 0) "
+                "FROM usage WHERE ts >= ?",
+                (since,)
+            ).fetchone()
+        return {"runs": runs, "input_tokens": tokens_in, "output_tokens": tokens_out, "cost_usd": cost}
+
+    def by_source(self, since: float) -> dict[str, float]:
+        """Cost per source since a timestamp."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, SUM(cost_usd) FROM usage WHERE ts >= ? GROUP BY source ORDER BY 2 DESC",
+                (since,)
+            ).fetchall()
+        return dict(rows)
+
+    def day_totals(self, now: datetime | None = None) -> dict:
+        return self.totals(_day_start(now or datetime.now()))
+
+    def week_totals(self, now: datetime | None = None) -> dict:
+        return self.totals(_week_start(now or datetime.now()))
+
+    def budget_used(self, now: datetime | None = None) -> float:
+        """Largest fraction of the daily or weekly budget spent so far (0 when unlimited)."""
+        now = now or datetime.now()
+        used = 0.0
+        if self.policy.daily_usd:
+            used = max(used, self.day_totals(now)["cost_usd"] / self.policy.daily_usd)
+        if self.policy.weekly_usd:
+            used = max(used, self.week_totals(now)["cost_usd"] / self.policy.weekly_usd)
+        return used
+
+    def admit(self, lane: Lane, now: datetime | None = None) -> Admission:
+        """
+        Decide whether a Claude job may run given the remaining budget.
+
+        Scheduled digests are downscaled and then deferred as spend grows;
+        interactive chat keeps running until the budget is exhausted.
+        """
+        used = self.budget_used(now)
+        if used >= 1.0:
+            decision = Admission.DEFER if lane == Lane.SCHEDULED else Admission.REJECT
+        elif lane == Lane.INTERACTIVE:
+            decision = Admission.ALLOW
+        elif used >= self.policy.defer_at:
+            decision = Admission.DEFER
+        elif used >= self.policy.downscale_at:
+            decision = Admission.DOWNSCALE
+        else:
+            decision = Admission.ALLOW
+
+        if decision is not Admission.ALLOW:
+            logger.warning(f"Budget {used:.0%} used, {lane.name.lower()} job: {decision.value}")
+        return decision
+
+    def report(self, now: datetime | None = None) -> str:
+        """Human readable spend summary for the /usage command."""
+        now = now or datetime.now()
+        day = self.day_totals(now)
+        week = self.week_totals(now)
+
+        def line(label: str, totals: dict, limit: float) -> str:
+            budget = f" / ${limit:.2f} ({totals['cost_usd'] / limit:.0%})" if limit else ""
+            return (f"{label}: ${totals['cost_usd']:.2f}{budget}, {totals['runs']} wywołań, "
+                    f"{totals['input_tokens']:,} tok. wej. / {totals['output_tokens']:,} tok. wyj.")
+
+        lines = [
+            "📊 Zużycie Claude",
+            line("Dziś", day, self.policy.daily_usd),
+            line("Ten tydzień", week, self.policy.weekly_usd),
+        ]
+
+        sources = self.by_source(_week_start(now))
+        if sources:
+            lines.append("")
+            lines.append("Tydzień wg źródła:")
+            lines.extend(f"- {source}: ${cost:.2f}" for source, cost in sources.items())
+
+        digest = self.admit(Lane.SCHEDULED, now)
+        if digest is not Admission.ALLOW:
+            lines.append("")
+            lines.append(f"Digesty: {digest.value} (budżet wykorzystany w {self.budget_used(now):.0%})")
+
+        return "\n".join(lines)
+
+
+# Process-wide ledger shared by chat and digest pipelines
+usage_ledger = UsageLedger()
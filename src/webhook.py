@@ -0,0 +1,111 @@
+# ABOUTME: Webhook ingestion mode serving Telegram updates through an aiohttp server
+# ABOUTME: Verifies the secret token, registers the webhook URL and drains in-flight updates on shutdown
+
+import asyncio
+import logging
+import signal
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+def build_webhook_app(
+    dp: Dispatcher,
+    bot: Bot,
+    path: str,
+    secret: str | None = None
+) -> tuple[web.Application, SimpleRequestHandler]:
+    """
+    Create aiohttp application feeding webhook updates into the dispatcher.
+
+    Updates are acknowledged right away and handled in the background, so
+    long Claude runs never hold the Telegram request open (and never
+    trigger redelivery).
+
+    Args:
+        dp: Dispatcher with handlers registered
+        bot: Bot the updates belong to
+        path: URL path Telegram posts updates to
+        secret: Expected X-Telegram-Bot-Api-Secret-Token header (None = no check)
+
+    Returns:
+        Tuple of (application, request_handler)
+    """
+    app = web.Application()
+    handler = SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=secret, handle_in_background=True)
+    handler.register(app, path=path)
+    setup_application(app, dp, bot=bot)
+    return app, handler
+
+
+async def _drain(handler: SimpleRequestHandler, timeout: float) -> None:
+    """Wait for updates still being handled in the background."""
+    # aiogram keeps background feed tasks in this set until they finish
+    pending = set(handler._background_feed_update_tasks)
+    if not pending:
+        return
+
+    logger.info(f"Waiting up to {timeout}s for {len(pending)} in-flight updates")
+    done, pending = await asyncio.wait(pending, timeout=timeout)
+    if pending:
+        logger.warning(f"Cancelling {len(pending)} updates still running after {timeout}s")
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def run_webhook(
+    dp: Dispatcher,
+    bot: Bot,
+    host: str,
+    port: int,
+    path: str,
+    base_url: str | None = None,
+    secret: str | None = None,
+    drain_timeout: float = 30.0,
+    stop: asyncio.Event | None = None
+) -> None:
+    """
+    Serve webhook updates until SIGINT/SIGTERM (or `stop` is set).
+
+    Args:
+        dp: Dispatcher with handlers registered
+        bot: Bot the updates belong to
+        host: Bind address
+        port: Bind port
+        path: URL path Telegram posts updates to
+        base_url: Public URL registered with Telegram (None = registered elsewhere)
+        secret: Secret token Telegram must send with every update
+        drain_timeout: Max seconds to wait for in-flight updates on shutdown
+        stop: Event ending the server (signal handlers are installed if None)
+    """
+    app, handler = build_webhook_app(dp, bot, path, secret)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info(f"Webhook server listening on http://{host}:{port}{path}")
+
+    if stop is None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+    try:
+        if base_url:
+            url = base_url.rstrip("/") + path
+            await bot.set_webhook(url, secret_token=secret, allowed_updates=dp.resolve_used_update_types())
+            logger.info(f"Webhook registered: {url}")
+
+        await stop.wait()
+        logger.info("Stopping webhook server...")
+    finally:
+        # Stop accepting updates first, then let running handlers finish
+        await site.stop()
+        await _drain(handler, drain_timeout)
+        await runner.cleanup()
+        logger.info("Webhook server stopped")
@@ -0,0 +1,175 @@
+# ABOUTME: Central bounded pool that every Claude subprocess must acquire a slot from
+# ABOUTME: Priority lanes keep interactive chat ahead of scheduled digests, tracks queue depth and wait
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Optional
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Lane(IntEnum):
+    """Priority lanes, lower value is served first."""
+    INTERACTIVE = 0
+    SCHEDULED = 1
+
+
+class ClaudePool:
+    """Caps concurrent Claude processes across chat and digest pipelines."""
+
+    def __init__(self, max_concurrency: int = 2):
+        self.max_concurrency = max_concurrency
+        self._active = 0
+        self._waiters: dict[Lane, deque[asyncio.Future]] = {lane: deque() for lane in Lane}
+        self._wait_count: dict[Lane, int] = {lane: 0 for lane in Lane}
+        self._wait_total: dict[Lane, float] = {lane: 0.0 for lane in Lane}
+        self._wait_max: dict[Lane, float] = {lane: 0.0 for lane in Lane}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def configure(self, max_concurrency: int, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Set concurrency limit and the event loop that owns the pool."""
+        self.max_concurrency = max_concurrency
+        if loop:
+            self._loop = loop
+        logger.info(f"Claude pool configured: max_concurrency={max_concurrency}")
+
+    @property
+    def active(self) -> int:
+        """Number of slots currently held."""
+        return self._active
+
+    def queue_depth(self, lane: Lane | None = None) -> int:
+        """Number of callers waiting for a slot (in one lane or in total)."""
+        if lane is not None:
+            return len(self._waiters[lane])
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def stats(self) -> dict:
+        """Snapshot of pool occupancy, queue depth and queue wait per lane."""
+        lanes = {}
+        for lane in Lane:
+            count = self._wait_count[lane]
+            lanes[lane.name.lower()] = {
+                "queued": len(self._waiters[lane]),
+                "acquired": count,
+                "avg_wait": self._wait_total[lane] / count if count else 0.0,
+                "max_wait": self._wait_max[lane],
+            }
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "lanes": lanes,
+        }
+
+    async def acquire(self, lane: Lane, name: str = "") -> float:
+        """
+        Wait for a free slot.
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        self._loop = self._loop or asyncio.get_running_loop()
+        start = time.monotonic()
+
+        if self._active < self.max_concurrency and not self._has_waiters(up_to=lane):
+            self._active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[lane].append(future)
+            logger.info(f"Queued Claude job {name or lane.name.lower()} (queue depth: {self.queue_depth()})")
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Slot was handed over right before cancellation, give it back
+                    self.release()
+                elif future in self._waiters[lane]:
+                    self._waiters[lane].remove(future)
+                raise
+
+        waited = time.monotonic() - start
+        self._record_wait(lane, waited)
+        logger.info(f"Claude slot acquired for {name or lane.name.lower()} after {waited:.2f}s "
+                    f"({self._active}/{self.max_concurrency} active)")
+        return waited
+
+    def release(self) -> None:
+        """Return a slot and hand it to the highest priority waiter."""
+        self._active -= 1
+        while self._active < self.max_concurrency:
+            future = self._next_waiter()
+            if future is None:
+                break
+            self._active += 1
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, lane: Lane, name: str = ""):
+        """Hold a slot for the duration of an async Claude call."""
+        await self.acquire(lane, name)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @contextmanager
+    def slot_sync(self, lane: Lane, name: str = ""):
+        """
+        Hold a slot from a worker thread running a blocking Claude call.
+
+        Falls back to running unmanaged when no event loop owns the pool
+        (standalone scripts) or when called on the loop thread itself,
+        where blocking for a slot would deadlock.
+        """
+        loop = self._loop
+        if loop is None or not loop.is_running() or _running_loop() is loop:
+            logger.debug(f"Claude pool not available for {name}, running unmanaged")
+            yield
+            return
+
+        asyncio.run_coroutine_threadsafe(self.acquire(lane, name), loop).result()
+        try:
+            yield
+        finally:
+            loop.call_soon_threadsafe(self.release)
+
+    def _has_waiters(self, up_to: Lane) -> bool:
+        """Check for queued callers with same or higher priority."""
+        return any(self._waiters[lane] for lane in Lane if lane <= up_to)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """Pop next live waiter in priority order."""
+        for lane in Lane:
+            waiters = self._waiters[lane]
+            while waiters:
+                future = waiters.popleft()
+                if not future.done():
+                    return future
+        return None
+
+    def _record_wait(self, lane: Lane, waited: float) -> None:
+        self._wait_count[lane] += 1
+        self._wait_total[lane] += waited
+        self._wait_max[lane] = max(self._wait_max[lane], waited)
+        metrics.observe("claude_queue_wait", waited, lane=lane.name.lower())
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Event loop running in current thread, if any."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+# Process-wide pool shared by all Claude call sites
+claude_pool = ClaudePool()
+
+metrics.registry.gauge("frank_claude_pool_active", "Claude slots currently held", lambda: claude_pool.active)
+metrics.registry.gauge("frank_claude_pool_queued", "Claude jobs waiting for a slot", claude_pool.queue_depth)
@@ -59,3 +59,37 @@ def test_process_handles_missing_sources_file(tmp_path):
     result = processor.process()
     assert result["success"] is False
     assert "error" in result
+
+
+def test_process_max_items_limits_sources(tmp_path, sources_file):
+    processor = BlogProcessor(sources_file=sources_file, base_dir=tmp_path)
+
+    with patch.object(processor.runner, "fetch_blog") as mock_fetch, \
+         patch.object(processor.summarizer, "summarize") as mock_summarize:
+        mock_fetch.return_value = tmp_path / "blog_example_com.md"
+        mock_summarize.return_value = "summary"
+
+        result = processor.process(max_items=1)
+
+    assert result["blog_count"] == 1
+    mock_fetch.assert_called_once()
+    assert mock_fetch.call_args.kwargs["name"] == "Example Blog"
+
+
+def test_process_stops_between_blogs(tmp_path, sources_file):
+    import threading
+    from src.shutdown import JobStopped
+    processor = BlogProcessor(sources_file=sources_file, base_dir=tmp_path)
+    stop = threading.Event()
+
+    def fetch(url, name, output_dir, stop):
+        stop.set()
+        return None
+
+    with patch.object(processor.runner, "fetch_blog", side_effect=fetch) as mock_fetch, \
+         patch.object(processor.summarizer, "summarize") as mock_summarize:
+        with pytest.raises(JobStopped):
+            processor.process(stop=stop)
+
+    assert mock_fetch.call_count == 1
+    mock_summarize.assert_not_called()
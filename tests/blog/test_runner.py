@@ -7,9 +7,16 @@ from unittest.mock import patch, MagicMock
 from src.blog.runner import BlogRunner
 
 
-def test_run_blog_returns_no_new_content_when_claude_says_so(tmp_path):
-    runner = BlogRunner()
-    with patch("subprocess.run") as mock_run:
+@pytest.fixture
+def prompt_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("prompts") / "blog_fetch_prompt.md"
+    path.write_text("Fetch new posts")
+    return str(path)
+
+
+def test_run_blog_returns_no_new_content_when_claude_says_so(tmp_path, prompt_file):
+    runner = BlogRunner(prompt_file=prompt_file)
+    with patch("src.blog.runner.run_claude_process") as mock_run:
         mock_run.return_value = MagicMock(
             returncode=0,
             stdout="NO_NEW_CONTENT",
@@ -24,9 +31,9 @@ def test_run_blog_returns_no_new_content_when_claude_says_so(tmp_path):
     assert list(tmp_path.iterdir()) == []
 
 
-def test_run_blog_saves_file_when_content_found(tmp_path):
-    runner = BlogRunner()
-    with patch("subprocess.run") as mock_run:
+def test_run_blog_saves_file_when_content_found(tmp_path, prompt_file):
+    runner = BlogRunner(prompt_file=prompt_file)
+    with patch("src.blog.runner.run_claude_process") as mock_run:
         mock_run.return_value = MagicMock(
             returncode=0,
             stdout="---\nsource: Example Blog\nurl: https://example.com/blog\n---\n\nSome content",
@@ -42,9 +49,9 @@ def test_run_blog_saves_file_when_content_found(tmp_path):
     assert "example.com" in result.name
 
 
-def test_run_blog_raises_on_claude_failure(tmp_path):
-    runner = BlogRunner()
-    with patch("subprocess.run") as mock_run:
+def test_run_blog_raises_on_claude_failure(tmp_path, prompt_file):
+    runner = BlogRunner(prompt_file=prompt_file)
+    with patch("src.blog.runner.run_claude_process") as mock_run:
         mock_run.return_value = MagicMock(
             returncode=1,
             stdout="",
@@ -56,3 +63,21 @@ def test_run_blog_raises_on_claude_failure(tmp_path):
                 name="Example Blog",
                 output_dir=tmp_path
             )
+
+
+def test_run_blog_parses_json_output_and_records_usage(tmp_path):
+    import json
+    runner = BlogRunner(prompt_file=str(tmp_path / "prompt.md"))
+    (tmp_path / "prompt.md").write_text("prompt")
+    with patch("src.blog.runner.run_claude_process") as mock_run, patch("src.blog.runner.usage_ledger") as mock_ledger:
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout=json.dumps({"result": "## New post", "total_cost_usd": 0.3, "usage": {"input_tokens": 5}}),
+            stderr=""
+        )
+        path = runner.fetch_blog(url="https://example.com/blog", name="Example", output_dir=tmp_path)
+
+    assert path.read_text() == "## New post"
+    source, usage = mock_ledger.record.call_args[0]
+    assert source == "blog-fetch"
+    assert usage.cost_usd == 0.3
@@ -1,9 +1,10 @@
 # ABOUTME: Tests for blog scheduler
 # ABOUTME: Verifies schedule calculation and Telegram delivery
 
+import asyncio
 import pytest
 from datetime import datetime
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 from src.blog.scheduler import BlogScheduler
 
 
@@ -46,3 +47,67 @@ async def test_run_digest_sends_telegram_on_success():
     call_args = bot.send_message.call_args_list[0][0]
     assert call_args[0] == 42
     assert "3" in call_args[1]
+
+
+@pytest.mark.asyncio
+async def test_run_digest_deferred_when_over_budget():
+    from src.usage import Admission
+    bot = MagicMock()
+    bot.send_message = AsyncMock()
+    scheduler = BlogScheduler(bot=bot, user_id=42, schedule_day=6, schedule_hour=21, schedule_minute=0)
+
+    with patch("src.blog.scheduler.usage_ledger") as mock_ledger, \
+         patch.object(scheduler, "_create_processor") as mock_factory:
+        mock_ledger.admit.return_value = Admission.DEFER
+        assert await scheduler._run_digest() is False
+        assert await scheduler._run_digest() is False
+
+    mock_factory.assert_not_called()
+    # User is told once, not on every retry
+    bot.send_message.assert_called_once()
+    assert "odłożony" in bot.send_message.call_args[0][1]
+
+
+@pytest.mark.asyncio
+async def test_run_digest_downscaled_when_budget_low():
+    from src.usage import Admission
+    bot = MagicMock()
+    bot.send_message = AsyncMock()
+    scheduler = BlogScheduler(bot=bot, user_id=42, schedule_day=6, schedule_hour=21, schedule_minute=0)
+
+    with patch("src.blog.scheduler.usage_ledger") as mock_ledger, \
+         patch.object(scheduler, "_create_processor") as mock_factory:
+        mock_ledger.admit.return_value = Admission.DOWNSCALE
+        mock_ledger.policy.downscale_limit = 2
+        mock_factory.return_value.process.return_value = {"success": True, "blog_count": 2, "summary": "short"}
+        assert await scheduler._run_digest() is True
+
+    mock_factory.return_value.process.assert_called_once_with(max_items=2, stop=ANY)
+
+
+@pytest.mark.asyncio
+async def test_start_resumes_interrupted_digest_first():
+    scheduler = BlogScheduler(bot=MagicMock(), user_id=42, schedule_day=6, schedule_hour=21, schedule_minute=0)
+
+    with patch.object(scheduler, "_run_until_admitted", AsyncMock()) as mock_run, \
+         patch("src.blog.scheduler.asyncio.sleep", AsyncMock(side_effect=asyncio.CancelledError)):
+        await scheduler.start(resume=True)
+
+    mock_run.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_digest_is_journaled_while_running():
+    from src.shutdown import shutdown_coordinator
+    scheduler = BlogScheduler(bot=MagicMock(), user_id=42, schedule_day=6, schedule_hour=21, schedule_minute=0)
+    seen = []
+
+    async def run_digest():
+        seen.extend(entry.kind for entry in shutdown_coordinator.in_flight())
+        return True
+
+    with patch.object(scheduler, "_run_digest", run_digest):
+        assert await scheduler._run_tracked() is True
+
+    assert seen == ["blog"]
+    assert shutdown_coordinator.in_flight() == []
@@ -7,10 +7,18 @@ from unittest.mock import patch, MagicMock
 from src.blog.summarizer import BlogSummarizer
 
 
-def test_summarize_returns_summary_text(tmp_path):
+@pytest.fixture
+def prompt_file(tmp_path):
+    path = tmp_path / "prompts" / "blog_summary_prompt.md"
+    path.parent.mkdir()
+    path.write_text("Summarize the blogs")
+    return str(path)
+
+
+def test_summarize_returns_summary_text(tmp_path, prompt_file):
     (tmp_path / "blog_example_com.md").write_text("some content")
-    summarizer = BlogSummarizer()
-    with patch("subprocess.run") as mock_run:
+    summarizer = BlogSummarizer(prompt_file=prompt_file)
+    with patch("src.blog.summarizer.run_claude_process") as mock_run:
         mock_run.return_value = MagicMock(
             returncode=0,
             stdout="## Summary\n\nKey insights here",
@@ -20,15 +28,15 @@ def test_summarize_returns_summary_text(tmp_path):
     assert "Key insights" in result
 
 
-def test_summarize_reads_summary_file_if_written(tmp_path):
+def test_summarize_reads_summary_file_if_written(tmp_path, prompt_file):
     (tmp_path / "blog_example_com.md").write_text("some content")
-    summarizer = BlogSummarizer()
+    summarizer = BlogSummarizer(prompt_file=prompt_file)
 
     def fake_run(*args, **kwargs):
         (tmp_path / "summary.md").write_text("summary from file")
         return MagicMock(returncode=0, stdout="", stderr="")
 
-    with patch("subprocess.run", side_effect=fake_run):
+    with patch("src.blog.summarizer.run_claude_process", side_effect=fake_run):
         result = summarizer.summarize(tmp_path)
 
     assert result == "summary from file"
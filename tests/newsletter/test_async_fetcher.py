@@ -0,0 +1,125 @@
+# ABOUTME: Tests for concurrent multi-mailbox IMAP scanning
+# ABOUTME: Covers Message-ID merging, connection pool bounds and skipping of failing mailboxes
+
+import imaplib
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.newsletter.async_fetcher import AsyncEmailFetcher, ConnectionPool, merge_by_message_id
+from src.newsletter.email_fetcher import EmailData, EmailFetcher
+
+
+def _email(message_id, hours_ago, subject="S"):
+    return EmailData(
+        sender="news@example.com",
+        subject=subject,
+        date=datetime.now() - timedelta(hours=hours_ago),
+        body_text="Body",
+        body_html="",
+        message_id=message_id
+    )
+
+
+class TestMergeByMessageId:
+    def test_first_mailbox_wins_and_result_is_date_ordered(self):
+        inbox = [_email("<a>", 1, "inbox"), _email("<b>", 3)]
+        label = [_email("<a>", 1, "label"), _email("<c>", 2)]
+
+        merged = merge_by_message_id([inbox, label])
+
+        assert [e.message_id for e in merged] == ["<b>", "<c>", "<a>"]
+        assert merged[-1].subject == "inbox"
+
+    def test_messages_without_id_are_kept(self):
+        merged = merge_by_message_id([[_email("", 1)], [_email("", 2)]])
+
+        assert len(merged) == 2
+
+
+class TestConnectionPool:
+    @pytest.mark.asyncio
+    async def test_reuses_connections(self):
+        connect = MagicMock(side_effect=lambda: MagicMock())
+        pool = ConnectionPool(connect, size=1)
+
+        async with pool.connection() as first:
+            pass
+        async with pool.connection() as second:
+            pass
+        await pool.close()
+
+        assert first is second
+        assert connect.call_count == 1
+        first.logout.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_broken_connection_is_replaced(self):
+        connect = MagicMock(side_effect=lambda: MagicMock())
+        pool = ConnectionPool(connect, size=1)
+
+        with pytest.raises(imaplib.IMAP4.abort):
+            async with pool.connection():
+                raise imaplib.IMAP4.abort("socket error")
+        async with pool.connection():
+            pass
+
+        assert connect.call_count == 2
+
+
+class TestAsyncEmailFetcher:
+    def _fetcher(self, scan):
+        fetcher = EmailFetcher("imap.test.com", 993, "user", "pass")
+        fetcher.connect = MagicMock(side_effect=lambda: MagicMock())
+        fetcher.fetch_mailbox = MagicMock(side_effect=scan)
+        return fetcher
+
+    @pytest.mark.asyncio
+    async def test_scans_mailboxes_concurrently_within_pool_size(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def scan(imap, mailbox, store):
+            with lock:
+                running.append(mailbox)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(mailbox)
+            return [_email(f"<{mailbox}>", 1)]
+
+        fetcher = self._fetcher(scan)
+        mailboxes = ["INBOX", "News", "Promotions", "Updates"]
+
+        emails = await AsyncEmailFetcher(fetcher, mailboxes, connections=2).fetch_last_week()
+
+        assert len(emails) == 4
+        assert max(peak) == 2
+        assert fetcher.connect.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failing_mailbox_is_skipped(self):
+        def scan(imap, mailbox, store):
+            if mailbox == "Missing":
+                raise imaplib.IMAP4.error("Cannot select mailbox Missing")
+            return [_email("<a>", 1)]
+
+        fetcher = self._fetcher(scan)
+
+        emails = await AsyncEmailFetcher(fetcher, ["INBOX", "Missing"]).fetch_last_week()
+
+        assert [e.message_id for e in emails] == ["<a>"]
+
+    @pytest.mark.asyncio
+    async def test_all_mailboxes_failing_raises(self):
+        def scan(imap, mailbox, store):
+            raise imaplib.IMAP4.error(f"Cannot select mailbox {mailbox}")
+
+        fetcher = self._fetcher(scan)
+
+        with pytest.raises(imaplib.IMAP4.error):
+            await AsyncEmailFetcher(fetcher, ["A", "B"]).fetch_last_week()
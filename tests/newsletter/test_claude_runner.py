@@ -8,7 +8,7 @@ from src.newsletter.claude_runner import ClaudeRunner
 
 
 class TestClaudeRunner:
-    @patch('src.newsletter.claude_runner.subprocess.run')
+    @patch('src.newsletter.claude_runner.run_claude_process')
     @patch('src.newsletter.claude_runner.Path')
     def test_analyze_newsletters_success(self, mock_path, mock_subprocess):
         """Test successful newsletter analysis."""
@@ -36,12 +36,14 @@ class TestClaudeRunner:
         assert call_args[0][0][1] == "-p"
         assert "newsletters/07_2026" in call_args[0][0][2]
 
-    @patch('src.newsletter.claude_runner.subprocess.run')
-    def test_analyze_newsletters_timeout(self, mock_subprocess):
+    @patch('src.newsletter.claude_runner.run_claude_process')
+    def test_analyze_newsletters_timeout(self, mock_subprocess, tmp_path):
         """Test timeout handling."""
         mock_subprocess.side_effect = TimeoutError("Process timeout")
+        prompt_file = tmp_path / "newsletter_analysis_prompt.md"
+        prompt_file.write_text("Base prompt template")
 
-        runner = ClaudeRunner()
+        runner = ClaudeRunner(prompt_file=str(prompt_file))
 
         with pytest.raises(Exception) as exc_info:
             runner.analyze_newsletters("newsletters/07_2026")
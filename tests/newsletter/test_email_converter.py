@@ -1,7 +1,12 @@
 # ABOUTME: Unit tests for email HTML to Markdown conversion
 # ABOUTME: Tests conversion, metadata extraction, and file naming
 
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
 from src.newsletter.email_converter import EmailConverter
 from src.newsletter.email_fetcher import EmailData
 
@@ -46,3 +51,73 @@ class TestEmailConverter:
         filename = converter.generate_filename(email_data, sequence=5)
 
         assert filename == "005_github.com_github-changelog-feb-10.md"
+
+    def test_slimming_drops_preheader_and_pixel(self):
+        email_data = EmailData(
+            sender="news@example.com",
+            subject="Weekly",
+            date=datetime(2026, 2, 10),
+            body_text="",
+            body_html=(
+                '<div style="display:none">Preheader teaser</div>'
+                '<table role="presentation"><tr><td><h1>Title</h1></td></tr></table>'
+                '<img src="https://track.example.com/open.gif" width="1" height="1">'
+            ),
+            message_id="<1@example.com>"
+        )
+
+        markdown = EmailConverter().to_markdown(email_data)
+        unslimmed = EmailConverter(slim=False).to_markdown(email_data)
+
+        assert "# Title" in markdown
+        assert "Preheader" not in markdown
+        assert "open.gif" not in markdown
+        assert "Preheader" in unslimmed
+
+    @pytest.mark.parametrize("backend", ["html2text", "lite"])
+    def test_unclosed_head_keeps_body(self, backend):
+        html = "<html><head><title>x</title><body><p>Hello</p></body></html>"
+        assert EmailConverter(backend).html_to_markdown(html).strip() == "Hello"
+
+    @pytest.mark.parametrize("backend", ["html2text", "lite"])
+    def test_unclosed_hidden_element_falls_back_to_unslimmed(self, backend):
+        html = '<div style="display:none">Preheader<p>Hello</p>'
+        assert "Hello" in EmailConverter(backend).html_to_markdown(html)
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError):
+            EmailConverter(backend="pandoc")
+
+
+class TestConvertBatch:
+    @staticmethod
+    def _emails(count):
+        return [
+            EmailData(
+                sender=f"news{idx}@example.com",
+                subject=f"Issue {idx}",
+                date=datetime(2026, 2, 10),
+                body_text="",
+                body_html=f"<h1>Title {idx}</h1><p>Body {idx}</p>",
+                message_id=f"<{idx}@example.com>"
+            )
+            for idx in range(count)
+        ]
+
+    def test_small_batch_stays_in_process(self):
+        executor = MagicMock()
+        converted = EmailConverter().convert_batch(self._emails(2), start=5, executor=executor)
+
+        executor.map.assert_not_called()
+        assert [name[:4] for name, _ in converted] == ["005_", "006_"]
+
+    def test_process_pool_matches_serial_conversion(self):
+        emails = self._emails(9)
+        converter = EmailConverter()
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            parallel = converter.convert_batch(emails, start=3, executor=pool, chunk_size=2)
+
+        assert parallel == converter.convert_batch(emails, start=3)
+        assert parallel[0][0].startswith("003_")
+        assert "# Title 8" in parallel[-1][1]
@@ -1,12 +1,33 @@
 # ABOUTME: Unit tests for IMAP email fetching functionality
 # ABOUTME: Tests connection, date filtering, and email data extraction
 
+import imaplib
 import json
 import pytest
 from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
-from src.newsletter.email_fetcher import EmailFetcher, EmailData
+from src.newsletter.email_fetcher import EmailFetcher, EmailData, message_sets, iter_fetch_response, search_criteria
+
+
+def _fake_uid(messages):
+    """Build an IMAP uid() stand-in serving {uid: raw_email} for SEARCH and header/body FETCH."""
+    def uid(command, *args):
+        if command == 'SEARCH':
+            return 'OK', [b' '.join(str(u).encode() for u in messages)]
+        wanted = set()
+        for part in args[0].split(','):
+            first, _, last = part.partition(':')
+            wanted.update(range(int(first), int(last or first) + 1))
+        response = []
+        for u in sorted(wanted & set(messages)):
+            raw = messages[u]
+            if 'HEADER.FIELDS' in args[1]:
+                raw = raw.split(b'\r\n\r\n')[0] + b'\r\n\r\n'
+            response.append((f'{u} (UID {u} RFC822 {{{len(raw)}}}'.encode(), raw))
+            response.append(b')')
+        return 'OK', response
+    return MagicMock(side_effect=uid)
 
 
 class TestEmailFetcher:
@@ -18,13 +39,12 @@ class TestEmailFetcher:
         mock_imap_class.return_value = mock_imap
         mock_imap.login.return_value = ('OK', [b'Logged in'])
         mock_imap.select.return_value = ('OK', [b'1'])
-        mock_imap.search.return_value = ('OK', [b'1 2'])
 
         # Mock email data
-        mock_imap.fetch.side_effect = [
-            ('OK', [(b'1 (RFC822 {123}', b'From: test@example.com\r\nSubject: Test\r\n\r\nBody')]),
-            ('OK', [(b'2 (RFC822 {123}', b'From: test2@example.com\r\nSubject: Test2\r\n\r\nBody2')])
-        ]
+        mock_imap.uid = _fake_uid({
+            1: b'From: test@example.com\r\nSubject: Test\r\n\r\nBody',
+            2: b'From: test2@example.com\r\nSubject: Test2\r\n\r\nBody2',
+        })
 
         fetcher = EmailFetcher("imap.test.com", 993, "user", "pass")
         emails = fetcher.fetch_last_week()
@@ -34,6 +54,44 @@ class TestEmailFetcher:
         assert emails[0].subject == "Test"
         assert "Body" in emails[0].body_text
 
+    @patch('src.newsletter.email_fetcher.imaplib.IMAP4_SSL')
+    def test_fetch_batches_uids_into_message_sets(self, mock_imap_class):
+        """One FETCH round-trip per batch, not per message."""
+        mock_imap = MagicMock()
+        mock_imap_class.return_value = mock_imap
+        mock_imap.select.return_value = ('OK', [b'7'])
+        mock_imap.uid = _fake_uid({
+            uid: f'From: n{uid}@example.com\r\nSubject: S{uid}\r\n\r\nBody'.encode()
+            for uid in [3, 4, 5, 6, 9, 10, 11]
+        })
+
+        fetcher = EmailFetcher("imap.test.com", 993, "user", "pass", batch_size=4)
+        emails = fetcher.fetch_last_week()
+
+        fetches = [c.args[1] for c in mock_imap.uid.call_args_list if c.args[0] == 'FETCH']
+        assert fetches == ["3:6", "9:11"]
+        assert [e.subject for e in emails] == ["S3", "S4", "S5", "S6", "S9", "S10", "S11"]
+        assert [(b.messages, b.bytes > 0) for b in fetcher.batches] == [(4, True), (3, True)]
+
+
+class TestMessageSets:
+    def test_consecutive_uids_collapse_into_ranges(self):
+        assert list(message_sets([10, 1, 2, 3, 7, 9], 50)) == ["1:3,7,9:10"]
+
+    def test_batches_respect_size(self):
+        assert list(message_sets([1, 2, 3, 4, 5], 2)) == ["1:2", "3:4", "5"]
+
+    def test_no_uids(self):
+        assert list(message_sets([], 50)) == []
+
+    def test_iter_fetch_response_skips_separators(self):
+        response = [(b'1 (UID 101 RFC822 {4}', b'abcd'), b')', (b'2 (UID 102 RFC822 {2}', b'ef'), b')']
+        assert list(iter_fetch_response(response)) == [(101, b'abcd'), (102, b'ef')]
+
+    def test_iter_fetch_response_uid_after_literal(self):
+        response = [(b'1 (BODY[HEADER.FIELDS (FROM)] {4}', b'abcd'), b' UID 101)']
+        assert list(iter_fetch_response(response)) == [(101, b'abcd')]
+
 
 class TestSenderWhitelist:
     def test_no_whitelist_allows_all(self):
@@ -82,14 +140,205 @@ class TestSenderWhitelist:
         mock_imap_class.return_value = mock_imap
         mock_imap.login.return_value = ('OK', [b'Logged in'])
         mock_imap.select.return_value = ('OK', [b'1'])
-        mock_imap.search.return_value = ('OK', [b'1 2'])
-        mock_imap.fetch.side_effect = [
-            ('OK', [(b'1 (RFC822 {123}', b'From: news@allowed.com\r\nSubject: Allowed\r\n\r\nBody')]),
-            ('OK', [(b'2 (RFC822 {123}', b'From: spam@blocked.com\r\nSubject: Blocked\r\n\r\nBody')])
-        ]
+        mock_imap.uid = _fake_uid({
+            1: b'From: news@allowed.com\r\nSubject: Allowed\r\n\r\nBody',
+            2: b'From: spam@blocked.com\r\nSubject: Blocked\r\n\r\nBody',
+        })
 
         fetcher = EmailFetcher("imap.test.com", 993, "user", "pass", senders_file=senders_file)
         emails = fetcher.fetch_last_week()
 
         assert len(emails) == 1
         assert "allowed.com" in emails[0].sender
+
+        # Headers of both are checked, only the whitelisted body is downloaded
+        fetches = [c.args[1:] for c in mock_imap.uid.call_args_list if c.args[0] == 'FETCH']
+        assert fetches[0][0] == "1:2" and "BODY.PEEK[HEADER.FIELDS" in fetches[0][1]
+        assert fetches[1] == ("1", "(UID RFC822)")
+        assert [b.phase for b in fetcher.batches] == ["header", "body"]
+
+    @patch('src.newsletter.email_fetcher.imaplib.IMAP4_SSL')
+    def test_server_filter_narrows_search(self, mock_imap_class, tmp_path):
+        senders_file = tmp_path / "senders.json"
+        senders_file.write_text(json.dumps({"senders": ["@allowed.com", "news@other.org"]}))
+        mock_imap = MagicMock()
+        mock_imap_class.return_value = mock_imap
+        mock_imap.select.return_value = ('OK', [b'0'])
+        mock_imap.uid = _fake_uid({})
+
+        fetcher = EmailFetcher("imap.test.com", 993, "user", "pass", senders_file=senders_file, server_filter=True)
+        fetcher.fetch_last_week()
+
+        query = mock_imap.uid.call_args_list[0].args[2]
+        assert 'OR FROM "allowed.com" FROM "news@other.org"' in query
+
+
+    @patch('src.newsletter.email_fetcher.imaplib.IMAP4_SSL')
+    def test_iter_last_week_streams_batch_by_batch(self, mock_imap_class):
+        """The first message is handed out before the next batch is downloaded."""
+        mock_imap = MagicMock()
+        mock_imap_class.return_value = mock_imap
+        mock_imap.select.return_value = ('OK', [b'3'])
+        mock_imap.uid = _fake_uid({
+            uid: f'From: n{uid}@example.com\r\nSubject: S{uid}\r\n\r\nBody'.encode()
+            for uid in [1, 2, 3]
+        })
+
+        emails = EmailFetcher("imap.test.com", 993, "user", "pass", batch_size=1).iter_last_week()
+        first = next(emails)
+
+        fetches = [c.args[1] for c in mock_imap.uid.call_args_list if c.args[0] == 'FETCH']
+        assert first.subject == "S1"
+        assert fetches == ["1"]
+        emails.close()
+        mock_imap.logout.assert_not_called()
+
+    @patch('src.newsletter.email_fetcher.imaplib.IMAP4_SSL')
+    def test_fetch_selects_quoted_mailbox(self, mock_imap_class):
+        mock_imap = MagicMock()
+        mock_imap_class.return_value = mock_imap
+        mock_imap.select.return_value = ('OK', [b'0'])
+        mock_imap.uid = _fake_uid({})
+
+        EmailFetcher("imap.test.com", 993, "user", "pass").fetch_last_week("[Gmail]/All Mail")
+
+        mock_imap.select.assert_called_once_with('"[Gmail]/All Mail"')
+        mock_imap.close.assert_called_once()
+
+    @patch('src.newsletter.email_fetcher.imaplib.IMAP4_SSL')
+    def test_missing_mailbox_raises(self, mock_imap_class):
+        mock_imap = MagicMock()
+        mock_imap_class.return_value = mock_imap
+        mock_imap.select.return_value = ('NO', [b'Unknown Mailbox'])
+
+        with pytest.raises(imaplib.IMAP4.error):
+            EmailFetcher("imap.test.com", 993, "user", "pass").fetch_last_week("Missing")
+
+
+class TestSearchCriteria:
+    def test_without_senders(self):
+        assert search_criteria("01-Jan-2026", []) == '(SINCE 01-Jan-2026)'
+
+    def test_senders_nest_in_binary_or(self):
+        assert search_criteria("01-Jan-2026", ["a@x.com", "@y.com", "z"]) == (
+            '(SINCE 01-Jan-2026 OR FROM "a@x.com" OR FROM "y.com" FROM "z")'
+        )
+
+
+class TestIncrementalSync:
+    def _imap(self, mock_imap_class, messages, uidvalidity=7):
+        mock_imap = MagicMock()
+        mock_imap_class.return_value = mock_imap
+        mock_imap.select.return_value = ('OK', [str(len(messages)).encode()])
+        mock_imap.uid = _fake_uid(messages)
+        mock_imap.response.return_value = ('UIDVALIDITY', [str(uidvalidity).encode()])
+        return mock_imap
+
+    @staticmethod
+    def _email(uid):
+        date = (datetime.now() - timedelta(hours=uid)).strftime('%a, %d %b %Y %H:%M:%S +0000')
+        return f'From: n{uid}@example.com\r\nSubject: S{uid}\r\nDate: {date}\r\n\r\nBody'.encode()
+
+    @staticmethod
+    def _body_fetches(mock_imap):
+        return [c.args[1] for c in mock_imap.uid.call_args_list if c.args[0] == 'FETCH']
+
+    @patch('src.newsletter.email_fetcher.imaplib.IMAP4_SSL')
+    def test_second_run_fetches_only_new_uids(self, mock_imap_class, tmp_path):
+        store = tmp_path / "newsletters.db"
+        first = self._imap(mock_imap_class, {1: self._email(1), 2: self._email(2)})
+        fetcher = EmailFetcher("imap.test.com", 993, "user", "pass", store_path=store)
+        assert [e.subject for e in fetcher.fetch_last_week()] == ["S1", "S2"]
+        assert self._body_fetches(first) == ["1:2"]
+
+        second = self._imap(mock_imap_class, {1: self._email(1), 2: self._email(2), 3: self._email(3)})
+        emails = fetcher.fetch_last_week()
+
+        assert 'UID 3:*' in second.uid.call_args_list[0].args[2]
+        assert self._body_fetches(second) == ["3"]
+        assert [e.subject for e in emails] == ["S1", "S2", "S3"]
+
+    @patch('src.newsletter.email_fetcher.imaplib.IMAP4_SSL')
+    def test_nothing_new_skips_fetch(self, mock_imap_class, tmp_path):
+        store = tmp_path / "newsletters.db"
+        self._imap(mock_imap_class, {5: self._email(5)})
+        fetcher = EmailFetcher("imap.test.com", 993, "user", "pass", store_path=store)
+        fetcher.fetch_last_week()
+
+        # "6:*" still matches UID 5 on a real server
+        again = self._imap(mock_imap_class, {5: self._email(5)})
+        emails = fetcher.fetch_last_week()
+
+        assert self._body_fetches(again) == []
+        assert [e.subject for e in emails] == ["S5"]
+
+    @patch('src.newsletter.email_fetcher.imaplib.IMAP4_SSL')
+    def test_failed_fetch_keeps_checkpoint_below_missing_uids(self, mock_imap_class, tmp_path):
+        from src.newsletter.message_store import MessageStore
+
+        store = tmp_path / "newsletters.db"
+        refused = self._imap(mock_imap_class, {101: self._email(1), 102: self._email(2)})
+        serve = refused.uid.side_effect
+        refused.uid.side_effect = lambda command, *args: ('NO', [b'busy']) if command == 'FETCH' else serve(command, *args)
+        fetcher = EmailFetcher("imap.test.com", 993, "user", "pass", store_path=store)
+
+        assert fetcher.fetch_last_week() == []
+        cache = MessageStore(store)
+        assert cache.checkpoint("INBOX").last_uid == 100
+        cache.close()
+
+        again = self._imap(mock_imap_class, {101: self._email(1), 102: self._email(2)})
+        emails = fetcher.fetch_last_week()
+
+        assert self._body_fetches(again) == ["101:102"]
+        assert [e.subject for e in emails] == ["S1", "S2"]
+
+    @pytest.mark.parametrize("phase", ["HEADER.FIELDS", "RFC822"])
+    @patch('src.newsletter.email_fetcher.imaplib.IMAP4_SSL')
+    def test_message_without_uid_keeps_checkpoint_below_it(self, mock_imap_class, tmp_path, phase):
+        from src.newsletter.message_store import MessageStore
+
+        store = tmp_path / "newsletters.db"
+        senders = tmp_path / "senders.json"
+        senders.write_text(json.dumps({"senders": ["@example.com"]}))
+        messages = {101: self._email(1), 102: self._email(2), 103: self._email(3)}
+        broken = self._imap(mock_imap_class, messages)
+        serve = broken.uid.side_effect
+
+        def uid(command, *args):
+            status, response = serve(command, *args)
+            if command == 'FETCH' and phase in args[1]:
+                # UID 102 comes back without its UID item
+                response = [
+                    (b'2 (RFC822 {%d}' % len(part[1]), part[1])
+                    if isinstance(part, tuple) and b'UID 102' in part[0] else part
+                    for part in response
+                ]
+            return status, response
+
+        broken.uid.side_effect = uid
+        fetcher = EmailFetcher("imap.test.com", 993, "user", "pass", senders_file=senders, store_path=store)
+
+        assert [e.subject for e in fetcher.fetch_last_week()] == ["S1", "S3"]
+        cache = MessageStore(store)
+        assert cache.checkpoint("INBOX").last_uid == 100
+        cache.close()
+
+        again = self._imap(mock_imap_class, messages)
+        emails = fetcher.fetch_last_week()
+
+        assert self._body_fetches(again)[-1] == "101:103"
+        assert [e.subject for e in emails] == ["S1", "S2", "S3"]
+
+    @patch('src.newsletter.email_fetcher.imaplib.IMAP4_SSL')
+    def test_uidvalidity_change_resyncs(self, mock_imap_class, tmp_path):
+        store = tmp_path / "newsletters.db"
+        self._imap(mock_imap_class, {1: self._email(1), 2: self._email(2)})
+        fetcher = EmailFetcher("imap.test.com", 993, "user", "pass", store_path=store)
+        fetcher.fetch_last_week()
+
+        renumbered = self._imap(mock_imap_class, {1: self._email(3)}, uidvalidity=8)
+        emails = fetcher.fetch_last_week()
+
+        assert 'UID' not in renumbered.uid.call_args_list[0].args[2]
+        assert [e.subject for e in emails] == ["S3"]
@@ -0,0 +1,61 @@
+# ABOUTME: Tests for pre-conversion newsletter HTML slimming
+# ABOUTME: Covers dropped tags, hidden elements, tracking pixels, attribute stripping and layout table unwrapping
+
+from src.newsletter.html_slimmer import has_text, parse_tree, slim_html
+
+
+class TestSlimHtml:
+    def test_drops_head_style_script_and_comments(self):
+        html = (
+            "<html><head><title>T</title><style>p{color:red}</style></head>"
+            "<body><!--[if mso]>x<![endif]--><p>Hi</p><script>alert(1)</script></body></html>"
+        )
+        assert slim_html(html) == "<html><body><p>Hi</p></body></html>"
+
+    def test_drops_hidden_preheader(self):
+        html = '<div style="display: none; max-height:0">Preheader</div><span hidden>x</span><p style="opacity:0.9">Hi</p>'
+        assert slim_html(html) == "<p>Hi</p>"
+
+    def test_drops_tracking_pixels_keeps_images(self):
+        html = (
+            '<img src="https://t.example.com/o.gif" width="1" height="1">'
+            '<img src="https://t.example.com/p.gif" style="width:1px;height:1px">'
+            '<img src="https://example.com/logo.png" alt="Logo" width="120">'
+        )
+        assert slim_html(html) == '<img src="https://example.com/logo.png" alt="Logo">'
+
+    def test_strips_presentational_attributes(self):
+        html = '<a href="https://x.com/?a=1&amp;b=2" style="color:red" class="btn" target="_blank">Go</a>'
+        assert slim_html(html) == '<a href="https://x.com/?a=1&amp;b=2">Go</a>'
+
+    def test_unwraps_nested_single_column_tables(self):
+        html = (
+            '<table role="presentation"><tbody><tr><td align="center">'
+            '<table><tr><td><h1>Title</h1></td></tr></table>'
+            '</td></tr><tr><td><p>Body</p></td></tr></tbody></table>'
+        )
+        assert slim_html(html) == "<div><div><h1>Title</h1></div></div><div><p>Body</p></div>"
+
+    def test_keeps_data_tables(self):
+        html = "<table><tr><th>A</th><th>B</th></tr><tr><td>1</td><td>2</td></tr></table>"
+        assert slim_html(html) == html
+
+    def test_nested_hidden_element_of_same_tag(self):
+        html = '<div style="display:none"><div>a</div><div>b</div></div><div>shown</div>'
+        assert slim_html(html) == "<div>shown</div>"
+
+    def test_tolerates_unclosed_and_stray_tags(self):
+        assert slim_html("<div><p>One</span></div><p>Two") == "<div><p>One</p></div><p>Two</p>"
+
+    def test_unclosed_head_ends_at_body_content(self):
+        html = "<html><head><title>x</title><body><p>Hello</p></body></html>"
+        assert slim_html(html) == "<html><body><p>Hello</p></body></html>"
+
+    def test_unclosed_head_without_body_tag(self):
+        assert slim_html("<head><meta charset='utf-8'><style>p{}</style><div>Hi</div>") == "<div>Hi</div>"
+
+
+def test_parse_tree_keeps_hidden_content():
+    root = parse_tree('<style>p{}</style><div style="display:none">Pre<p>Hello</p>')
+    assert has_text(root)
+    assert not has_text(parse_tree("<style>p{}</style><img src='x.gif'>"))
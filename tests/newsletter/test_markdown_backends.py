@@ -0,0 +1,46 @@
+# ABOUTME: Tests for the pluggable HTML to Markdown backends
+# ABOUTME: Covers backend lookup and the lite renderer's headings, links, lists, quotes and code
+
+import pytest
+
+from src.newsletter.markdown_backends import (
+    BACKENDS, Html2TextBackend, LiteBackend, MarkdownBackend, get_backend, register_backend
+)
+
+
+def test_get_backend():
+    assert isinstance(get_backend("html2text"), Html2TextBackend)
+    assert isinstance(get_backend("lite"), LiteBackend)
+    with pytest.raises(ValueError):
+        get_backend("pandoc")
+
+
+def test_backend_without_convert_is_rejected():
+    class Incomplete(MarkdownBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    with pytest.raises(TypeError):
+        register_backend(Incomplete)
+    assert "incomplete" not in BACKENDS
+
+
+class TestLiteBackend:
+    def test_headings_paragraphs_and_links(self):
+        markdown = LiteBackend().convert(
+            "<h1>Title</h1>\n  <p>Read <a href='https://example.com'>the post</a> <b>now</b>.</p>"
+        )
+        assert markdown == "# Title\n\nRead [the post](https://example.com) **now**.\n"
+
+    def test_nested_lists(self):
+        markdown = LiteBackend().convert("<ol><li>One<ul><li>Sub</li></ul></li><li>Two</li></ol>")
+        assert markdown == "1. One\n  * Sub\n2. Two\n"
+
+    def test_blockquote_and_pre(self):
+        markdown = LiteBackend().convert("<blockquote><p>a</p><p>b</p></blockquote><pre>  x = 1\n  y</pre>")
+        assert markdown == "> a\n>\n> b\n\n```\n  x = 1\n  y\n```\n"
+
+    def test_image_and_line_break(self):
+        markdown = LiteBackend().convert("<p><img src='https://x.com/a.png' alt='A'><br>b &amp; c</p>")
+        assert markdown == "![A](https://x.com/a.png)\nb & c\n"
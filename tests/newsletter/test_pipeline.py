@@ -0,0 +1,125 @@
+# ABOUTME: Tests for the streaming newsletter export pipeline
+# ABOUTME: Covers bounded prefetching, error propagation, early close and file numbering
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.newsletter.email_converter import EmailConverter
+from src.newsletter.email_fetcher import EmailData
+from src.newsletter import pipeline
+from src.newsletter.pipeline import export_markdown, most_recent, prefetch
+
+
+def _email(idx, hours_ago=0):
+    return EmailData(
+        sender=f"news{idx}@example.com",
+        subject=f"Issue {idx}",
+        date=datetime(2026, 2, 10) - timedelta(hours=hours_ago),
+        body_text=f"Body {idx}",
+        body_html="",
+        message_id=f"<{idx}@example.com>"
+    )
+
+
+class TestPrefetch:
+    def test_yields_items_in_order(self):
+        assert list(prefetch(range(10), depth=2)) == list(range(10))
+
+    def test_producer_stays_within_depth(self):
+        produced = []
+
+        def source():
+            for idx in range(10):
+                produced.append(idx)
+                yield idx
+
+        items = prefetch(source(), depth=2)
+        assert next(items) == 0
+        # Give the producer time to run ahead as far as it can
+        time.sleep(0.2)
+
+        # One handed out, two queued, one blocked on the full queue
+        assert len(produced) <= 4
+        items.close()
+
+    def test_source_error_is_raised_in_consumer(self):
+        def source():
+            yield 1
+            raise ConnectionError("IMAP gone")
+
+        items = prefetch(source())
+        assert next(items) == 1
+        with pytest.raises(ConnectionError):
+            next(items)
+
+    def test_close_stops_and_closes_source(self):
+        closed = threading.Event()
+
+        def source():
+            try:
+                for idx in range(100):
+                    yield idx
+            finally:
+                closed.set()
+
+        items = prefetch(source())
+        next(items)
+        items.close()
+
+        assert closed.is_set()
+
+
+class TestExportMarkdown:
+    def test_writes_numbered_files_in_arrival_order(self, tmp_path):
+        output_dir = tmp_path / "07_2026"
+
+        count = export_markdown(iter([_email(1), _email(2), _email(3)]), EmailConverter(), output_dir)
+
+        assert count == 3
+        names = sorted(path.name for path in output_dir.iterdir())
+        assert [name[:4] for name in names] == ["001_", "002_", "003_"]
+        assert "Body 2" in (output_dir / names[1]).read_text(encoding='utf-8')
+
+    def test_worker_pool_keeps_order_and_numbering(self, tmp_path):
+        output_dir = tmp_path / "07_2026"
+        emails = [_email(idx) for idx in range(1, 12)]
+
+        count = export_markdown(iter(emails), EmailConverter(), output_dir, workers=2, chunk_size=2)
+
+        assert count == 11
+        names = sorted(path.name for path in output_dir.iterdir())
+        assert names == [EmailConverter().generate_filename(e, sequence=i) for i, e in enumerate(emails, start=1)]
+
+    def test_worker_pool_does_not_fork_the_bot(self, tmp_path, monkeypatch):
+        output_dir = tmp_path / "07_2026"
+        emails = [_email(idx) for idx in range(1, 9)]
+        pools = []
+        real_pool = pipeline.ProcessPoolExecutor
+
+        def pool(*args, **kwargs):
+            pools.append(kwargs["mp_context"].get_start_method())
+            return real_pool(*args, **kwargs)
+
+        monkeypatch.setattr(pipeline, "ProcessPoolExecutor", pool)
+        count = export_markdown(iter(emails), EmailConverter(), output_dir, workers=2, chunk_size=2)
+
+        assert pools == ["forkserver"]
+        assert count == 8
+        assert "Body 8" in (output_dir / EmailConverter().generate_filename(emails[7], sequence=8)).read_text()
+
+    def test_empty_week_creates_nothing(self, tmp_path):
+        output_dir = tmp_path / "07_2026"
+
+        assert export_markdown(iter([]), EmailConverter(), output_dir) == 0
+        assert not output_dir.exists()
+
+
+def test_most_recent_keeps_newest_oldest_first():
+    emails = [_email(1, hours_ago=5), _email(2, hours_ago=1), _email(3, hours_ago=3)]
+
+    kept = most_recent(iter(emails), 2)
+
+    assert [e.subject for e in kept] == ["Issue 3", "Issue 2"]
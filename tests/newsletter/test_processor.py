@@ -12,7 +12,7 @@ from src.newsletter.email_fetcher import EmailData
 class TestNewsletterProcessor:
     @patch('src.newsletter.processor.ClaudeRunner')
     @patch('src.newsletter.processor.EmailFetcher')
-    def test_process_newsletters_full_flow(self, mock_fetcher_class, mock_runner_class):
+    def test_process_newsletters_full_flow(self, mock_fetcher_class, mock_runner_class, tmp_path):
         """Test complete newsletter processing pipeline."""
         # Mock email fetching
         mock_fetcher = MagicMock()
@@ -28,7 +28,7 @@ class TestNewsletterProcessor:
                 message_id="<id1@example.com>"
             )
         ]
-        mock_fetcher.fetch_last_week.return_value = mock_emails
+        mock_fetcher.iter_last_week.return_value = iter(mock_emails)
 
         # Mock Claude analysis
         mock_runner = MagicMock()
@@ -41,6 +41,7 @@ class TestNewsletterProcessor:
             imap_user="user",
             imap_password="pass"
         )
+        processor.base_dir = tmp_path
 
         result = processor.process()
 
@@ -50,5 +51,41 @@ class TestNewsletterProcessor:
         assert "summary" in result
 
         # Verify workflow
-        mock_fetcher.fetch_last_week.assert_called_once()
+        mock_fetcher.iter_last_week.assert_called_once_with("INBOX")
         mock_runner.analyze_newsletters.assert_called_once()
+
+    @patch('src.newsletter.processor.ClaudeRunner')
+    @patch('src.newsletter.processor.EmailFetcher')
+    def test_process_stops_between_emails(self, mock_fetcher_class, mock_runner_class, tmp_path):
+        """A set stop event ends the pipeline at the next email, before Claude runs."""
+        import threading
+        from src.shutdown import JobStopped
+        stop = threading.Event()
+
+        def emails():
+            for idx in range(5):
+                if idx == 2:
+                    stop.set()
+                yield EmailData(
+                    sender="news@example.com",
+                    subject=f"Update {idx}",
+                    date=datetime(2026, 2, 10),
+                    body_text="Plain text",
+                    body_html="",
+                    message_id=f"<id{idx}@example.com>"
+                )
+
+        mock_fetcher_class.return_value.iter_last_week.return_value = emails()
+
+        processor = NewsletterProcessor(
+            imap_host="imap.test.com",
+            imap_port=993,
+            imap_user="user",
+            imap_password="pass"
+        )
+        processor.base_dir = tmp_path
+
+        with pytest.raises(JobStopped):
+            processor.process(stop=stop)
+
+        mock_runner_class.return_value.analyze_newsletters.assert_not_called()
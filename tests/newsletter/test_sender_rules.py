@@ -0,0 +1,83 @@
+# ABOUTME: Tests for the compiled sender whitelist
+# ABOUTME: Checks parity with the old substring whitelist and the address, domain, regex and exclusion rules
+
+import random
+
+from src.newsletter.sender_rules import SenderRules, SubstringMatcher
+
+
+def legacy_allows(entries, sender):
+    """Previous whitelist: any lowercased entry contained in the lowercased sender."""
+    if not entries:
+        return True
+    return any(entry.lower() in sender.lower() for entry in entries)
+
+
+class TestSubstringMatcher:
+    def test_finds_overlapping_patterns(self):
+        matcher = SubstringMatcher(["he", "she", "hers", "his"])
+        assert matcher.search("ushers")
+        assert matcher.search("ahis")
+        assert not matcher.search("hxe")
+
+    def test_pattern_behind_failed_prefix(self):
+        # "abcd" fails at "e", the automaton must fall back to "bce"
+        matcher = SubstringMatcher(["abcd", "bce"])
+        assert matcher.search("abce")
+
+    def test_empty_pattern_matches_everything(self):
+        assert SubstringMatcher([""]).search("")
+
+
+class TestSenderRules:
+    def test_plain_entries_match_like_substrings(self):
+        rng = random.Random(7)
+        alphabet = "abcde@."
+        for _ in range(300):
+            entries = ["".join(rng.choices(alphabet, k=rng.randint(1, 5))) for _ in range(rng.randint(0, 6))]
+            local = "".join(rng.choices(alphabet[:5], k=rng.randint(1, 6)))
+            domain = "".join(rng.choices(alphabet[:5] + ".", k=rng.randint(1, 6)))
+            sender = rng.choice([f"{local}@{domain}", f"Name {local} <{local}@{domain}>", local])
+            assert SenderRules(entries).allows(sender) == legacy_allows(entries, sender), (entries, sender)
+
+    def test_display_name_header(self):
+        rules = SenderRules(["news@devstyle.pl"])
+        assert rules.allows("Devstyle <News@Devstyle.pl>")
+        assert not rules.allows("Other <news@other.pl>")
+
+    def test_exact_address_rule(self):
+        rules = SenderRules(["addr:news@x.com"])
+        assert rules.allows("X <news@x.com>")
+        assert not rules.allows("technews@x.com")
+
+    def test_domain_rule_covers_subdomains_only(self):
+        rules = SenderRules(["domain:substack.com"])
+        assert rules.allows("a@substack.com")
+        assert rules.allows("a@mail.substack.com")
+        assert not rules.allows("a@notsubstack.com")
+
+    def test_regex_rule(self):
+        rules = SenderRules([r"re:^(news|digest)@.*\.pl$"])
+        assert rules.allows("Digest@devstyle.pl")
+        assert not rules.allows("promo@devstyle.pl")
+
+    def test_invalid_regex_is_ignored(self):
+        rules = SenderRules(["re:(", "@x.com"])
+        assert rules.allows("a@x.com")
+
+    def test_exclusion_wins(self):
+        rules = SenderRules(["domain:substack.com", "!promo@substack.com"])
+        assert rules.allows("news@substack.com")
+        assert not rules.allows("promo@substack.com")
+
+    def test_only_exclusions_allow_the_rest(self):
+        rules = SenderRules(["!domain:spam.com"])
+        assert rules
+        assert rules.allows("a@x.com")
+        assert not rules.allows("a@spam.com")
+
+    def test_search_terms(self):
+        assert SenderRules(["@y.com", "addr:a@x.com", "domain:z.com", "!b@x.com"]).search_terms() == [
+            "a@x.com", "z.com", "@y.com"
+        ]
+        assert SenderRules(["@y.com", "re:.*"]).search_terms() == []
@@ -1,12 +1,21 @@
+import asyncio
 import pytest
 import os
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import ANY, AsyncMock, patch, MagicMock
 
 # Set required env vars before importing modules
 os.environ['TELEGRAM_BOT_TOKEN'] = 'test_token'
 os.environ['ALLOWED_USER_ID'] = '12345'
 
-from src.bot import is_authorized, handle_message, handle_new_command
+from src.bot import is_authorized, handle_message, handle_new_command, handle_usage_command, _coalescer
+from src.config import CLAUDE_TIMEOUT
+
+
+@pytest.fixture(autouse=True)
+def no_debounce():
+    """Run turns immediately instead of waiting for follow-up messages."""
+    with patch.object(_coalescer, 'window', 0):
+        yield
 
 
 def test_is_authorized_valid_user():
@@ -36,9 +45,10 @@ async def test_handle_message_unauthorized():
 
 
 @pytest.mark.asyncio
+@patch('src.bot.CLAUDE_STREAMING', False)
 @patch('src.bot.get_session')
 @patch('src.bot.save_session')
-@patch('src.bot.execute_claude')
+@patch('src.bot.execute_claude_async')
 @patch('src.bot.remove_ansi_codes')
 @patch('src.bot.split_long_message')
 async def test_handle_message_success_no_session(mock_split, mock_remove_ansi, mock_execute, mock_save, mock_get):
@@ -56,13 +66,13 @@ async def test_handle_message_success_no_session(mock_split, mock_remove_ansi, m
 
         # Verify session management
         mock_get.assert_called_once_with(12345)
-        mock_execute.assert_called_once_with("test prompt", None)
+        mock_execute.assert_called_once_with("test prompt", None, timeout=CLAUDE_TIMEOUT, on_usage=ANY)
         mock_save.assert_called_once_with(12345, "new-session-123")
 
         # Verify thinking message sent
         assert message.answer.call_count == 2
         first_call = message.answer.call_args_list[0]
-        assert "Claude myśli" in first_call[0][0]
+        assert first_call[0][0] == "Frank myśli..."
 
         # Verify result sent
         second_call = message.answer.call_args_list[1]
@@ -70,9 +80,10 @@ async def test_handle_message_success_no_session(mock_split, mock_remove_ansi, m
 
 
 @pytest.mark.asyncio
+@patch('src.bot.CLAUDE_STREAMING', False)
 @patch('src.bot.get_session')
 @patch('src.bot.save_session')
-@patch('src.bot.execute_claude')
+@patch('src.bot.execute_claude_async')
 @patch('src.bot.remove_ansi_codes')
 @patch('src.bot.split_long_message')
 async def test_handle_message_success_with_session(mock_split, mock_remove_ansi, mock_execute, mock_save, mock_get):
@@ -90,13 +101,72 @@ async def test_handle_message_success_with_session(mock_split, mock_remove_ansi,
 
         # Verify session continuity
         mock_get.assert_called_once_with(12345)
-        mock_execute.assert_called_once_with("follow up prompt", "existing-session-456")
+        mock_execute.assert_called_once_with("follow up prompt", "existing-session-456", timeout=CLAUDE_TIMEOUT, on_usage=ANY)
         mock_save.assert_called_once_with(12345, "existing-session-456")
 
         # Verify result sent
         assert message.answer.call_count == 2
 
 
+@pytest.mark.asyncio
+@patch('src.bot.CLAUDE_STREAMING', False)
+@patch('src.bot.get_carryover')
+@patch('src.bot.get_session')
+@patch('src.bot.save_session')
+@patch('src.bot.record_turn')
+@patch('src.bot.execute_claude_async')
+async def test_handle_message_prepends_rotation_summary(mock_execute, mock_record, mock_save, mock_get, mock_carryover):
+    with patch('src.bot.ALLOWED_USER_ID', 12345):
+        mock_get.return_value = None
+        mock_carryover.return_value = "Kontekst z poprzedniej rozmowy"
+        mock_execute.return_value = ("Reply", "fresh-session")
+
+        message = AsyncMock()
+        message.from_user.id = 12345
+        message.text = "next question"
+
+        await handle_message(message)
+
+        sent_prompt = mock_execute.call_args[0][0]
+        assert sent_prompt.startswith("Kontekst z poprzedniej rozmowy")
+        assert sent_prompt.endswith("next question")
+        mock_save.assert_called_once_with(12345, "fresh-session")
+        mock_record.assert_called_once_with(12345, sent_prompt, "Reply")
+
+
+@pytest.mark.asyncio
+@patch('src.bot.CLAUDE_STREAMING', True)
+@patch('src.bot.get_session')
+@patch('src.bot.save_session')
+@patch('src.bot.stream_claude')
+async def test_handle_message_streaming_edits_status_message(mock_stream, mock_save, mock_get):
+    with patch('src.bot.ALLOWED_USER_ID', 12345), patch('src.streaming.time') as mock_time:
+        mock_time.monotonic.return_value = 100.0
+        mock_get.return_value = "existing-session-456"
+
+        async def fake_stream(prompt, session_id, timeout=None, on_text=None, on_usage=None):
+            await on_text("Partial ")
+            await on_text("answer")
+            return "Final answer", "existing-session-456"
+
+        mock_stream.side_effect = fake_stream
+
+        status = AsyncMock()
+        message = AsyncMock()
+        message.from_user.id = 12345
+        message.text = "stream prompt"
+        message.answer.return_value = status
+
+        await handle_message(message)
+
+        mock_save.assert_called_once_with(12345, "existing-session-456")
+
+        # Only the status message is sent, then edited in place
+        message.answer.assert_called_once()
+        status.edit_text.assert_any_call("Partial ")
+        assert status.edit_text.call_args[0][0] == "Final answer"
+
+
 @pytest.mark.asyncio
 @patch('src.bot.clear_session')
 async def test_handle_new_command_authorized(mock_clear):
@@ -120,3 +190,182 @@ async def test_handle_new_command_unauthorized():
         await handle_new_command(message)
 
         message.answer.assert_called_once_with("Unauthorized")
+
+
+@pytest.mark.asyncio
+@patch('src.bot.CLAUDE_STREAMING', False)
+@patch('src.bot.get_session', return_value="session-1")
+@patch('src.bot.save_session')
+@patch('src.bot.execute_claude_async')
+async def test_handle_message_coalesces_rapid_messages(mock_execute, mock_save, mock_get):
+    with patch('src.bot.ALLOWED_USER_ID', 12345), patch.object(_coalescer, 'window', 0.05):
+        mock_execute.return_value = ("Merged reply", "session-1")
+
+        messages = []
+        for text in ["first", "second", "third"]:
+            message = AsyncMock()
+            message.from_user.id = 12345
+            message.text = text
+            messages.append(message)
+
+        await asyncio.gather(*(handle_message(m) for m in messages))
+
+        mock_execute.assert_called_once_with("first\n\nsecond\n\nthird", "session-1", timeout=CLAUDE_TIMEOUT, on_usage=ANY)
+        messages[0].answer.assert_not_called()
+        messages[2].answer.assert_any_call("Merged reply")
+
+
+@pytest.mark.asyncio
+@patch('src.bot.CLAUDE_STREAMING', False)
+@patch('src.bot.get_session', return_value="session-1")
+@patch('src.bot.save_session')
+@patch('src.bot.record_turn')
+@patch('src.bot.usage_ledger')
+@patch('src.bot.execute_claude_async')
+async def test_handle_message_records_reported_usage(mock_execute, mock_ledger, mock_record, mock_save, mock_get):
+    from src.usage import Admission, RunUsage
+    usage = RunUsage(input_tokens=100, output_tokens=20, cache_read_tokens=1000, cost_usd=0.05, context_tokens=900)
+
+    async def run(prompt, session_id, timeout=None, on_usage=None):
+        on_usage(usage)
+        return "Reply", "session-1"
+
+    mock_execute.side_effect = run
+    mock_ledger.admit.return_value = Admission.ALLOW
+
+    with patch('src.bot.ALLOWED_USER_ID', 12345):
+        message = AsyncMock()
+        message.from_user.id = 12345
+        message.text = "question"
+
+        await handle_message(message)
+
+    mock_ledger.record.assert_called_once_with("chat", usage)
+    mock_record.assert_called_once_with(12345, "question", "Reply", context_tokens=900)
+
+
+@pytest.mark.asyncio
+@patch('src.bot.CLAUDE_STREAMING', False)
+@patch('src.bot.get_session', return_value="session-1")
+@patch('src.bot.save_session')
+@patch('src.bot.record_turn')
+@patch('src.bot.usage_ledger')
+@patch('src.bot.execute_claude_async')
+async def test_handle_message_keeps_estimate_without_context_size(mock_execute, mock_ledger, mock_record, mock_save, mock_get):
+    from src.usage import Admission, RunUsage
+
+    async def run(prompt, session_id, timeout=None, on_usage=None):
+        on_usage(RunUsage(input_tokens=100, output_tokens=20, cache_read_tokens=1000, cost_usd=0.05))
+        return "Reply", "session-1"
+
+    mock_execute.side_effect = run
+    mock_ledger.admit.return_value = Admission.ALLOW
+
+    with patch('src.bot.ALLOWED_USER_ID', 12345):
+        message = AsyncMock()
+        message.from_user.id = 12345
+        message.text = "question"
+
+        await handle_message(message)
+
+    mock_record.assert_called_once_with(12345, "question", "Reply")
+
+
+@pytest.mark.asyncio
+@patch('src.bot.usage_ledger')
+@patch('src.bot.execute_claude_async')
+async def test_handle_message_refused_when_budget_exhausted(mock_execute, mock_ledger):
+    from src.usage import Admission
+    mock_ledger.admit.return_value = Admission.REJECT
+
+    with patch('src.bot.ALLOWED_USER_ID', 12345):
+        message = AsyncMock()
+        message.from_user.id = 12345
+        message.text = "question"
+
+        await handle_message(message)
+
+    mock_execute.assert_not_called()
+    assert "/usage" in message.answer.call_args[0][0]
+
+
+@pytest.mark.asyncio
+@patch('src.bot.usage_ledger')
+async def test_handle_usage_command_sends_report(mock_ledger):
+    mock_ledger.report.return_value = "📊 Zużycie Claude"
+
+    with patch('src.bot.ALLOWED_USER_ID', 12345):
+        message = AsyncMock()
+        message.from_user.id = 12345
+
+        await handle_usage_command(message)
+
+    message.answer.assert_called_once_with("📊 Zużycie Claude")
+
+
+@pytest.mark.asyncio
+@patch('src.bot.CLAUDE_STREAMING', False)
+@patch('src.bot.get_session', return_value="session-1")
+@patch('src.bot.save_session')
+@patch('src.bot.record_turn')
+@patch('src.bot.execute_claude_async')
+async def test_handle_cancel_command_stops_running_turn(mock_execute, mock_record, mock_save, mock_get):
+    from src.bot import handle_cancel_command
+    from src.worker_pool import claude_pool
+    started = asyncio.Event()
+
+    async def run(prompt, session_id, timeout=None, on_usage=None):
+        started.set()
+        await asyncio.sleep(10)
+
+    mock_execute.side_effect = run
+
+    with patch('src.bot.ALLOWED_USER_ID', 12345):
+        message = AsyncMock()
+        message.from_user.id = 12345
+        message.text = "long question"
+        turn = asyncio.create_task(handle_message(message))
+        await asyncio.wait_for(started.wait(), 1)
+
+        cancel = AsyncMock()
+        cancel.from_user.id = 12345
+        await handle_cancel_command(cancel)
+        await asyncio.wait_for(turn, 1)
+
+    # Session is left as it was and the worker slot is free again
+    mock_save.assert_not_called()
+    mock_record.assert_not_called()
+    assert claude_pool.active == 0
+    assert "Anulowano" in message.answer.call_args[0][0]
+    cancel.answer.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_handle_cancel_command_nothing_running():
+    from src.bot import handle_cancel_command
+
+    with patch('src.bot.ALLOWED_USER_ID', 12345):
+        message = AsyncMock()
+        message.from_user.id = 12345
+
+        await handle_cancel_command(message)
+
+    message.answer.assert_called_once_with("Nic nie jest w toku.")
+
+
+@pytest.mark.asyncio
+@patch('src.bot.delivery_queue')
+async def test_report_interrupted_turns_notifies_chat_only(mock_delivery):
+    from src.bot import report_interrupted_turns
+    from src.shutdown import JournalEntry
+    mock_delivery.deliver = AsyncMock()
+    bot = MagicMock()
+
+    await report_interrupted_turns(bot, [
+        JournalEntry("chat", 12345, {"chat_id": 12345, "prompt": "what is up"}),
+        JournalEntry("newsletter", 12345),
+    ])
+
+    mock_delivery.deliver.assert_called_once()
+    mock_delivery.deliver.call_args[0][1]()
+    assert "what is up" in bot.send_message.call_args[0][1]
@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from src.cancellation import CancellationRegistry, JobCancelled
+
+
+async def _job(registry, user_id, name, started):
+    async with registry.scope(user_id, name):
+        started.set()
+        await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test_cancel_raises_job_cancelled_in_scope():
+    registry = CancellationRegistry()
+    started = asyncio.Event()
+    task = asyncio.create_task(_job(registry, 1, "chat", started))
+    await started.wait()
+
+    assert registry.active(1) == ["chat"]
+    assert registry.cancel(1) == ["chat"]
+
+    with pytest.raises(JobCancelled):
+        await task
+    assert registry.active(1) == []
+
+
+@pytest.mark.asyncio
+async def test_cancel_only_targets_given_user_and_job():
+    registry = CancellationRegistry()
+    started = [asyncio.Event() for _ in range(3)]
+    tasks = [
+        asyncio.create_task(_job(registry, 1, "chat", started[0])),
+        asyncio.create_task(_job(registry, 1, "digest", started[1])),
+        asyncio.create_task(_job(registry, 2, "chat", started[2])),
+    ]
+    await asyncio.gather(*(event.wait() for event in started))
+
+    assert registry.cancel(1, "chat") == ["chat"]
+    assert registry.cancel(3) == []
+    with pytest.raises(JobCancelled):
+        await tasks[0]
+    assert sorted(registry.active(1) + registry.active(2)) == ["chat", "digest"]
+
+    for task in tasks[1:]:
+        task.cancel()
+    await asyncio.gather(*tasks[1:], return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_foreign_cancellation_still_propagates():
+    registry = CancellationRegistry()
+    started = asyncio.Event()
+    task = asyncio.create_task(_job(registry, 1, "chat", started))
+    await started.wait()
+
+    # Shutdown cancels the task directly, not through the registry
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert registry.active(1) == []
@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from src.coalescer import MessageCoalescer
+
+
+class Recorder:
+    """Collects batches handed to run_turn."""
+
+    def __init__(self, delay=0):
+        self.batches = []
+        self.delay = delay
+
+    async def __call__(self, user_id, messages):
+        self.batches.append((user_id, list(messages)))
+        await asyncio.sleep(self.delay)
+
+
+@pytest.mark.asyncio
+async def test_messages_within_window_form_one_batch():
+    recorder = Recorder()
+    coalescer = MessageCoalescer(recorder, window=0.05)
+
+    await asyncio.gather(
+        coalescer.submit(1, "a"),
+        coalescer.submit(1, "b"),
+        coalescer.submit(1, "c"),
+    )
+
+    assert recorder.batches == [(1, ["a", "b", "c"])]
+
+
+@pytest.mark.asyncio
+async def test_users_are_batched_independently():
+    recorder = Recorder()
+    coalescer = MessageCoalescer(recorder, window=0.01)
+
+    await asyncio.gather(coalescer.submit(1, "a"), coalescer.submit(2, "b"))
+
+    assert sorted(recorder.batches) == [(1, ["a"]), (2, ["b"])]
+
+
+@pytest.mark.asyncio
+async def test_messages_during_running_turn_fold_into_next_turn():
+    recorder = Recorder(delay=0.1)
+    coalescer = MessageCoalescer(recorder, window=0.01)
+
+    first = asyncio.create_task(coalescer.submit(1, "a"))
+    await asyncio.sleep(0.05)  # first turn is running now
+    second = asyncio.create_task(coalescer.submit(1, "b"))
+    third = asyncio.create_task(coalescer.submit(1, "c"))
+    await asyncio.sleep(0)
+
+    assert coalescer.pending_count(1) == 2
+    await asyncio.gather(first, second, third)
+
+    assert recorder.batches == [(1, ["a"]), (1, ["b", "c"])]
+
+
+@pytest.mark.asyncio
+async def test_turn_failure_propagates_to_submitters():
+    async def failing(user_id, messages):
+        raise RuntimeError("boom")
+
+    coalescer = MessageCoalescer(failing, window=0)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await coalescer.submit(1, "a")
+
+    assert coalescer.pending_count(1) == 0
+
+
+@pytest.mark.asyncio
+async def test_discard_drops_pending_messages():
+    recorder = Recorder(delay=0.05)
+    coalescer = MessageCoalescer(recorder, window=0.01)
+
+    first = asyncio.create_task(coalescer.submit(1, "a"))
+    await asyncio.sleep(0.02)
+    queued = asyncio.create_task(coalescer.submit(1, "b"))
+    await asyncio.sleep(0)
+
+    assert coalescer.discard(1) == 1
+    await asyncio.wait_for(queued, 1)
+    await first
+
+    # The running turn finished, the dropped message never started one
+    assert recorder.batches == [(1, ["a"])]
+    assert coalescer.discard(1) == 0
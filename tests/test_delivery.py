@@ -0,0 +1,91 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from aiogram.exceptions import TelegramRetryAfter
+from src.delivery import DeliveryQueue, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=2, burst=2)
+
+    assert bucket.delay() == 0
+    bucket._tokens -= 2
+
+    assert bucket.delay() == pytest.approx(0.5, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_deliver_returns_send_result():
+    queue = DeliveryQueue(rate=100, burst=10)
+    send = AsyncMock(return_value="sent-message")
+
+    result = await queue.deliver(1, send)
+
+    assert result == "sent-message"
+    assert queue.stats()["delivered"] == 1
+
+
+@pytest.mark.asyncio
+async def test_deliver_preserves_order_per_chat():
+    queue = DeliveryQueue(rate=100, burst=1)
+    delivered = []
+
+    def sender(text):
+        async def send():
+            await asyncio.sleep(0.001)
+            delivered.append(text)
+        return send
+
+    await asyncio.gather(*(queue.deliver(1, sender(f"chunk-{i}")) for i in range(5)))
+
+    assert delivered == [f"chunk-{i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_deliver_paces_sends_with_token_bucket():
+    queue = DeliveryQueue(rate=20, burst=1)
+    send = AsyncMock()
+
+    start = time.monotonic()
+    await asyncio.gather(*(queue.deliver(1, send) for _ in range(3)))
+
+    # One token up front, two more at 20/s
+    assert time.monotonic() - start >= 0.09
+    assert send.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_deliver_backs_off_on_retry_after():
+    queue = DeliveryQueue(rate=100, burst=10)
+    flood = TelegramRetryAfter(method=MagicMock(), message="Too Many Requests", retry_after=0)
+    send = AsyncMock(side_effect=[flood, "ok"])
+
+    result = await queue.deliver(1, send)
+
+    assert result == "ok"
+    assert queue.stats()["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_deliver_gives_up_after_max_retries():
+    queue = DeliveryQueue(rate=100, burst=10, max_retries=1)
+    flood = TelegramRetryAfter(method=MagicMock(), message="Too Many Requests", retry_after=0)
+    send = AsyncMock(side_effect=flood)
+
+    with pytest.raises(TelegramRetryAfter):
+        await queue.deliver(1, send)
+
+    assert queue.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_send_does_not_block_following_sends():
+    queue = DeliveryQueue(rate=100, burst=10)
+    failing = AsyncMock(side_effect=RuntimeError("bad request"))
+    ok = AsyncMock(return_value="ok")
+
+    results = await asyncio.gather(queue.deliver(1, failing), queue.deliver(1, ok), return_exceptions=True)
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] == "ok"
@@ -1,7 +1,16 @@
+import asyncio
 import pytest
 import json
-from unittest.mock import patch, MagicMock
-from src.executor import execute_claude
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch, MagicMock
+from src.executor import execute_claude, execute_claude_async, run_claude_process, stream_claude
+from src.shutdown import JobStopped
 
 
 @patch('src.executor.subprocess.run')
@@ -122,3 +131,291 @@ def test_execute_claude_command_not_found(mock_run):
 
     with pytest.raises(FileNotFoundError):
         execute_claude("prompt")
+
+
+class FakeProcess:
+    """Minimal stand-in for asyncio.subprocess.Process."""
+
+    def __init__(self, stdout=b"", stderr=b"", delay=0):
+        # Above the Linux pid_max limit, so process group signals never hit a real process
+        self.pid = 2 ** 22 + 1
+        self.returncode = None
+        self._stdout = stdout
+        self._stderr = stderr
+        self._delay = delay
+        self.killed = False
+
+    async def communicate(self):
+        await asyncio.sleep(self._delay)
+        self.returncode = 0
+        return self._stdout, self._stderr
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+    async def wait(self):
+        return self.returncode
+
+
+@pytest.mark.asyncio
+async def test_execute_claude_async_success():
+    json_response = {"result": "Async response", "session_id": "async-session-1"}
+    proc = FakeProcess(stdout=json.dumps(json_response).encode())
+
+    with patch('src.executor.asyncio.create_subprocess_exec', AsyncMock(return_value=proc)) as mock_exec:
+        result_text, session_id = await execute_claude_async("test prompt", session_id="old-session")
+
+    assert result_text == "Async response"
+    assert session_id == "async-session-1"
+    args = mock_exec.call_args[0]
+    assert list(args) == ["claude", "-p", "test prompt", "--output-format", "json", "--resume", "old-session"]
+
+
+@pytest.mark.asyncio
+async def test_execute_claude_async_invalid_json():
+    proc = FakeProcess(stdout=b"Not valid JSON")
+
+    with patch('src.executor.asyncio.create_subprocess_exec', AsyncMock(return_value=proc)):
+        with pytest.raises(ValueError, match="Invalid JSON from Claude"):
+            await execute_claude_async("prompt")
+
+
+@pytest.mark.asyncio
+async def test_execute_claude_async_timeout_kills_process():
+    proc = FakeProcess(delay=10)
+
+    with patch('src.executor.asyncio.create_subprocess_exec', AsyncMock(return_value=proc)):
+        with pytest.raises(TimeoutError, match="timeout"):
+            await execute_claude_async("prompt", timeout=0.05)
+
+    assert proc.killed is True
+
+
+@pytest.mark.asyncio
+async def test_execute_claude_async_cancel_kills_process():
+    proc = FakeProcess(delay=10)
+
+    with patch('src.executor.asyncio.create_subprocess_exec', AsyncMock(return_value=proc)):
+        task = asyncio.create_task(execute_claude_async("prompt"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert proc.killed is True
+
+
+class FakeStreamProcess(FakeProcess):
+    """Process stand-in exposing stream-json lines on stdout."""
+
+    def __init__(self, lines, stderr=b""):
+        super().__init__()
+        self.stdout = asyncio.StreamReader()
+        for line in lines:
+            self.stdout.feed_data((json.dumps(line) + "\n").encode())
+        self.stdout.feed_eof()
+        self.stderr = asyncio.StreamReader()
+        self.stderr.feed_data(stderr)
+        self.stderr.feed_eof()
+
+    async def wait(self):
+        if self.returncode is None:
+            self.returncode = 0
+        return self.returncode
+
+
+@pytest.mark.asyncio
+async def test_stream_claude_reports_text_deltas():
+    proc = FakeStreamProcess([
+        {"type": "system", "subtype": "init", "session_id": "stream-1"},
+        {"type": "stream_event", "event": {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "Hel"}}},
+        {"type": "stream_event", "event": {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "lo"}}},
+        {"type": "assistant", "message": {"content": [{"type": "text", "text": "Hello"}]}, "session_id": "stream-1"},
+        {"type": "result", "result": "Hello", "session_id": "stream-1"},
+    ])
+    fragments = []
+
+    async def on_text(text):
+        fragments.append(text)
+
+    with patch('src.executor.asyncio.create_subprocess_exec', AsyncMock(return_value=proc)) as mock_exec:
+        result_text, session_id = await stream_claude("prompt", on_text=on_text)
+
+    assert fragments == ["Hel", "lo"]
+    assert result_text == "Hello"
+    assert session_id == "stream-1"
+    assert "stream-json" in mock_exec.call_args[0]
+
+
+@pytest.mark.asyncio
+async def test_stream_claude_context_from_last_assistant_message():
+    proc = FakeStreamProcess([
+        {"type": "assistant", "session_id": "s", "message": {
+            "content": [{"type": "tool_use", "name": "Read"}],
+            "usage": {"input_tokens": 10, "cache_read_input_tokens": 1000, "output_tokens": 30}}},
+        {"type": "assistant", "session_id": "s", "message": {
+            "content": [{"type": "text", "text": "Done"}],
+            "usage": {"input_tokens": 5, "cache_read_input_tokens": 1500, "output_tokens": 20}}},
+        {"type": "result", "result": "Done", "session_id": "s", "total_cost_usd": 0.01,
+         "usage": {"input_tokens": 15, "cache_read_input_tokens": 2500, "output_tokens": 50}},
+    ])
+    usage = []
+
+    with patch('src.executor.asyncio.create_subprocess_exec', AsyncMock(return_value=proc)):
+        await stream_claude("prompt", on_usage=usage.append)
+
+    # Run totals go to the ledger, the context is what the last request saw
+    assert usage[0].input_tokens == 15
+    assert usage[0].context_tokens == 1525
+
+
+@pytest.mark.asyncio
+async def test_stream_claude_falls_back_to_assistant_messages():
+    proc = FakeStreamProcess([
+        {"type": "assistant", "message": {"content": [{"type": "text", "text": "Whole"}]}, "session_id": "s"},
+        {"type": "result", "result": "Whole", "session_id": "s"},
+    ])
+    fragments = []
+
+    async def on_text(text):
+        fragments.append(text)
+
+    with patch('src.executor.asyncio.create_subprocess_exec', AsyncMock(return_value=proc)):
+        result_text, _ = await stream_claude("prompt", on_text=on_text)
+
+    assert fragments == ["Whole"]
+    assert result_text == "Whole"
+
+
+@pytest.mark.asyncio
+async def test_stream_claude_callback_error_kills_process():
+    proc = FakeStreamProcess([
+        {"type": "stream_event", "event": {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "x"}}},
+    ])
+
+    async def on_text(text):
+        raise RuntimeError("telegram down")
+
+    with patch('src.executor.asyncio.create_subprocess_exec', AsyncMock(return_value=proc)), \
+         patch('src.executor._signal_group') as mock_signal:
+        with pytest.raises(RuntimeError):
+            await stream_claude("prompt", on_text=on_text)
+
+    # Process group is asked to terminate (the fake exits on SIGTERM)
+    mock_signal.assert_any_call(proc, signal.SIGTERM)
+
+
+FAKE_CLAUDE = [sys.executable, str(Path(__file__).parent.parent / "scripts" / "fake_claude.py")]
+
+
+@pytest.fixture
+def fake_claude(monkeypatch):
+    monkeypatch.setattr('src.executor.CLAUDE_COMMAND', FAKE_CLAUDE)
+    monkeypatch.setenv('FAKE_CLAUDE_LATENCY', '0')
+    monkeypatch.setenv('FAKE_CLAUDE_OUTPUT_CHARS', '300')
+    monkeypatch.setenv('FAKE_CLAUDE_FAILURE_RATE', '0')
+
+
+@pytest.mark.asyncio
+async def test_execute_claude_async_with_fake_cli(fake_claude):
+    result, session_id = await execute_claude_async("hello", "fake-session")
+
+    assert result.startswith("Re: hello")
+    assert len(result) == 300
+    assert session_id == "fake-session"
+
+
+@pytest.mark.asyncio
+async def test_stream_claude_with_fake_cli(fake_claude, monkeypatch):
+    monkeypatch.setenv('FAKE_CLAUDE_CHUNKS', '5')
+    fragments = []
+
+    async def on_text(text):
+        fragments.append(text)
+
+    result, session_id = await stream_claude("hello", on_text=on_text)
+
+    assert len(fragments) == 5
+    assert "".join(fragments) == result
+    assert session_id
+
+
+@pytest.mark.asyncio
+async def test_execute_claude_async_fake_cli_failure(fake_claude, monkeypatch):
+    monkeypatch.setenv('FAKE_CLAUDE_FAILURE_RATE', '1')
+
+    with pytest.raises(ValueError, match="Invalid JSON"):
+        await execute_claude_async("hello")
+
+
+@pytest.mark.asyncio
+async def test_cancel_kills_whole_process_group(fake_claude, monkeypatch):
+    monkeypatch.setenv('FAKE_CLAUDE_LATENCY', '30')
+    spawned = []
+    real_exec = asyncio.create_subprocess_exec
+
+    async def spawn(*args, **kwargs):
+        proc = await real_exec(*args, **kwargs)
+        spawned.append(proc)
+        return proc
+
+    with patch('src.executor.asyncio.create_subprocess_exec', spawn):
+        task = asyncio.create_task(execute_claude_async("hello"))
+        while not spawned:
+            await asyncio.sleep(0.01)
+        pid = spawned[0].pid
+        # The CLI leads its own process group
+        assert os.getpgid(pid) == pid
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert spawned[0].returncode is not None
+    with pytest.raises(ProcessLookupError):
+        os.killpg(pid, 0)
+
+
+def test_run_claude_process_with_fake_cli(fake_claude):
+    result = run_claude_process([*FAKE_CLAUDE, "-p", "hello", "--output-format", "json"], timeout=30)
+
+    assert result.returncode == 0
+    assert json.loads(result.stdout)["result"].startswith("Re: hello")
+
+
+def test_run_claude_process_stop_kills_process_group(fake_claude, monkeypatch):
+    monkeypatch.setenv('FAKE_CLAUDE_LATENCY', '30')
+    stop = threading.Event()
+    spawned = []
+    real_popen = subprocess.Popen
+
+    def popen(*args, **kwargs):
+        spawned.append(real_popen(*args, **kwargs))
+        return spawned[-1]
+
+    threading.Timer(0.3, stop.set).start()
+    started = time.monotonic()
+    with patch('src.executor.subprocess.Popen', popen), pytest.raises(JobStopped):
+        run_claude_process([*FAKE_CLAUDE, "-p", "hello"], timeout=60, stop=stop)
+
+    assert time.monotonic() - started < 10
+    assert spawned[0].returncode is not None
+    with pytest.raises(ProcessLookupError):
+        os.killpg(spawned[0].pid, 0)
+
+
+def test_run_claude_process_timeout(fake_claude, monkeypatch):
+    monkeypatch.setenv('FAKE_CLAUDE_LATENCY', '30')
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_claude_process([*FAKE_CLAUDE, "-p", "hello"], timeout=0.3)
+
+
+def test_run_claude_process_not_started_when_stopped():
+    stop = threading.Event()
+    stop.set()
+
+    with patch('src.executor.subprocess.Popen') as mock_popen, pytest.raises(JobStopped):
+        run_claude_process(["claude"], timeout=10, stop=stop)
+    mock_popen.assert_not_called()
@@ -1,5 +1,5 @@
 import pytest
-from src.formatter import remove_ansi_codes, split_long_message
+from src.formatter import remove_ansi_codes, split_long_message, iter_message_chunks, AnsiSanitizer
 
 
 def test_remove_ansi_codes_strips_color_codes():
@@ -26,3 +26,98 @@ def test_split_long_message_multiple_chunks():
     assert len(result) == 2
     assert len(result[0]) == 4096
     assert len(result[1]) == 904
+
+
+def test_split_long_message_prefers_paragraph_boundary():
+    text = "A" * 60 + "\n\n" + "B" * 30 + "\n" + "C" * 30
+    result = split_long_message(text, max_length=100)
+    assert result == ["A" * 60, "B" * 30 + "\n" + "C" * 30]
+
+
+def test_split_long_message_prefers_line_then_word_boundary():
+    text = "alpha beta gamma\ndelta epsilon zeta"
+    assert split_long_message(text, max_length=20) == ["alpha beta gamma", "delta epsilon zeta"]
+
+    words = "word " * 10
+    result = split_long_message(words.strip(), max_length=12)
+    assert all(not chunk.startswith(" ") and "wor " not in chunk for chunk in result)
+    assert " ".join(result).split() == ["word"] * 10
+
+
+def test_split_long_message_keeps_code_fences_balanced():
+    code = "\n".join(f"line_{i} = {i}" for i in range(40))
+    text = "Intro\n```python\n" + code + "\n```\nOutro"
+    result = split_long_message(text, max_length=120)
+
+    assert len(result) > 2
+    for chunk in result:
+        assert len(chunk) <= 120
+        assert chunk.count("```") % 2 == 0
+    # Continuation chunks reopen the block with its language
+    assert all(chunk.startswith("```python") for chunk in result[2:-1])
+    joined = "".join(result)
+    for i in range(40):
+        assert f"line_{i} = {i}" in joined
+
+
+def test_split_long_message_ignores_fences_with_info_inside_block():
+    # A Markdown sample quoting code: "```py" lines are content, only the bare fence closes
+    sample = "".join(f"Step {i}\n```py\nprint({i})\n" for i in range(30))
+    text = "Intro\n```markdown\n" + sample + "```\nOutro"
+    result = split_long_message(text, max_length=120)
+
+    assert len(result) > 2
+    for chunk in result:
+        assert len(chunk) <= 120
+        # Walk the chunk by CommonMark rules: it must end outside any block
+        open_fence = None
+        for line in chunk.split("\n"):
+            if open_fence is None and line.startswith("```"):
+                open_fence = line
+            elif open_fence is not None and line.strip() == "```":
+                open_fence = None
+        assert open_fence is None, chunk
+    assert all(chunk.startswith("```markdown\n") for chunk in result[2:-1])
+    assert result[-1].endswith("```\nOutro")
+
+
+def test_iter_message_chunks_is_lazy_generator():
+    chunks = iter_message_chunks("x" * 10000, max_length=4096)
+    assert next(chunks) == "x" * 4096
+    assert len(list(chunks)) == 2
+
+
+def test_split_long_message_chunks_respect_limit():
+    text = ("paragraph " * 50 + "\n\n```\ncode\n" * 3 + "```\n") * 50
+    for chunk in split_long_message(text, max_length=500):
+        assert 0 < len(chunk) <= 500
+
+
+def test_remove_ansi_codes_strips_osc_and_control_chars():
+    input_text = "\x1b]0;window title\x07Hello\x1b]8;;https://x.dev\x1b\\link\x1b]8;;\x1b\\\r\n\ttab"
+    assert remove_ansi_codes(input_text) == "Hellolink\n\ttab"
+
+
+def test_ansi_sanitizer_handles_sequences_split_across_chunks():
+    sanitizer = AnsiSanitizer()
+    out = sanitizer.feed("plain \x1b[3")
+    assert out == "plain "
+    out += sanitizer.feed("1mred\x1b]0;ti")
+    out += sanitizer.feed("tle\x1b")
+    out += sanitizer.feed("\\ done")
+    out += sanitizer.flush()
+    assert out == "plain red done"
+
+
+def test_ansi_sanitizer_byte_by_byte_matches_whole_string():
+    text = "\x1b[1;32mżółć\x1b[0m and \x1b]8;;https://x.dev\x1b\\link\x1b]8;;\x1b\\ \x1b(Bend"
+    sanitizer = AnsiSanitizer()
+    data = text.encode("utf-8")
+    out = "".join(sanitizer.feed(data[i:i + 1]) for i in range(len(data))) + sanitizer.flush()
+    assert out == remove_ansi_codes(text) == "żółć and link end"
+
+
+def test_ansi_sanitizer_drops_unfinished_sequence_on_flush():
+    sanitizer = AnsiSanitizer()
+    assert sanitizer.feed("text\x1b[12") == "text"
+    assert sanitizer.flush() == ""
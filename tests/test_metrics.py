@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from src.metrics import Counter, Histogram, Registry, SPAN_SECONDS, registry, span, start_metrics_server
+
+
+def test_counter_tracks_labels_separately():
+    counter = Counter("jobs_total", "Jobs")
+
+    counter.inc(mode="a")
+    counter.inc(2, mode="a")
+    counter.inc(mode="b")
+
+    assert counter.value(mode="a") == 3
+    assert counter.value(mode="b") == 1
+    assert counter.value(mode="c") == 0
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_registry_renders_prometheus_text():
+    reg = Registry()
+    reg.counter("frank_test_total", "Test counter").inc(outcome="ok")
+    reg.gauge("frank_test_depth", "Test gauge", lambda: 7)
+
+    text = reg.render()
+
+    assert "# TYPE frank_test_total counter" in text
+    assert 'frank_test_total{outcome="ok"} 1' in text
+    assert "# TYPE frank_test_depth gauge" in text
+    assert "frank_test_depth 7" in text
+
+
+def test_label_values_are_escaped():
+    counter = Counter("frank_blog_total", "Blogs")
+    counter.inc(blog='Bob\'s "Tech"\\Notes\nDaily')
+
+    assert counter.render() == ['frank_blog_total{blog="Bob\'s \\"Tech\\"\\\\Notes\\nDaily"} 1']
+
+
+def test_registry_returns_existing_metric():
+    reg = Registry()
+
+    assert reg.counter("same_total", "x") is reg.counter("same_total", "x")
+
+
+def test_span_records_duration_even_on_error():
+    before = SPAN_SECONDS.count(span="test_failing_block")
+
+    with pytest.raises(RuntimeError):
+        with span("test_failing_block"):
+            raise RuntimeError("boom")
+
+    assert SPAN_SECONDS.count(span="test_failing_block") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_serves_registry():
+    registry.counter("frank_test_served_total", "Served").inc()
+    server = await start_metrics_server("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert "frank_test_served_total 1" in response
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_404_for_other_paths():
+    server = await start_metrics_server("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET / HTTP/1.1\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert response.startswith("HTTP/1.1 404")
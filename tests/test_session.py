@@ -1,5 +1,12 @@
 import pytest
-from src.session import get_session, save_session, clear_session, _sessions
+import sqlite3
+import time
+from unittest.mock import patch
+from src.session import (
+    get_session, save_session, clear_session, _sessions,
+    configure_backend, MemoryBackend, SqliteBackend,
+    configure_policy, SessionPolicy, get_carryover, record_turn
+)
 
 
 @pytest.fixture(autouse=True)
@@ -65,3 +72,141 @@ def test_multiple_users():
     assert get_session(111) == "session-111"
     assert get_session(222) is None
     assert get_session(333) == "session-333"
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    backend = SqliteBackend(tmp_path / "sessions.db", flush_interval=60)
+    configure_backend(backend)
+    yield backend
+    configure_backend(MemoryBackend())
+
+
+def test_sqlite_sessions_survive_restart(tmp_path, sqlite_backend):
+    save_session(111, "session-111")
+    save_session(222, "session-222")
+    clear_session(222)
+    sqlite_backend.close()
+
+    # Simulate restart: fresh cache loaded from disk
+    configure_backend(SqliteBackend(tmp_path / "sessions.db", flush_interval=60))
+
+    assert list(_sessions) == [111]
+    assert get_session(111) == "session-111"
+    assert get_session(222) is None
+
+
+def test_sqlite_read_through_on_cache_miss(sqlite_backend):
+    save_session(111, "session-111")
+    sqlite_backend.flush()
+    _sessions.clear()
+
+    assert get_session(111) == "session-111"
+    assert _sessions[111].session_id == "session-111"
+
+
+def test_sqlite_pending_delete_hides_persisted_session(sqlite_backend):
+    save_session(111, "session-111")
+    sqlite_backend.flush()
+
+    clear_session(111)
+    _sessions.clear()
+
+    assert get_session(111) is None
+
+
+def test_sqlite_uses_wal_and_batches_writes(sqlite_backend):
+    mode = sqlite_backend._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+    for user_id in range(5):
+        save_session(user_id, f"session-{user_id}")
+    rows = sqlite_backend._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    assert rows == 0
+
+    sqlite_backend.flush()
+    rows = sqlite_backend._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    assert rows == 5
+
+
+@pytest.fixture
+def policy():
+    configure_policy(SessionPolicy(max_turns=3, max_tokens=1000, idle_timeout=3600, summary_turns=2))
+    yield
+    configure_policy(SessionPolicy())
+
+
+def test_record_turn_tracks_usage(policy):
+    save_session(111, "session-111")
+    record_turn(111, "prompt", "reply", tokens=50)
+    record_turn(111, "prompt", "reply")
+
+    record = _sessions[111]
+    assert record.turns == 2
+    assert record.tokens == 50 + len("promptreply") // 4
+
+
+def test_record_turn_reported_context_replaces_estimate(policy):
+    save_session(111, "session-111")
+    record_turn(111, "prompt", "reply", tokens=50)
+    record_turn(111, "prompt", "reply", context_tokens=800)
+
+    assert _sessions[111].tokens == 800
+
+    # Context reported by Claude is the whole conversation, not an increment
+    record_turn(111, "prompt", "reply", context_tokens=900)
+    assert _sessions[111].tokens == 900
+
+
+def test_session_rotates_after_max_turns_with_summary(policy):
+    save_session(111, "session-111")
+    for i in range(3):
+        record_turn(111, f"question {i}", f"answer {i}")
+
+    assert get_session(111) is None
+
+    carryover = get_carryover(111)
+    assert "question 2" in carryover
+    assert "answer 1" in carryover
+    assert "question 0" not in carryover
+
+    # Fresh session consumes the summary and restarts counters
+    save_session(111, "session-222")
+    assert get_carryover(111) is None
+    assert get_session(111) == "session-222"
+    assert _sessions[111].turns == 0
+
+
+def test_session_rotates_after_max_tokens(policy):
+    save_session(111, "session-111")
+    record_turn(111, "prompt", "reply", tokens=1500)
+
+    assert get_session(111) is None
+    assert get_carryover(111) is not None
+
+
+def test_idle_session_expires_without_carryover(policy):
+    save_session(111, "session-111")
+    record_turn(111, "prompt", "reply")
+
+    with patch('src.session.time.time', return_value=time.time() + 7200):
+        assert get_session(111) is None
+
+    assert get_carryover(111) is None
+    assert 111 not in _sessions
+
+
+def test_sqlite_migrates_legacy_schema(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE sessions (user_id INTEGER PRIMARY KEY, session_id TEXT NOT NULL, updated_at REAL NOT NULL)")
+    conn.execute("INSERT INTO sessions VALUES (111, 'legacy-session', ?)", (time.time(),))
+    conn.commit()
+    conn.close()
+
+    configure_backend(SqliteBackend(path, flush_interval=60))
+    try:
+        assert get_session(111) == "legacy-session"
+        assert _sessions[111].turns == 0
+    finally:
+        configure_backend(MemoryBackend())
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+import pytest
+from src.shutdown import JobStopped, ShutdownCoordinator, ShuttingDown, check_stop, run_stoppable
+
+
+@pytest.mark.asyncio
+async def test_running_job_is_journaled_until_it_finishes(tmp_path):
+    journal = tmp_path / "jobs.json"
+    coordinator = ShutdownCoordinator(journal)
+
+    async with coordinator.job("chat", 1, chat_id=1, prompt="hello"):
+        # Written ahead, so a crash leaves it behind
+        entries = json.loads(journal.read_text())
+        assert [(e["kind"], e["payload"]["prompt"]) for e in entries] == [("chat", "hello")]
+
+    assert not journal.exists()
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_jobs_within_deadline(tmp_path):
+    coordinator = ShutdownCoordinator(tmp_path / "jobs.json", drain_seconds=1)
+    finished = []
+
+    async def job():
+        async with coordinator.job("chat", 1):
+            await asyncio.sleep(0.05)
+            finished.append(True)
+
+    task = asyncio.create_task(job())
+    await asyncio.sleep(0)
+
+    assert await coordinator.drain() == []
+    assert finished == [True]
+    await task
+    assert coordinator.recover() == []
+
+
+@pytest.mark.asyncio
+async def test_drain_cancels_and_journals_jobs_past_deadline(tmp_path):
+    journal = tmp_path / "jobs.json"
+    coordinator = ShutdownCoordinator(journal, drain_seconds=0.05)
+
+    async def digest():
+        async with coordinator.job("newsletter", 7):
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(digest())
+    await asyncio.sleep(0)
+
+    interrupted = await coordinator.drain()
+    assert [entry.kind for entry in interrupted] == ["newsletter"]
+    assert task.cancelled()
+
+    # Next start picks it up once, then the journal is gone
+    restarted = ShutdownCoordinator(journal)
+    recovered = restarted.recover()
+    assert [(entry.kind, entry.user_id) for entry in recovered] == [("newsletter", 7)]
+    assert restarted.recover() == []
+
+
+@pytest.mark.asyncio
+async def test_no_new_jobs_after_shutdown_started():
+    coordinator = ShutdownCoordinator()
+    coordinator.close()
+
+    with pytest.raises(ShuttingDown):
+        async with coordinator.job("chat", 1):
+            pass
+
+
+def test_recover_ignores_corrupt_journal(tmp_path):
+    journal = tmp_path / "jobs.json"
+    journal.write_text("{not json")
+
+    assert ShutdownCoordinator(journal).recover() == []
+    assert not journal.exists()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_job_stops_its_worker_thread():
+    started = threading.Event()
+    finished = threading.Event()
+
+    def process(stop):
+        started.set()
+        try:
+            while True:
+                check_stop(stop, "the next item")
+                stop.wait(0.01)
+        finally:
+            finished.set()
+
+    task = asyncio.create_task(run_stoppable(process))
+    await asyncio.to_thread(started.wait, 5)
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    # Cancellation returns only once the thread is done, nothing keeps running behind it
+    assert finished.is_set()
+
+
+@pytest.mark.asyncio
+async def test_run_stoppable_returns_result():
+    assert await run_stoppable(lambda value, stop: value * 2, 21) == 42
+
+
+def test_check_stop():
+    stop = threading.Event()
+    check_stop(stop, "x")
+    check_stop(None, "x")
+
+    stop.set()
+    with pytest.raises(JobStopped):
+        check_stop(stop, "x")
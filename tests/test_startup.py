@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from src.startup import StartupTimer
+
+ROOT = Path(__file__).parent.parent
+
+# Own import cost of the core bot path (aiogram excluded), override on slow hardware
+IMPORT_BUDGET_MS = float(os.getenv("FRANK_IMPORT_BUDGET_MS", "300"))
+
+# Loaded on first digest or in webhook mode only, never on the core chat path
+DEFERRED_MODULES = ("html2text", "imaplib", "aiohttp.web", "src.newsletter", "src.blog", "src.webhook")
+
+PROBE = """
+import json, sys, time
+import aiogram, aiogram.filters
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({"ms": elapsed * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+def _probe_import() -> dict:
+    """Import main in a fresh interpreter, as a cold start does."""
+    env = {**os.environ, "TELEGRAM_BOT_TOKEN": "123:probe", "ALLOWED_USER_ID": "1", "TELEGRAM_MODE": "polling"}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_startup_timer_phases_add_up():
+    with patch("src.startup.time") as mock_time:
+        mock_time.perf_counter.side_effect = [10.0, 10.5, 12.0]
+        timer = StartupTimer()
+        assert timer.mark("config") == 0.5
+        assert timer.mark("aiogram") == 1.5
+
+    assert timer.total == 2.0
+    assert timer.report() == "Started in 2.00s: config 0.50s, aiogram 1.50s"
+
+
+def test_core_import_path_defers_digest_subsystems():
+    modules = _probe_import()["modules"]
+
+    loaded = [m for m in modules if m.startswith(DEFERRED_MODULES)]
+    assert loaded == []
+
+
+def test_core_import_time_within_budget():
+    # Best of two, a single run is at the mercy of the machine's load
+    elapsed = min(_probe_import()["ms"] for _ in range(2))
+
+    assert elapsed <= IMPORT_BUDGET_MS, (
+        f"Importing the core bot path took {elapsed:.0f}ms, budget is {IMPORT_BUDGET_MS:.0f}ms "
+        f"(FRANK_IMPORT_BUDGET_MS)"
+    )
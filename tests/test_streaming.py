@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from src.delivery import DeliveryQueue
+from src.streaming import StreamingReply
+
+
+def make_reply(max_length=4096, edit_interval=0):
+    status = AsyncMock()
+    message = AsyncMock()
+    message.answer.side_effect = lambda text: AsyncMock()
+    delivery = DeliveryQueue(rate=1000, burst=1000)
+    reply = StreamingReply(message, status, max_length=max_length, edit_interval=edit_interval, delivery=delivery)
+    return reply, message, status
+
+
+@pytest.mark.asyncio
+async def test_append_edits_status_message():
+    reply, message, status = make_reply()
+
+    await reply.append("Hello")
+    await reply.append(" world")
+
+    assert status.edit_text.call_args_list[-1][0][0] == "Hello world"
+    message.answer.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_append_is_throttled():
+    reply, message, status = make_reply(edit_interval=60)
+
+    with patch('src.streaming.time') as mock_time:
+        mock_time.monotonic.side_effect = [100.0, 101.0, 102.0]
+        await reply.append("a")
+        await reply.append("b")
+        await reply.append("c")
+
+    status.edit_text.assert_called_once_with("a")
+    assert reply.text == "abc"
+
+
+@pytest.mark.asyncio
+async def test_rolls_over_to_new_message_past_limit():
+    reply, message, status = make_reply(max_length=10)
+
+    await reply.append("A" * 15)
+
+    status.edit_text.assert_called_once_with("A" * 10)
+    message.answer.assert_called_once_with("A" * 5)
+
+
+@pytest.mark.asyncio
+async def test_finish_removes_stale_rollover_messages():
+    reply, message, status = make_reply(max_length=10)
+
+    await reply.append("A" * 15)
+    rollover = reply._messages[1]
+    await reply.finish("short")
+
+    assert status.edit_text.call_args[0][0] == "short"
+    rollover.delete.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_interim_edit_failure_does_not_raise():
+    reply, message, status = make_reply()
+    status.edit_text.side_effect = Exception("Bad Request: message is not modified")
+
+    await reply.append("text")
+
+    assert reply.text == "text"
+
+
+@pytest.mark.asyncio
+async def test_append_strips_escape_sequences_split_across_fragments():
+    reply, message, status = make_reply()
+
+    await reply.append("\x1b[3")
+    await reply.append("1mred\x1b[0m text")
+
+    assert reply.text == "red text"
+    assert status.edit_text.call_args[0][0] == "red text"
@@ -0,0 +1,100 @@
+import json
+from datetime import datetime
+from src.usage import Admission, BudgetPolicy, RunUsage, UsageLedger, parse_text_output
+from src.worker_pool import Lane
+
+NOW = datetime(2026, 2, 18, 12, 0)  # Wednesday
+
+
+def test_run_usage_from_cli_result():
+    usage = RunUsage.from_response({
+        "result": "hi",
+        "total_cost_usd": 0.12,
+        "usage": {
+            "input_tokens": 10,
+            "output_tokens": 50,
+            "cache_read_input_tokens": 2000,
+            "cache_creation_input_tokens": 300,
+        },
+    })
+
+    assert usage.cost_usd == 0.12
+    assert usage.cache_read_tokens == 2000
+    # Result usage is totalled over all model calls, it says nothing about the context
+    assert usage.context_tokens is None
+
+
+def test_context_size_of_one_request():
+    assert RunUsage.context_size({
+        "input_tokens": 10,
+        "output_tokens": 50,
+        "cache_read_input_tokens": 2000,
+        "cache_creation_input_tokens": 300,
+    }) == 2360
+
+
+def test_run_usage_missing_fields():
+    assert RunUsage.from_response({"result": "hi"}) is None
+
+
+def test_parse_text_output_json_and_plain():
+    text, usage = parse_text_output(json.dumps({"result": "Summary", "total_cost_usd": 0.5}))
+    assert text == "Summary"
+    assert usage.cost_usd == 0.5
+
+    assert parse_text_output("plain answer") == ("plain answer", None)
+
+
+def test_ledger_aggregates_day_week_and_sources(tmp_path):
+    ledger = UsageLedger(tmp_path / "usage.db")
+    monday = datetime(2026, 2, 16, 9, 0).timestamp()
+    ledger.record("newsletter", RunUsage(input_tokens=100, output_tokens=10, cost_usd=1.0), ts=monday)
+    ledger.record("chat", RunUsage(input_tokens=50, output_tokens=5, cost_usd=0.25), ts=NOW.timestamp())
+    ledger.record("chat", None)
+
+    assert ledger.day_totals(NOW)["cost_usd"] == 0.25
+    week = ledger.week_totals(NOW)
+    assert week["runs"] == 2
+    assert week["input_tokens"] == 150
+    assert ledger.by_source(0) == {"newsletter": 1.0, "chat": 0.25}
+
+
+def test_ledger_persists_across_instances(tmp_path):
+    UsageLedger(tmp_path / "usage.db").record("chat", RunUsage(cost_usd=2.0), ts=NOW.timestamp())
+
+    assert UsageLedger(tmp_path / "usage.db").week_totals(NOW)["cost_usd"] == 2.0
+
+
+def test_admission_degrades_digests_before_chat():
+    ledger = UsageLedger(policy=BudgetPolicy(daily_usd=10.0, downscale_at=0.5, defer_at=0.8))
+
+    assert ledger.admit(Lane.SCHEDULED, NOW) is Admission.ALLOW
+
+    ledger.record("chat", RunUsage(cost_usd=6.0), ts=NOW.timestamp())
+    assert ledger.admit(Lane.SCHEDULED, NOW) is Admission.DOWNSCALE
+    assert ledger.admit(Lane.INTERACTIVE, NOW) is Admission.ALLOW
+
+    ledger.record("chat", RunUsage(cost_usd=3.0), ts=NOW.timestamp())
+    assert ledger.admit(Lane.SCHEDULED, NOW) is Admission.DEFER
+    assert ledger.admit(Lane.INTERACTIVE, NOW) is Admission.ALLOW
+
+    ledger.record("chat", RunUsage(cost_usd=1.0), ts=NOW.timestamp())
+    assert ledger.admit(Lane.INTERACTIVE, NOW) is Admission.REJECT
+
+
+def test_unlimited_budget_always_admits():
+    ledger = UsageLedger()
+    ledger.record("chat", RunUsage(cost_usd=1000.0), ts=NOW.timestamp())
+
+    assert ledger.admit(Lane.SCHEDULED, NOW) is Admission.ALLOW
+    assert ledger.admit(Lane.INTERACTIVE, NOW) is Admission.ALLOW
+
+
+def test_report_lists_spend_and_budget():
+    ledger = UsageLedger(policy=BudgetPolicy(weekly_usd=20.0))
+    ledger.record("blog-fetch", RunUsage(input_tokens=1000, output_tokens=100, cost_usd=5.0), ts=NOW.timestamp())
+
+    report = ledger.report(NOW)
+
+    assert "$5.00 / $20.00 (25%)" in report
+    assert "blog-fetch: $5.00" in report
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from aiogram import Bot, Dispatcher, F
+from aiohttp import ClientSession
+from aiohttp.test_utils import TestClient, TestServer
+from src.webhook import build_webhook_app, run_webhook
+
+UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 1,
+        "date": 0,
+        "chat": {"id": 12345, "type": "private"},
+        "from": {"id": 12345, "is_bot": False, "first_name": "Test"},
+        "text": "hello",
+    },
+}
+
+
+def make_dispatcher(received: list, started: asyncio.Event | None = None, release: asyncio.Event | None = None):
+    dp = Dispatcher()
+
+    async def handler(message):
+        if started:
+            started.set()
+        if release:
+            await release.wait()
+        received.append(message.text)
+
+    dp.message.register(handler, F.text)
+    return dp
+
+
+@pytest.mark.asyncio
+async def test_webhook_rejects_wrong_secret():
+    received = []
+    app, _ = build_webhook_app(make_dispatcher(received), Bot(token="123:abc"), "/hook", secret="s3cret")
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.post("/hook", json=UPDATE, headers={"X-Telegram-Bot-Api-Secret-Token": "nope"})
+
+    assert response.status == 401
+    assert received == []
+
+
+@pytest.mark.asyncio
+async def test_webhook_feeds_update_to_dispatcher():
+    received = []
+    app, _ = build_webhook_app(make_dispatcher(received), Bot(token="123:abc"), "/hook", secret="s3cret")
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.post("/hook", json=UPDATE, headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"})
+        for _ in range(50):
+            if received:
+                break
+            await asyncio.sleep(0.01)
+
+    assert response.status == 200
+    assert received == ["hello"]
+
+
+@pytest.mark.asyncio
+async def test_run_webhook_drains_in_flight_updates_on_stop():
+    received = []
+    started, release, stop = asyncio.Event(), asyncio.Event(), asyncio.Event()
+    dp = make_dispatcher(received, started, release)
+
+    server = asyncio.create_task(run_webhook(
+        dp, Bot(token="123:abc"), host="127.0.0.1", port=18765, path="/hook", secret="s3cret", stop=stop
+    ))
+    await asyncio.sleep(0.1)
+
+    async with ClientSession() as session:
+        async with session.post("http://127.0.0.1:18765/hook", json=UPDATE,
+                                headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"}) as response:
+            assert response.status == 200
+
+    await asyncio.wait_for(started.wait(), 1)
+    stop.set()
+    await asyncio.sleep(0.05)
+    assert not server.done()  # still draining
+
+    release.set()
+    await asyncio.wait_for(server, 2)
+
+    assert received == ["hello"]
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from src.worker_pool import ClaudePool, Lane
+
+
+@pytest.mark.asyncio
+async def test_slot_caps_concurrency():
+    pool = ClaudePool(max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def job():
+        nonlocal running, peak
+        async with pool.slot(Lane.INTERACTIVE):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(job() for _ in range(6)))
+
+    assert peak == 2
+    assert pool.active == 0
+
+
+@pytest.mark.asyncio
+async def test_interactive_lane_served_before_scheduled():
+    pool = ClaudePool(max_concurrency=1)
+    order = []
+
+    async def job(lane, name):
+        async with pool.slot(lane, name):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await pool.acquire(Lane.SCHEDULED, "holder")
+    tasks = [
+        asyncio.create_task(job(Lane.SCHEDULED, "digest")),
+        asyncio.create_task(job(Lane.INTERACTIVE, "chat")),
+    ]
+    await asyncio.sleep(0)
+
+    assert pool.queue_depth() == 2
+    assert pool.queue_depth(Lane.INTERACTIVE) == 1
+
+    pool.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["chat", "digest"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    pool = ClaudePool(max_concurrency=1)
+    await pool.acquire(Lane.INTERACTIVE)
+
+    waiter = asyncio.create_task(pool.acquire(Lane.SCHEDULED))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    pool.release()
+    assert pool.active == 0
+    assert pool.queue_depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_slot_sync_from_worker_thread_respects_limit():
+    pool = ClaudePool(max_concurrency=1)
+    pool.configure(1, loop=asyncio.get_running_loop())
+
+    def blocking_job():
+        with pool.slot_sync(Lane.SCHEDULED, "thread-job"):
+            return pool.active
+
+    await pool.acquire(Lane.INTERACTIVE)
+    thread_job = asyncio.create_task(asyncio.to_thread(blocking_job))
+    await asyncio.sleep(0.05)
+
+    assert pool.queue_depth(Lane.SCHEDULED) == 1
+    pool.release()
+
+    assert await thread_job == 1
+    await asyncio.sleep(0)
+    assert pool.active == 0
+
+
+def test_slot_sync_without_loop_runs_unmanaged():
+    pool = ClaudePool(max_concurrency=1)
+
+    with pool.slot_sync(Lane.SCHEDULED, "script"):
+        assert pool.active == 0
+
+
+@pytest.mark.asyncio
+async def test_stats_report_queue_wait():
+    pool = ClaudePool(max_concurrency=1)
+
+    async with pool.slot(Lane.INTERACTIVE):
+        pass
+
+    stats = pool.stats()
+    assert stats["max_concurrency"] == 1
+    assert stats["lanes"]["interactive"]["acquired"] == 1
+    assert stats["lanes"]["scheduled"]["queued"] == 0